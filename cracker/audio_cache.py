@@ -0,0 +1,177 @@
+"""Disk-backed, content-addressed cache of synthesized audio.
+
+Entries are keyed on everything that changes what a speaker produces (speaker,
+voice, rate, volume, output format and the chunk text), so re-reading the same
+paragraph replays audio from disk instead of paying for another request. Each
+entry keeps the audio bytes and, when the speaker provides them, the word
+speech marks. The cache is bounded in bytes and evicts least-recently-used
+entries first; recency survives restarts through the files' modification time.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+
+from cracker.mp3_helper import CACHE_PATH
+from cracker.read_along import AudioSegment, WordMark
+from cracker.utils import get_logger
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_MARKS_SUFFIX = ".marks.json"
+
+
+class AudioCache:
+    """Size-bounded LRU cache of synthesized audio segments stored on disk."""
+
+    _logger = get_logger(__name__)
+
+    def __init__(self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or os.path.join(CACHE_PATH, "audio")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (audio filename, bytes used on disk); least recently used first.
+        self._entries: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._size = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    @classmethod
+    def from_config(cls, cache_config: dict) -> "AudioCache | None":
+        """Creates the cache described by the ``cache`` config section, unless it's disabled or unusable."""
+        if not cache_config.get("enabled", True):
+            cls._logger.info("Audio cache is disabled")
+            return None
+        max_bytes = int(float(cache_config.get("max_size_mb", 256)) * 1024 * 1024)
+        try:
+            return cls(cache_config.get("directory"), max_bytes=max_bytes)
+        except OSError as error:
+            cls._logger.error("Unable to open the audio cache: %s", error)
+            return None
+
+    @staticmethod
+    def make_key(
+        *,
+        speaker: str,
+        voice: str | None,
+        rate: str | int | None,
+        volume: str | int | None,
+        output_format: str,
+        text: str,
+    ) -> str:
+        """Returns the content address for one synthesized chunk."""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        payload = json.dumps([speaker, voice, rate, volume, output_format, text_hash])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> AudioSegment | None:
+        """Returns the cached segment for ``key`` and marks it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            path = os.path.join(self.directory, entry[0])
+            if not os.path.isfile(path):
+                self._forget(key)
+                return None
+            self._entries.move_to_end(key)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return AudioSegment(path=path, marks=self._read_marks(key))
+
+    def put(self, key: str, audio: bytes, marks: list[WordMark] | None = None, suffix: str = "mp3") -> AudioSegment:
+        """Stores audio (and marks) under ``key`` and returns the cached segment."""
+        filename = f"{key}.{suffix}"
+        path = os.path.join(self.directory, filename)
+        size = self._write_atomic(path, audio)
+        marks = list(marks or [])
+        if marks:
+            payload = json.dumps([asdict(mark) for mark in marks]).encode("utf-8")
+            size += self._write_atomic(self._marks_path(key), payload)
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries[key][1]
+            self._entries[key] = (filename, size)
+            self._entries.move_to_end(key)
+            self._size += size
+            self._evict()
+        return AudioSegment(path=path, marks=marks)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._forget(key)
+
+    def _load_index(self) -> None:
+        """Rebuilds the LRU order from files left by previous runs."""
+        found: list[tuple[float, str, str, int]] = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.endswith((_MARKS_SUFFIX, ".tmp")):
+                    continue
+                key, _, suffix = entry.name.partition(".")
+                if not suffix:
+                    continue
+                stat = entry.stat()
+                size = stat.st_size
+                try:
+                    size += os.path.getsize(self._marks_path(key))
+                except OSError:
+                    pass
+                found.append((stat.st_mtime, key, entry.name, size))
+        for _, key, filename, size in sorted(found):
+            self._entries[key] = (filename, size)
+            self._size += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            self._logger.debug("Evicting cached audio %s", key)
+            self._forget(key)
+
+    def _forget(self, key: str) -> None:
+        filename, size = self._entries.pop(key)
+        self._size -= size
+        for path in (os.path.join(self.directory, filename), self._marks_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _marks_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _MARKS_SUFFIX)
+
+    def _read_marks(self, key: str) -> list[WordMark]:
+        try:
+            with open(self._marks_path(key), "rb") as marks_file:
+                return [WordMark(**mark) for mark in json.loads(marks_file.read())]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, TypeError) as error:
+            self._logger.warning("Ignoring unreadable cached marks for %s: %s", key, error)
+            return []
+
+    def _write_atomic(self, path: str, data: bytes) -> int:
+        # A unique temp name keeps concurrent writers of the same key apart.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+        return len(data)
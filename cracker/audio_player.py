@@ -1,10 +1,11 @@
+import itertools
 from collections import deque
 from collections.abc import Iterable
 
-from PyQt6.QtCore import QUrl, pyqtSignal
+from PyQt6.QtCore import QBuffer, QIODevice, QUrl, pyqtSignal
 from PyQt6.QtMultimedia import QAudioOutput, QMediaPlayer
 
-from cracker.read_along import AudioSegment, WordMark
+from cracker.read_along import AudioSegment, WordMarks, word_marks
 from cracker.utils import get_logger
 
 
@@ -12,27 +13,52 @@ class AudioPlayer(QMediaPlayer):
     """Qt 6 media player that plays a queue of synthesized audio segments.
 
     Each segment may carry per-word timing marks (see :mod:`cracker.read_along`).
+    Segments are played from their file or, when they carry ``data``, straight
+    from memory through a ``QBuffer``.
     Read-along consumers should use the ``readStarted`` / ``readFinished`` /
     ``segmentStarted`` signals rather than raw ``playbackStateChanged`` — the
     latter flickers to ``Stopped`` between queued files, which is *not* the end
     of the read.
+
+    Segments can also be streamed while they are still being synthesized:
+    ``open_stream`` starts a read, ``push_segment`` appends to it (playback
+    starts with the first segment) and ``close_stream`` marks the end. These
+    three are safe to call from any thread; the work is marshalled onto the
+    player's thread through queued signals, and pushes for a stream that has
+    since been stopped or replaced are dropped. ``stop`` also discards streams
+    opened before it whose open request hasn't been delivered yet, so a
+    cancelled read can't start playing after the user pressed Stop.
     """
 
     playback_failed = pyqtSignal(str)
     readStarted = pyqtSignal()
     readFinished = pyqtSignal()
     segmentStarted = pyqtSignal(int)
+    segmentQueued = pyqtSignal(int)
+    _stream_opened = pyqtSignal(int)
+    _segment_pushed = pyqtSignal(int, object)
+    _stream_closed = pyqtSignal(int)
     _logger = get_logger(__name__)
 
     def __init__(self) -> None:
         super().__init__()
         self.audio_output = QAudioOutput(self)
         self.setAudioOutput(self.audio_output)
-        self._queued_sources: deque[QUrl] = deque()
-        self._segment_marks: list[list[WordMark]] = []
+        self._queued_segments: deque[AudioSegment] = deque()
+        self._buffer: QBuffer | None = None
+        self._segment_marks: list[WordMarks] = []
         self._current_index = -1
         self._reading = False
+        self._stream_ids = itertools.count(1)
+        self._last_stream_id = 0
+        self._stopped_through = 0
+        self._stream_id: int | None = None
+        self._stream_open = False
+        self._waiting = False
         self.mediaStatusChanged.connect(self._handle_media_status)
+        self._stream_opened.connect(self._on_stream_opened)
+        self._segment_pushed.connect(self._on_segment_pushed)
+        self._stream_closed.connect(self._on_stream_closed)
 
     def play_file(self, filepath: str) -> None:
         self.play_files([filepath])
@@ -45,17 +71,45 @@ class AudioPlayer(QMediaPlayer):
         """Plays audio segments in order, carrying their per-word marks."""
         segments = list(segments)
         self.stop()
-        self._segment_marks = [list(segment.marks) for segment in segments]
-        self._queued_sources.extend(QUrl.fromLocalFile(segment.path) for segment in segments)
+        self._segment_marks = [word_marks(segment.marks) for segment in segments]
+        self._queued_segments.extend(segments)
         self._play_next()
 
+    def open_stream(self) -> int:
+        """Stops the current read and starts a streamed one; returns its id."""
+        stream_id = next(self._stream_ids)
+        self._last_stream_id = stream_id
+        self._stream_opened.emit(stream_id)
+        return stream_id
+
+    def push_segment(self, stream_id: int, segment: AudioSegment) -> None:
+        """Appends a segment to an open stream, starting playback if idle."""
+        self._segment_pushed.emit(stream_id, segment)
+
+    def close_stream(self, stream_id: int) -> None:
+        """Marks the stream complete; the read finishes once its queue drains."""
+        self._stream_closed.emit(stream_id)
+
     def stop(self) -> None:
-        self._queued_sources.clear()
+        self._stopped_through = self._last_stream_id
+        self._reset()
+
+    def _reset(self) -> None:
+        self._queued_segments.clear()
         self._segment_marks = []
         self._current_index = -1
+        self._stream_id = None
+        self._stream_open = False
+        self._waiting = False
         was_reading = self._reading
         self._reading = False
         super().stop()
+        if self._buffer is not None:
+            # Detach the device before releasing the bytes it serves.
+            self.setSource(QUrl())
+            self._buffer.close()
+            self._buffer.deleteLater()
+            self._buffer = None
         if was_reading:
             self.readFinished.emit()
 
@@ -63,7 +117,7 @@ class AudioPlayer(QMediaPlayer):
     def has_marks(self) -> bool:
         return any(self._segment_marks)
 
-    def segment_marks(self) -> list[list[WordMark]]:
+    def segment_marks(self) -> list[WordMarks]:
         return self._segment_marks
 
     def current_segment(self) -> int:
@@ -79,8 +133,38 @@ class AudioPlayer(QMediaPlayer):
         elif status == QMediaPlayer.MediaStatus.EndOfMedia:
             self._play_next()
 
+    def _on_stream_opened(self, stream_id: int) -> None:
+        if stream_id <= self._stopped_through:
+            return
+        self._reset()
+        self._stream_id = stream_id
+        self._stream_open = True
+        self._waiting = True
+
+    def _on_segment_pushed(self, stream_id: int, segment: AudioSegment) -> None:
+        if stream_id != self._stream_id:
+            return
+        self._segment_marks.append(word_marks(segment.marks))
+        self._queued_segments.append(segment)
+        self.segmentQueued.emit(len(self._segment_marks) - 1)
+        if self._waiting:
+            self._waiting = False
+            self._play_next()
+
+    def _on_stream_closed(self, stream_id: int) -> None:
+        if stream_id != self._stream_id:
+            return
+        self._stream_open = False
+        if self._waiting:
+            self._waiting = False
+            self._play_next()
+
     def _play_next(self) -> None:
-        if not self._queued_sources:
+        if not self._queued_segments:
+            if self._stream_open:
+                # The producer hasn't caught up yet; resume on the next push.
+                self._waiting = True
+                return
             if self._reading:
                 self._reading = False
                 self._current_index = -1
@@ -90,12 +174,27 @@ class AudioPlayer(QMediaPlayer):
             self._reading = True
             self.readStarted.emit()
         self._current_index += 1
-        source = self._queued_sources.popleft()
-        if self.source() == source:
-            # QMediaPlayer caches media by URL and will not reload a file whose
-            # contents changed at the same path (temp filenames are reused
-            # across reads), so clear the source first to force a fresh decode.
-            self.setSource(QUrl())
-        self.setSource(source)
+        self._set_segment_source(self._queued_segments.popleft())
         self.segmentStarted.emit(self._current_index)
         self.play()
+
+    def _set_segment_source(self, segment: AudioSegment) -> None:
+        previous_buffer, self._buffer = self._buffer, None
+        if segment.data is not None:
+            buffer = QBuffer(self)
+            buffer.setData(segment.data)
+            buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+            self._buffer = buffer
+            # The URL only tells the backend which decoder to use.
+            self.setSourceDevice(buffer, QUrl(segment.path))
+        else:
+            source = QUrl.fromLocalFile(segment.path)
+            if self.source() == source:
+                # QMediaPlayer caches media by URL and will not reload a file whose
+                # contents changed at the same path (temp filenames are reused
+                # across reads), so clear the source first to force a fresh decode.
+                self.setSource(QUrl())
+            self.setSource(source)
+        if previous_buffer is not None:
+            previous_buffer.close()
+            previous_buffer.deleteLater()
@@ -0,0 +1,67 @@
+"""Cooperative cancellation shared between the GUI thread and background work.
+
+A :class:`CancellationToken` is handed to each background job. Work checks it
+between steps, blocking waits include ``token.future`` so they wake up as soon
+as it is cancelled, and callbacks abort in-flight work that can be interrupted
+(subprocesses, asyncio tasks).
+"""
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+
+from cracker.utils import get_logger
+
+
+class Cancelled(Exception):
+    """Raised by work that notices its token was cancelled."""
+
+
+class CancellationToken:
+    """A one-shot, thread-safe cancel flag with abort callbacks."""
+
+    _logger = get_logger(__name__)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+        # Resolved on cancel, so it can be passed to ``concurrent.futures.wait``.
+        self.future: Future[None] = Future()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.future.done()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self.future.done():
+                return
+            self.future.set_result(None)
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                self._logger.exception("Cancellation callback failed")
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Runs ``callback`` on cancel (now, if already cancelled).
+
+        Returns a function that unregisters the callback once the work it
+        guards has finished.
+        """
+        with self._lock:
+            if not self.future.done():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise Cancelled()
+
+    def _remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
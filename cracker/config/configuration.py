@@ -133,15 +133,23 @@ class Configuration(Singleton):
             _config[speaker.lower()] = {
                 "voice": s_config["voice"],
                 "credentials_file": s_config.get("credentials_file", ""),
+                "max_concurrency": int(s_config.get("max_concurrency", 1)),
             }
 
         # Check for different than default AWS profile_name
         _config["polly"]["profile_name"] = config_speakers.get("polly", {}).get("profile_name", "default")
         _config["polly"]["region_name"] = config_speakers.get("polly", {}).get("region_name", "")
+        _config["espeak"]["parallel"] = bool(config_speakers.get("espeak", {}).get("parallel", True))
+        _config["espeak"]["chunk_chars"] = int(config_speakers.get("espeak", {}).get("chunk_chars", 500))
+        _config["frogger"]["batch_chars"] = int(config_speakers.get("frogger", {}).get("batch_chars", 300))
+        _config["frogger"]["http2"] = bool(config_speakers.get("frogger", {}).get("http2", False))
 
         if self.voice not in self.lang_voices:
             _config["voice"] = self.voice = self.lang_voices[0]
 
+        _config["cache"] = dict(configuration.get("cache") or {})
+        _config["parser"] = dict(configuration.get("parser") or {})
+
         self.regex_config = self.load_regex_config()
         return _config
 
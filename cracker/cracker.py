@@ -1,17 +1,23 @@
+import os
+from collections.abc import Iterator
+from functools import partial
 from threading import Thread
 
 from PyQt6.QtMultimedia import QMediaPlayer
 from PyQt6.QtWidgets import QApplication
 
+from cracker.audio_cache import AudioCache
 from cracker.audio_player import AudioPlayer
+from cracker.cancellation import CancellationToken
 from cracker.config import Configuration
 from cracker.cracker_gui import MainWindow
+from cracker.file_source import open_text_file
 from cracker.keylogger import KeyBoardManager
+from cracker.reduction_worker import Reduction, ReductionJob, ReductionWorker
 from cracker.speaker.abstract_speaker import AbstractSpeaker
-from cracker.speaker.espeak import Espeak
-from cracker.speaker.frogger import Frogger
-from cracker.speaker.google import Google
-from cracker.speaker.polly import Polly
+from cracker.speaker.factory import SPEAKERS, create_speaker
+from cracker.synthesis_worker import SynthesisWorker
+from cracker.text_diff import TextEdit
 from cracker.text_parser import TextParser
 from cracker.utils import get_logger
 
@@ -19,9 +25,7 @@ from cracker.utils import get_logger
 class Cracker(object):
     """Logic for running the Cracker program"""
 
-    SPEAKER: dict[str, type[AbstractSpeaker]] = {
-        speaker.__name__.lower(): speaker for speaker in [Polly, Espeak, Google, Frogger]
-    }
+    SPEAKER: dict[str, type[AbstractSpeaker]] = SPEAKERS
     _logger = get_logger(__name__)
 
     def __init__(self, app: QApplication):
@@ -29,49 +33,64 @@ class Cracker(object):
         self.app = app
 
         self.config = Configuration()
-        _ = self.config.read_config()
+        config = self.config.read_config()
 
+        self.audio_cache = self.create_audio_cache(config.get("cache", {}))
         self.player = AudioPlayer()
         self.speaker: AbstractSpeaker = self.get_speaker(self.config.speaker, self.player)
-        self.text_parser = TextParser()
+        parser_config = config.get("parser", {})
+        # text_parser serves the GUI thread (the parser settings). The reduction and synthesis
+        # workers get parsers of their own, so a long run on one thread never holds up another.
+        self.text_parser = self.create_text_parser(parser_config)
+        self.reduction_parser = self.create_text_parser(parser_config)
+        self.read_parser = self.create_text_parser(parser_config)
+        # Where the current read's text comes from, for the read-along: "textarea" or "clipboard".
+        self._read_source = "textarea"
+        self.synthesis = SynthesisWorker()
+        self.synthesis.failed.connect(self._on_synthesis_failed)
+        self.synthesis.reduced.connect(self._on_read_reduced)
+        self.reduction = ReductionWorker()
+        self.reduction.progress.connect(self._on_reduction_progress)
+        self.reduction.finished.connect(self._on_reduction_finished)
+        self.reduction.failed.connect(self._on_reduction_failed)
 
         self.gui = MainWindow(self.config, speakers=self.SPEAKER)
         self.gui.speaker = self.speaker
         self.gui.player = self.player
         # Pass speaker reference to config window
         self.gui.config_window.speaker = self.speaker
+        self.gui.config_window.parser_tab.text_parser = self.text_parser
+        self.gui.config_window.parser_tab.text_source = self.gui.editor_text
 
         self.key_manager = KeyBoardManager(self.app)
 
         # Event on closing GUI application
         self.gui.closeAppEvent.connect(self._close)
 
-        self._last_pid = None
-
     def _close(self):
         "Handles closing whole application"
         self.key_manager.stop()
+        self.synthesis.shutdown()
+        self.reduction.shutdown()
+        self.speaker.close()
+        for parser in (self.text_parser, self.reduction_parser, self.read_parser):
+            parser.close()
+
+    @classmethod
+    def create_audio_cache(cls, cache_config: dict) -> AudioCache | None:
+        """Creates the audio cache shared by all cloud speakers, unless disabled."""
+        return AudioCache.from_config(cache_config)
+
+    @classmethod
+    def create_text_parser(cls, parser_config: dict) -> TextParser:
+        return TextParser(
+            rule_budget_ms=parser_config.get("rule_budget_ms"),
+            parallel_min_chars=parser_config.get("parallel_min_chars"),
+            parallel_workers=parser_config.get("parallel_workers"),
+        )
 
     def get_speaker(self, speaker_name, player) -> AbstractSpeaker:
-        config = self.config.read_config()
-        _name = speaker_name.lower()
-        if _name == Polly.__name__.lower():
-            self._logger.info("Using AWS Polly")
-            return Polly(player)
-        elif _name == Google.__name__.lower():
-            self._logger.info("Using Google TTS")
-            credentials_file = config.get("google", {}).get("credentials_file")
-            self._logger.debug("Using credentials file: %s", credentials_file)
-            return Google(player, credentials_file)
-        elif _name == Espeak.__name__.lower():
-            self._logger.info("Using ESpeak")
-            return Espeak(player)
-        elif _name == Frogger.__name__.lower():
-            self._logger.info("Using Frogger")
-            return Frogger(player)
-        # if speaker:
-        #     return speaker(player)
-        raise ValueError(f"No speaker was selected. Provided speaker name '{speaker_name}'")
+        return create_speaker(speaker_name, player, self.config.read_config(), self.audio_cache)
 
     def run(self):
         self.gui.init()
@@ -79,32 +98,57 @@ class Cracker(object):
         self.gui.show()
 
     def reduce_text(self):
-        text = self.gui.textEdit.toPlainText()
-        new_text = self.text_parser.reduce_text(text)
-        self.gui.textEdit.setText(new_text)
+        self.reduction_parser.parser_rules = self.config.regex_config
+        self._start_reduction("Reduce", self.reduction_parser.reduce)
 
     def reduce_cite(self):
-        text = self.gui.textEdit.toPlainText()
-        new_text = self.text_parser.reduce_cite(text)
-        self.gui.textEdit.setText(new_text)
+        self._start_reduction("Citation", partial(self.reduction_parser.apply_rules, TextParser.CITE_RULES))
 
     def wiki_text(self):
         """Sets the text box with wikipedia specific cleaned text.
         Example of this is removing `citation needed` and other references.
         """
+        self._start_reduction("Wiki", partial(self.reduction_parser.apply_rules, TextParser.WIKI_RULES))
+
+    def cancel_reduction(self):
+        if self.reduction.running:
+            self.reduction.cancel()
+            self.gui.set_reducing(None)
+            self.gui.show_message("Reduction cancelled")
+
+    def _start_reduction(self, name: str, reduce: Reduction):
+        """Runs ``reduce`` on the editor's text in the background; the result replaces the text when it's done."""
         text = self.gui.textEdit.toPlainText()
-        text = self.text_parser.wiki_text(text)
-        self.gui.textEdit.setText(text)
+        self.gui.set_reducing(name)
+        self.reduction.start(name, reduce, text, self.gui.text_revision())
+
+    def _on_reduction_progress(self, job: ReductionJob, percent: int):
+        if not job.token.cancelled:
+            self.gui.set_reducing(job.name, percent)
+
+    def _on_reduction_finished(self, job: ReductionJob, edits: list[TextEdit], skipped: list[str]):
+        if job.token.cancelled:
+            return
+        self.reduction.done(job)
+        self.gui.set_reducing(None)
+        if job.revision != self.gui.text_revision():
+            self.gui.show_message(f"The text changed during {job.name}, so its result was discarded")
+            return
+        self.gui.apply_edits(edits)
+        self._report_skipped_rules(skipped)
+
+    def _on_reduction_failed(self, job: ReductionJob, error: Exception):
+        if job.token.cancelled:
+            return
+        self.reduction.done(job)
+        self.gui.set_reducing(None)
+        self.gui.show_message(f"{job.name} failed: {error}")
 
     def read_text_area(self):
         """Reads out text in the text_box with selected speaker."""
         self.stop_text()
         text = self.gui.textEdit.toPlainText()  # TODO: toHtml() gives more control
-
-        self.text_parser.parser_rules = self.config.regex_config
-        text = self.text_parser.reduce_text(text)
-        self.gui.set_read_source("textarea", text)
-        self._read(text)
+        self._read("textarea", text)
 
     def toggle_read_text_clipboard(self):
         """Reads out text from the clipboard with selected speaker."""
@@ -117,16 +161,63 @@ class Cracker(object):
             clipboard = self.app.clipboard()
             assert clipboard is not None
             text = clipboard.text()
+            self._read("clipboard", text)
+
+    def read_file_dialog(self):
+        path = self.gui.choose_file()
+        if path is not None:
+            self.read_file(path)
+
+    def read_file(self, path: str):
+        """Reads out a text, Markdown or HTML file.
+
+        The file is streamed through the parser rules to the speaker block by
+        block instead of being loaded into the editor, so reading starts
+        before the rest of the file has been processed.
+        """
+        self.stop_text()
+        try:
+            blocks = open_text_file(path)
+        except OSError as error:
+            self.gui.show_message(f"Can't open {path}: {error}")
+            return
+        self.gui.set_read_source("file")
+        self.gui.show_message(f"Reading {os.path.basename(path)}")
+        self.synthesis.read_blocks(
+            self.speaker, self._reduced_blocks(blocks, self.config.regex_config), self._prepare_config()
+        )
 
-            self.text_parser.parser_rules = self.config.regex_config
-            text = self.text_parser.reduce_text(text)
-            self.gui.set_read_source("clipboard", text)
-            self._read(text)
+    def _reduced_blocks(self, blocks: Iterator[str], rules: dict) -> Iterator[str]:
+        """The blocks through the parser rules, which are set on the worker thread like the rest."""
+        self.read_parser.parser_rules = rules
+        yield from self.read_parser.reduce_blocks(blocks)
 
-    def _read(self, text):
+    def _report_skipped_rules(self, skipped: list[str]):
+        if skipped:
+            self.gui.show_message(f"Skipped slow parser rules: {', '.join(skipped)}")
+
+    def _read(self, source: str, text: str):
+        """Reads ``text`` after the parser rules, which run on the synthesis worker with the rest of the read."""
         self._logger.debug(f"Reading text: {text}")
+        rules = self.config.regex_config
+
+        def reduce(text: str, cancel: CancellationToken | None = None) -> tuple[str, list[str]]:
+            self.read_parser.parser_rules = rules
+            return self.read_parser.reduce(text, cancel)
+
+        self._read_source = source
         speaker_config = self._prepare_config()
-        self._last_pid = self.speaker.read_text(text, **speaker_config)
+        self.synthesis.read(self.speaker, text, speaker_config, reduce)
+
+    def _on_read_reduced(self, token: CancellationToken, text: str, skipped: list[str]):
+        # Arrives before the read's first audio, so the read-along starts on the reduced text.
+        if token.cancelled:
+            return
+        self.gui.set_read_source(self._read_source, text)
+        self._report_skipped_rules(skipped)
+
+    def _on_synthesis_failed(self, speaker: AbstractSpeaker, error: Exception):
+        speaker.report_error(error)
 
     def toggle_read(self):
         if self.player.playbackState() == QMediaPlayer.PlaybackState.PausedState:
@@ -135,6 +226,7 @@ class Cracker(object):
             self.player.pause()
 
     def stop_text(self):
+        self.synthesis.cancel()
         self.speaker.stop_text()
         self.player.stop()
 
@@ -146,7 +238,10 @@ class Cracker(object):
         """Action on changing speaker.
 
         Important: Each speaker has its own configuration. These values should be updated on change.
+        The outgoing speaker's read is stopped and the speaker closed, as it isn't used again.
         """
+        self.stop_text()
+        self.speaker.close()
         self.speaker = self.get_speaker(speaker_name, self.player)
         self.gui.change_speaker(speaker_name, self.speaker)
 
@@ -154,10 +249,12 @@ class Cracker(object):
         self.gui.stop_action.triggered.connect(self.stop_text)
         self.gui.read_action.triggered.connect(self.read_text_area)
         self.gui.clipboard_read_action.triggered.connect(self.toggle_read_text_clipboard)
+        self.gui.read_file_action.triggered.connect(self.read_file_dialog)
         self.gui.toggle_action.triggered.connect(self.toggle_read)
         self.gui.reduce_action.triggered.connect(self.reduce_text)
         self.gui.wiki_action.triggered.connect(self.wiki_text)
         self.gui.cite_action.triggered.connect(self.reduce_cite)
+        self.gui.cancel_reduce_action.triggered.connect(self.cancel_reduction)
         self.gui.speakerW.currentTextChanged.connect(self.change_speaker)
 
         self.key_manager.GlobalReadSignal.connect(self.toggle_read_text_clipboard)
@@ -1,8 +1,11 @@
+from collections.abc import Sequence
+
 from PyQt6.QtCore import QSize, Qt, pyqtSignal
 from PyQt6.QtGui import QAction, QCloseEvent, QColor, QIcon, QTextCharFormat, QTextCursor
 from PyQt6.QtMultimedia import QMediaPlayer
 from PyQt6.QtWidgets import (
     QComboBox,
+    QFileDialog,
     QFrame,
     QHBoxLayout,
     QLabel,
@@ -11,7 +14,6 @@ from PyQt6.QtWidgets import (
     QProgressBar,
     QSlider,
     QSpinBox,
-    QTextEdit,
     QToolButton,
     QVBoxLayout,
     QWidget,
@@ -19,11 +21,14 @@ from PyQt6.QtWidgets import (
 
 from cracker.audio_player import AudioPlayer
 from cracker.config import Configuration
+from cracker.file_source import FILE_FILTER
 from cracker.read_along_controller import ReadAlongController
 from cracker.speaker.abstract_speaker import AbstractSpeaker
+from cracker.text_diff import TextEdit
 from cracker.themes import active_tokens
 from cracker.utils import get_logger
 from cracker.view.config_window import ConfigWindow
+from cracker.view.document_editor import DocumentEditor
 from cracker.view.icons import render_icon
 
 SpeakersType = dict[str, type[AbstractSpeaker]]
@@ -95,6 +100,10 @@ class MainWindow(QMainWindow):
         self.clipboard_read_action.setShortcut("Ctrl+Shift+R")
         self.clipboard_read_action.setStatusTip("Reads text from clipboard")
 
+        self.read_file_action = QAction("Read file…", self)
+        self.read_file_action.setShortcut("Ctrl+O")
+        self.read_file_action.setStatusTip("Reads a text, Markdown or HTML file without loading it into the editor")
+
         self.toggle_action = QAction("Pause", self)
         self.toggle_action.setDisabled(True)
         self.toggle_action.setShortcut("Ctrl+Space")
@@ -118,6 +127,11 @@ class MainWindow(QMainWindow):
         self.cite_action.setShortcut("Ctrl+Shift+C")
         self.cite_action.setStatusTip("Citation")
 
+        self.cancel_reduce_action = QAction("Cancel reduction", self)
+        self.cancel_reduce_action.setShortcut("Esc")
+        self.cancel_reduce_action.setStatusTip("Stops the running Reduce, Wiki or Citation action")
+        self.cancel_reduce_action.setDisabled(True)
+
         self.toggle_config_window = QAction("Config", self)
         self.toggle_config_window.setStatusTip("Opens configuration")
         self.toggle_config_window.triggered.connect(self.config_window.show)
@@ -128,12 +142,14 @@ class MainWindow(QMainWindow):
 
         fileAction = menubar.addMenu("&File")
         assert fileAction is not None
+        fileAction.addAction(self.read_file_action)
         fileAction.addAction(_save)
         fileAction.addAction(_exit)
         textAction = menubar.addMenu("&Text")
         assert textAction is not None
         textAction.addAction(self.read_action)
         textAction.addAction(self.clipboard_read_action)
+        textAction.addAction(self.read_file_action)
         textAction.addAction(self.stop_action)
         textAction.addAction(self.toggle_action)
         reduceAction = menubar.addMenu("&Reduce")
@@ -141,6 +157,7 @@ class MainWindow(QMainWindow):
         reduceAction.addAction(self.reduce_action)
         reduceAction.addAction(self.wiki_action)
         reduceAction.addAction(self.cite_action)
+        reduceAction.addAction(self.cancel_reduce_action)
 
     # --- Icons ------------------------------------------------------------
 
@@ -204,6 +221,7 @@ class MainWindow(QMainWindow):
         read_menu = QMenu(self.read_button)
         read_menu.addAction(self.read_action)
         read_menu.addAction(self.clipboard_read_action)
+        read_menu.addAction(self.read_file_action)
         self.read_button.setMenu(read_menu)
         self.read_button.clicked.connect(self.read_action.trigger)
         row.addWidget(self.read_button)
@@ -332,7 +350,7 @@ class MainWindow(QMainWindow):
         container = QWidget()
         box = QVBoxLayout(container)
         box.setContentsMargins(12, 10, 12, 10)
-        self.textEdit = QTextEdit()
+        self.textEdit = DocumentEditor()
         self.textEdit.setPlaceholderText("Paste or type text to read aloud…")
         box.addWidget(self.textEdit)
         return container
@@ -352,9 +370,69 @@ class MainWindow(QMainWindow):
         left_row.addWidget(self.statusLeftLabel)
         status.addWidget(left)
 
+        self.reduceProgress = QProgressBar()
+        self.reduceProgress.setObjectName("reduceProgress")
+        self.reduceProgress.setRange(0, 100)
+        self.reduceProgress.setFixedWidth(140)
+        self.reduceProgress.hide()
+        status.addPermanentWidget(self.reduceProgress)
+        self.cancelReduceButton = QToolButton()
+        self.cancelReduceButton.setProperty("flatlink", True)
+        self.cancelReduceButton.setAutoRaise(True)
+        self.cancelReduceButton.setText("Cancel")
+        self.cancelReduceButton.clicked.connect(self.cancel_reduce_action.trigger)
+        self.cancelReduceButton.hide()
+        status.addPermanentWidget(self.cancelReduceButton)
+
         self.statusRightLabel = QLabel("")
         status.addPermanentWidget(self.statusRightLabel)
 
+    def show_message(self, message: str, timeout_ms: int = 8000) -> None:
+        """Shows a transient notice in the status bar."""
+        status = self.statusBar()
+        assert status is not None
+        status.showMessage(message, timeout_ms)
+
+    def text_revision(self) -> int:
+        """Changes whenever the editor's text does."""
+        document = self.textEdit.document()
+        assert document is not None
+        return document.revision()
+
+    def apply_edits(self, edits: Sequence[TextEdit]) -> None:
+        """Replaces only the edited ranges, as one undo step, keeping the scroll position.
+
+        ``edits`` are in UTF-16 offsets, ascending and not overlapping.
+        """
+        if not edits:
+            return
+        cursor = QTextCursor(self.textEdit.document())
+        cursor.beginEditBlock()
+        # From the end, so the offsets of earlier edits stay valid.
+        for edit in reversed(edits):
+            cursor.setPosition(edit.start)
+            cursor.setPosition(edit.end, QTextCursor.MoveMode.KeepAnchor)
+            if edit.text:
+                cursor.insertText(edit.text)
+            else:
+                cursor.removeSelectedText()
+        cursor.endEditBlock()
+
+    def set_reducing(self, name: str | None, percent: int = 0) -> None:
+        """Shows the progress of a running reduction, or hides it when ``name`` is None."""
+        reducing = name is not None
+        # The text area is about to change, so it isn't read meanwhile.
+        for action in (self.reduce_action, self.wiki_action, self.cite_action, self.read_action):
+            action.setDisabled(reducing)
+        self.cancel_reduce_action.setEnabled(reducing)
+        if not hasattr(self, "reduceProgress"):
+            return
+        self.reduceProgress.setVisible(reducing)
+        self.cancelReduceButton.setVisible(reducing)
+        if reducing:
+            self.reduceProgress.setFormat(f"{name} %p%")
+            self.reduceProgress.setValue(percent)
+
     def init_values(self):
         self.change_volume(self.volumeW.value())
         self.change_speed(self.speedW.value())
@@ -370,8 +448,13 @@ class MainWindow(QMainWindow):
     def editor_text(self) -> str:
         return self.textEdit.toPlainText()
 
+    def choose_file(self) -> str | None:
+        """Asks for a file to read; None when the dialog is cancelled."""
+        path, _ = QFileDialog.getOpenFileName(self, "Read file", "", FILE_FILTER)
+        return path or None
+
     def set_read_source(self, source: str, text: str = "") -> None:
-        """Set by the app controller before each read: 'textarea' or 'clipboard'."""
+        """Set by the app controller before each read: 'textarea', 'clipboard' or 'file'."""
         if self.read_along is not None:
             self.read_along.set_read_context(source, text)
 
@@ -386,16 +469,17 @@ class MainWindow(QMainWindow):
         self.readProgress.setValue(percent)
 
     def highlight_span(self, start: int, length: int, doc_len: int) -> None:
-        hi_bg, hi_fg, muted = self._readalong_colors()
-        selections = []
-        dim_start = start + length
-        if dim_start < doc_len:
-            selections.append(self._extra_selection(dim_start, doc_len - dim_start, None, muted))
-        selections.append(self._extra_selection(start, length, hi_bg, hi_fg))
-        self.textEdit.setExtraSelections(selections)
+        # The text after the word is dimmed by the editor's stylesheet while reading.
+        hi_bg, hi_fg, read = self._readalong_colors()
+        word_format = QTextCharFormat()
+        word_format.setBackground(hi_bg)
+        word_format.setForeground(hi_fg)
+        read_format = QTextCharFormat()
+        read_format.setForeground(read)
+        self.textEdit.set_highlight(start, length, word_format, read_format)
 
     def clear_highlight(self) -> None:
-        self.textEdit.setExtraSelections([])
+        self.textEdit.clear_highlight()
 
     def set_read_status(self, reading: bool, words_done: int = 0, total: int = 0) -> None:
         tokens = active_tokens()
@@ -417,26 +501,12 @@ class MainWindow(QMainWindow):
 
     def _readalong_colors(self) -> tuple[QColor, QColor, QColor]:
         tokens = active_tokens()
-        muted = QColor(tokens["text_muted"])
+        read = QColor(tokens["text_primary"])
         if tokens["is_dark"]:
             bg = QColor(124, 140, 248)
             bg.setAlpha(62)
-            return bg, QColor("#dfe3ff"), muted
-        return QColor("#dbe7ff"), QColor("#15315e"), muted
-
-    def _extra_selection(self, start: int, length: int, bg: QColor | None, fg: QColor | None):
-        selection = QTextEdit.ExtraSelection()
-        cursor = QTextCursor(self.textEdit.document())
-        cursor.setPosition(start)
-        cursor.setPosition(start + length, QTextCursor.MoveMode.KeepAnchor)
-        selection.cursor = cursor
-        fmt = QTextCharFormat()
-        if bg is not None:
-            fmt.setBackground(bg)
-        if fg is not None:
-            fmt.setForeground(fg)
-        selection.format = fmt
-        return selection
+            return bg, QColor("#dfe3ff"), read
+        return QColor("#dbe7ff"), QColor("#15315e"), read
 
     # --- Playback button state -------------------------------------------
 
@@ -467,6 +537,7 @@ class MainWindow(QMainWindow):
             self.pause_button.setIcon(self._icons["play"] if paused else self._icons["pause"])
         self.read_action.setDisabled(active)
         self.clipboard_read_action.setDisabled(active)
+        self.read_file_action.setDisabled(active)
         self.stop_action.setDisabled(not active)
         self.toggle_action.setDisabled(not active)
         if not active:
@@ -0,0 +1,252 @@
+"""Streams the text of plain text, Markdown and HTML files in blocks.
+
+A file is memory-mapped (or read in chunks when it can't be mapped) and
+decoded incrementally. Markup is stripped as the text passes through, and the
+result is cut into blocks of about :data:`BLOCK_CHARS` characters that end at
+blank lines where possible. Only a few blocks exist at a time, so a very large
+file never sits whole in the editor or in one Python string. The blocks feed
+:meth:`~cracker.text_parser.TextParser.reduce_blocks` and a speaker's
+``read_blocks``, so synthesis starts while the rest of the file is still
+being read.
+"""
+
+import codecs
+import mmap
+import os
+import re
+from collections.abc import Generator, Iterable, Iterator
+from contextlib import closing
+from functools import partial
+from html.parser import HTMLParser
+from typing import BinaryIO, Protocol
+
+# Characters per block handed to the parser rules and the speaker.
+BLOCK_CHARS = 64 * 1024
+# Bytes decoded at a time.
+CHUNK_BYTES = 64 * 1024
+
+MARKDOWN_SUFFIXES = frozenset({".md", ".markdown", ".mdown", ".mkd"})
+HTML_SUFFIXES = frozenset({".html", ".htm", ".xhtml"})
+FILE_FILTER = "Text files (*.txt *.md *.markdown *.html *.htm);;All files (*)"
+
+
+class Stripper(Protocol):
+    """Turns markup into plain text piece by piece; state carries over between pieces."""
+
+    def feed(self, text: str) -> str: ...
+    def close(self) -> str: ...
+
+
+class PlainText:
+    def feed(self, text: str) -> str:
+        return text
+
+    def close(self) -> str:
+        return ""
+
+
+_MD_FENCE = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+_MD_HEADING = re.compile(r"^\s{0,3}#{1,6}(?:\s+|$)(.*?)(?:\s+#+)?\s*$")
+_MD_RULE = re.compile(r"^\s{0,3}(?:([-*_])(?:\s*\1){2,}|=+)\s*$")
+_MD_LINK_DEFINITION = re.compile(r"^\s{0,3}\[[^\]]+\]:\s*\S+")
+_MD_PREFIX = re.compile(r"^\s*(?:>\s?)*(?:(?:[-*+]|\d+[.)])\s+)?")
+_MD_LINK = re.compile(r"!?\[([^\]]*)\](?:\([^)]*\)|\[[^\]]*\])")
+_MD_CODE = re.compile(r"(`+)(.+?)\1")
+_MD_EMPHASIS = re.compile(r"(?<!\w)(\*\*|__|~~|\*|_)(?=\S)(.+?)(?<=\S)\1(?!\w)")
+_MD_TAG = re.compile(r"</?[A-Za-z][^>]*>")
+
+
+class MarkdownStripper:
+    """Keeps the words of Markdown and drops its markup, one line at a time.
+
+    Headings, quotes and list items keep their text; links and images keep
+    their label; code blocks, rules and link definitions are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._partial = ""
+        self._fence: str | None = None
+
+    def feed(self, text: str) -> str:
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        return "".join(stripped + "\n" for line in lines if (stripped := self._line(line)) is not None)
+
+    def close(self) -> str:
+        line, self._partial = self._partial, ""
+        return self._line(line) or ""
+
+    def _line(self, line: str) -> str | None:
+        fence = _MD_FENCE.match(line)
+        if self._fence is not None:
+            if fence is not None and fence.group(1)[0] == self._fence:
+                self._fence = None
+            return None
+        if fence is not None:
+            self._fence = fence.group(1)[0]
+            return None
+        if _MD_RULE.match(line) or _MD_LINK_DEFINITION.match(line):
+            return ""
+        heading = _MD_HEADING.match(line)
+        line = heading.group(1) if heading is not None else line[_MD_PREFIX.match(line).end() :]
+        line = _MD_LINK.sub(r"\1", line)
+        line = _MD_CODE.sub(r"\2", line)
+        line = _MD_EMPHASIS.sub(r"\2", line)
+        return _MD_TAG.sub("", line)
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class _HtmlText(HTMLParser):
+    # Elements whose content is never read.
+    SKIPPED = frozenset({"head", "script", "style", "template", "noscript", "svg"})
+    # Elements that start a new line, and those that start a new paragraph.
+    LINES = frozenset({"br", "li", "tr", "dt", "dd", "option"})
+    PARAGRAPHS = frozenset(
+        {"p", "div", "section", "article", "main", "header", "footer", "aside", "nav", "blockquote", "pre"}
+        | {"ul", "ol", "dl", "table", "figure", "figcaption", "hr", "h1", "h2", "h3", "h4", "h5", "h6"}
+    )
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skipped = 0
+        self._preformatted = 0
+        # Line breaks at the end of the output; starts high so leading breaks are dropped.
+        self._newlines = 2
+        # Whether the output ends with a collapsed space, as text can arrive in several pieces.
+        self._spaced = False
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in self.SKIPPED:
+            self._skipped += 1
+        elif tag == "pre":
+            self._preformatted += 1
+        self._break(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.SKIPPED:
+            self._skipped = max(0, self._skipped - 1)
+        elif tag == "pre":
+            self._preformatted = max(0, self._preformatted - 1)
+        self._break(tag)
+
+    def handle_data(self, data: str) -> None:
+        if self._skipped:
+            return
+        if not self._preformatted:
+            data = _WHITESPACE.sub(" ", data)
+            if self._newlines or self._spaced:
+                data = data.lstrip(" ")
+        if data:
+            self.parts.append(data)
+            self._newlines = len(data) - len(data.rstrip("\n"))
+            self._spaced = data.endswith(" ")
+
+    def _break(self, tag: str) -> None:
+        wanted = 2 if tag in self.PARAGRAPHS else 1 if tag in self.LINES else 0
+        if wanted > self._newlines:
+            self.parts.append("\n" * (wanted - self._newlines))
+            self._newlines = wanted
+            self._spaced = False
+
+
+class HtmlStripper:
+    """Keeps the readable text of HTML, with line breaks where block elements start and end."""
+
+    def __init__(self) -> None:
+        self._parser = _HtmlText()
+
+    def feed(self, text: str) -> str:
+        self._parser.feed(text)
+        return self._take()
+
+    def close(self) -> str:
+        self._parser.close()
+        return self._take()
+
+    def _take(self) -> str:
+        text = "".join(self._parser.parts)
+        self._parser.parts.clear()
+        return text
+
+
+def stripper_for(path: str) -> Stripper:
+    """Picks the stripper from the file's extension; unknown extensions are plain text."""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in MARKDOWN_SUFFIXES:
+        return MarkdownStripper()
+    if suffix in HTML_SUFFIXES:
+        return HtmlStripper()
+    return PlainText()
+
+
+def _byte_chunks(file: BinaryIO, chunk_bytes: int) -> Iterator[bytes]:
+    try:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError, OSError:
+        # Empty files and pipes can't be mapped.
+        yield from iter(partial(file.read, chunk_bytes), b"")
+        return
+    with mapped:
+        if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        for offset in range(0, len(mapped), chunk_bytes):
+            yield mapped[offset : offset + chunk_bytes]
+
+
+def _stripped_text(file: BinaryIO, stripper: Stripper, encoding: str, chunk_bytes: int) -> Iterator[str]:
+    with file, closing(_byte_chunks(file, chunk_bytes)) as chunks:
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        for chunk in chunks:
+            yield stripper.feed(decoder.decode(chunk))
+        yield stripper.feed(decoder.decode(b"", final=True))
+        yield stripper.close()
+
+
+def _block_cut(text: str, limit: int) -> int:
+    """End of the first block of ``text``: after the last blank line, line break or space in its second half."""
+    lowest = limit // 2
+    for separator in ("\n\n", "\n", " "):
+        position = text.rfind(separator, lowest, limit)
+        if position >= 0:
+            return position + len(separator)
+    return limit
+
+
+def paragraph_blocks(texts: Iterable[str], block_chars: int = BLOCK_CHARS) -> Iterator[str]:
+    """Regroups pieces of text into blocks of at most ``block_chars`` characters, ending at blank lines if possible.
+
+    Blocks holding only whitespace are dropped. Closing the returned iterator
+    closes ``texts`` when it's a generator.
+    """
+    if block_chars < 1:
+        raise ValueError(f"block_chars must be positive, got {block_chars}")
+    pending = ""
+    try:
+        for text in texts:
+            pending += text
+            while len(pending) >= block_chars:
+                cut = _block_cut(pending, block_chars)
+                block, pending = pending[:cut], pending[cut:]
+                if not block.isspace():
+                    yield block
+    finally:
+        if isinstance(texts, Generator):
+            texts.close()
+    if pending and not pending.isspace():
+        yield pending
+
+
+def open_text_file(
+    path: str, block_chars: int = BLOCK_CHARS, encoding: str = "utf-8-sig", chunk_bytes: int = CHUNK_BYTES
+) -> Iterator[str]:
+    """Opens ``path`` and returns an iterator over its readable text in blocks.
+
+    The file is opened straight away, so a missing or unreadable file raises
+    :class:`OSError` here; everything else happens as the blocks are consumed.
+    Markdown and HTML are recognised by their extension.
+    """
+    file = open(path, "rb")
+    return paragraph_blocks(_stripped_text(file, stripper_for(path), encoding, chunk_bytes), block_chars)
@@ -41,12 +41,22 @@ class ThemeBridge(QObject):
 
 
 def parse_args(argv=None):
-    parser = argparse.ArgumentParser(prog="cracker", description="GUI for text-to-speech")
+    parser = argparse.ArgumentParser(
+        prog="cracker",
+        description="GUI for text-to-speech",
+        epilog="Run 'cracker synth --help' to write audio files without the GUI.",
+    )
     parser.add_argument("--debug", action="store_true")
     return parser.parse_known_args(argv)
 
 
 def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["synth"]:
+        from cracker.synth import main as synth_main
+
+        sys.exit(synth_main(argv[1:]))
+
     from cracker.cracker import Cracker
 
     args, qt_args = parse_args(argv)
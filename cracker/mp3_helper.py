@@ -14,15 +14,3 @@ def create_filename(base_filename: str, idx: int | None = None) -> str:
         return filename
     else:
         return base_filename
-
-
-def save_mp3(mp3_stream, base_filename: str) -> str:
-    """Stores downloaded response as an mp3.
-
-    Returns path to location where the mp3 is stored.
-    The path should be absolute path, i.e. `~/.cache` -> `/home/user/.cache`.
-    """
-    filepath = os.path.join(CACHE_PATH, base_filename)
-    with open(filepath, "wb") as tmp_file:
-        tmp_file.write(mp3_stream)
-    return filepath
@@ -0,0 +1,190 @@
+"""Applies rule pipelines to very large texts on several processes.
+
+The text is cut into shards at paragraph breaks and each shard goes through
+the whole pipeline in a worker process; the reduced shards are joined in
+their original order. A paragraph break is only used as a seam when the
+rules give the same result on the characters around it whether or not the
+text is cut there, so rules that join paragraphs (such as a newline followed
+by a lowercase letter) keep working. The seams depend only on the text and
+the rules, never on the number of workers, so the output is deterministic.
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections.abc import Iterator
+
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.text_rules import Progress, Rule, RulePipeline
+from cracker.utils import get_logger
+
+# A blank line (possibly holding spaces or tabs) and the whitespace after it.
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+# Characters on each side of a seam that must reduce the same with and without the cut.
+SEAM_CONTEXT = 256
+# Paragraph breaks tried for one seam before moving a shard's length further on.
+_MAX_SEAM_TRIES = 32
+
+# Worker-side cache, so a pool reuses the compiled rules across shards and calls.
+_worker_pipeline: tuple[tuple[tuple[Rule, ...], bool], RulePipeline] | None = None
+
+
+class ShardTimeout(Exception):
+    """Raised when the shards aren't reduced within the time allowed."""
+
+
+def _reduce(pipeline: RulePipeline, text: str) -> str:
+    for _, text, _, _ in pipeline.run(text):
+        pass
+    return text
+
+
+def _seam_is_safe(pipeline: RulePipeline, text: str, seam: int) -> bool:
+    left = text[max(0, seam - SEAM_CONTEXT) : seam]
+    right = text[seam : seam + SEAM_CONTEXT]
+    return _reduce(pipeline, left + right) == _reduce(pipeline, left) + _reduce(pipeline, right)
+
+
+def shard_spans(text: str, pipeline: RulePipeline, shard_chars: int) -> Iterator[tuple[int, int]]:
+    """Yields ``(start, end)`` offsets of shards of roughly ``shard_chars`` that tile the text."""
+    length = len(text)
+    start = 0
+    search_from = shard_chars
+    while length - start > shard_chars and search_from < length:
+        seam = None
+        for tries, match in enumerate(_PARAGRAPH_BREAK.finditer(text, search_from)):
+            if tries == _MAX_SEAM_TRIES:
+                break
+            if match.end() < length and _seam_is_safe(pipeline, text, match.end()):
+                seam = match.end()
+                break
+        if seam is None:
+            search_from += shard_chars
+            continue
+        yield start, seam
+        start = seam
+        search_from = seam + shard_chars
+    yield start, length
+
+
+def _cached_pipeline(rules: tuple[Rule, ...], fuse: bool) -> RulePipeline:
+    global _worker_pipeline
+    key = (rules, fuse)
+    if _worker_pipeline is None or _worker_pipeline[0] != key:
+        _worker_pipeline = (key, RulePipeline(rules, fuse=fuse))
+    return _worker_pipeline[1]
+
+
+def _plan_shards(rules: tuple[Rule, ...], fuse: bool, text: str, shard_chars: int) -> list[tuple[int, int]]:
+    """Worker: picks the seams, which runs the rules and so may be slow too."""
+    return list(shard_spans(text, _cached_pipeline(rules, fuse), shard_chars))
+
+
+def _reduce_shard(rules: tuple[Rule, ...], fuse: bool, text: str) -> tuple[str, list[tuple[int, dict, float]]]:
+    """Worker: reduces one shard, returning its text and the per-pass counters."""
+    steps = []
+    for index, text, counts, elapsed in _cached_pipeline(rules, fuse).run(text):
+        steps.append((index, counts, elapsed))
+    return text, steps
+
+
+class ParallelReducer:
+    """Reduces texts of at least ``min_chars`` characters on a pool of ``workers`` processes."""
+
+    _logger = get_logger(__name__)
+
+    def __init__(self, min_chars: int = 1024 * 1024, workers: int = 0, shard_chars: int = 256 * 1024):
+        self.min_chars = min_chars
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_chars = shard_chars
+        self._lock = threading.Lock()
+        self._executor: concurrent.futures.ProcessPoolExecutor | None = None
+
+    def wants(self, text: str) -> bool:
+        """Whether ``text`` is large enough to be worth sharding."""
+        return 0 < self.min_chars <= len(text) and self.workers > 1
+
+    def reduce(
+        self,
+        pipeline: RulePipeline,
+        text: str,
+        timeout: float | None = None,
+        cancel: CancellationToken | None = None,
+        progress: Progress | None = None,
+    ) -> str:
+        """Applies ``pipeline`` shard by shard in parallel and joins the results in order.
+
+        Raises :class:`ShardTimeout`, after stopping the workers, when the
+        shards aren't done within ``timeout`` seconds. ``progress(done, total)``
+        is called as shards finish, and cancelling ``cancel`` stops the
+        workers and raises :class:`~cracker.cancellation.Cancelled`.
+        """
+        with self._lock:
+            executor = self._ensure_executor()
+            deadline = None if timeout is None else time.monotonic() + timeout
+            plan = executor.submit(_plan_shards, pipeline.rules, pipeline.fuse, text, self.shard_chars)
+            if self._wait([plan], deadline, cancel):
+                self._stop(kill=True)
+                raise ShardTimeout(f"Picking shard seams didn't finish in {timeout} s")
+            spans = plan.result()
+            self._logger.debug("Reducing %d characters in %d shards", len(text), len(spans))
+            futures = [
+                executor.submit(_reduce_shard, pipeline.rules, pipeline.fuse, text[start:end]) for start, end in spans
+            ]
+            pending = self._wait(futures, deadline, cancel, progress)
+            if pending:
+                self._stop(kill=True)
+                raise ShardTimeout(f"{len(pending)} of {len(futures)} shards didn't finish in {timeout} s")
+        parts = []
+        for future in futures:
+            part, steps = future.result()
+            for index, counts, elapsed in steps:
+                pipeline.record(index, counts, elapsed)
+            parts.append(part)
+        return "".join(parts)
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def _wait(
+        self,
+        futures: list[concurrent.futures.Future],
+        deadline: float | None,
+        cancel: CancellationToken | None,
+        progress: Progress | None = None,
+    ) -> set[concurrent.futures.Future]:
+        """Waits for ``futures`` until the deadline and returns the ones still pending."""
+        pending = set(futures)
+        cancelled = {cancel.future} if cancel is not None else set()
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = concurrent.futures.wait(pending | cancelled, remaining, concurrent.futures.FIRST_COMPLETED)
+            if cancel is not None and cancel.cancelled:
+                self._stop(kill=True)
+                raise Cancelled()
+            if not done:
+                break
+            pending -= done
+            if progress is not None:
+                progress(len(futures) - len(pending), len(futures))
+        return pending
+
+    def _ensure_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _stop(self, kill: bool = False) -> None:
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        if kill:
+            # A shard stuck in a backtracking rule never returns on its own.
+            executor.kill_workers()
+        executor.shutdown(wait=False, cancel_futures=True)
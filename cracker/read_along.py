@@ -3,7 +3,9 @@
 Pure logic (no Qt/AWS imports) so it can be unit-tested in isolation:
 
 * :class:`WordMark` / :class:`AudioSegment` carry per-word timing alongside each
-  synthesized audio file.
+  synthesized audio file. A segment keeps its marks in :class:`WordMarks`,
+  column by column, and a session its editor spans in :class:`WordSpans`, so a
+  book-length read holds a few arrays rather than millions of objects.
 * :func:`parse_speech_marks` turns AWS Polly's newline-delimited "word" speech
   marks into ``WordMark``s.
 * :func:`align_spoken_to_editor` maps the *spoken* word sequence (from marks)
@@ -15,27 +17,160 @@ Pure logic (no Qt/AWS imports) so it can be unit-tested in isolation:
 import difflib
 import json
 import re
-from dataclasses import dataclass, field
-from typing import Protocol
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping, Sequence
+from dataclasses import dataclass, field, replace
+from itertools import chain, count
+from typing import Protocol, overload
+
+from cracker.text_diff import OffsetMap, iter_edits
 
 _EDGE = re.compile(r"^\W+|\W+$", re.UNICODE)
 _WORD = re.compile(r"\S+")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WordMark:
-    """A single spoken word and when it starts, relative to its segment audio."""
+    """A single spoken word and when it starts, relative to its segment audio.
+
+    ``start`` and ``end`` locate the word in text, or are -1 when unknown. As
+    parsed they are UTF-8 byte offsets into the request sent to Polly; the
+    speaker turns them into character offsets into the text it was asked to
+    read (see :func:`placed_marks`).
+    """
 
     time_ms: int
     value: str
+    start: int = -1
+    end: int = -1
 
 
-@dataclass
+class WordMarks(Sequence[WordMark]):
+    """The word marks of one segment, stored by column.
+
+    Start times and text offsets are ``array``s and the words one string, so
+    a mark costs a few bytes rather than an object. Indexing builds the
+    :class:`WordMark` on demand; the read-along engine works on the columns.
+    """
+
+    __slots__ = ("times", "starts", "ends", "_values", "_value_ends")
+
+    def __init__(self, marks: Iterable[WordMark] = ()) -> None:
+        self.times: array[int] = array("i")
+        self.starts: array[int] = array("i")
+        self.ends: array[int] = array("i")
+        # End of each word in _values.
+        self._value_ends: array[int] = array("i")
+        values = []
+        position = 0
+        for mark in marks:
+            self.times.append(mark.time_ms)
+            self.starts.append(mark.start)
+            self.ends.append(mark.end)
+            values.append(mark.value)
+            position += len(mark.value)
+            self._value_ends.append(position)
+        self._values = "".join(values)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @overload
+    def __getitem__(self, index: int) -> WordMark: ...
+    @overload
+    def __getitem__(self, index: slice) -> "WordMarks": ...
+    def __getitem__(self, index: int | slice) -> "WordMark | WordMarks":
+        if isinstance(index, slice):
+            return WordMarks(self[position] for position in range(*index.indices(len(self))))
+        index = range(len(self))[index]
+        value_start = self._value_ends[index - 1] if index else 0
+        value = self._values[value_start : self._value_ends[index]]
+        return WordMark(self.times[index], value, self.starts[index], self.ends[index])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(mark == other_mark for mark, other_mark in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"WordMarks({list(self)!r})"
+
+    def values(self) -> list[str]:
+        """The spoken words, in order."""
+        return [self._values[start:end] for start, end in zip(chain((0,), self._value_ends), self._value_ends)]
+
+    def located(self) -> bool:
+        """Whether every mark has offsets into its text."""
+        return min(self.starts, default=0) >= 0
+
+
+def word_marks(marks: Iterable[WordMark]) -> WordMarks:
+    """``marks`` as :class:`WordMarks`, without a copy when they already are."""
+    return marks if isinstance(marks, WordMarks) else WordMarks(marks)
+
+
+@dataclass(frozen=True, slots=True)
 class AudioSegment:
-    """One synthesized audio file plus its (possibly empty) word marks."""
+    """One synthesized audio clip plus its (possibly empty) word marks.
+
+    The audio is either the file at ``path`` or, when it was never written to
+    disk, the encoded bytes in ``data``. In-memory segments still carry a
+    ``path`` such as ``"polly-0.mp3"``; only its extension is used, as a hint
+    for the decoder. ``marks`` may be given as any sequence of marks and is
+    kept as :class:`WordMarks`.
+    """
 
     path: str
-    marks: list[WordMark] = field(default_factory=list)
+    marks: Sequence[WordMark] = field(default_factory=WordMarks)
+    data: bytes | None = None
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "marks", word_marks(self.marks))
+
+
+class WordSpans(MutableMapping[int, tuple[int, int]]):
+    """Editor spans, ``(start, length)`` by spoken-word index.
+
+    Words are numbered through the whole read, so the spans are kept in two
+    arrays indexed by word, with -1 for words that have no span (yet).
+    """
+
+    __slots__ = ("_starts", "_lengths", "_count")
+
+    def __init__(self, spans: Mapping[int, tuple[int, int]] | None = None) -> None:
+        self._starts: array[int] = array("i")
+        self._lengths: array[int] = array("i")
+        self._count = 0
+        if spans:
+            self.update(spans)
+
+    def __getitem__(self, index: int) -> tuple[int, int]:
+        if 0 <= index < len(self._starts) and self._starts[index] >= 0:
+            return self._starts[index], self._lengths[index]
+        raise KeyError(index)
+
+    def __setitem__(self, index: int, span: tuple[int, int]) -> None:
+        if index < 0:
+            raise KeyError(index)
+        if index >= len(self._starts):
+            missing = array("i", [-1]) * (index + 1 - len(self._starts))
+            self._starts += missing
+            self._lengths += missing
+        if self._starts[index] < 0:
+            self._count += 1
+        self._starts[index], self._lengths[index] = span
+
+    def __delitem__(self, index: int) -> None:
+        self[index]
+        self._starts[index] = self._lengths[index] = -1
+        self._count -= 1
+
+    def __iter__(self) -> Iterator[int]:
+        return (index for index, start in enumerate(self._starts) if start >= 0)
+
+    def __len__(self) -> int:
+        return self._count
 
 
 def normalize_word(word: str) -> str:
@@ -64,18 +199,52 @@ def parse_speech_marks(data: bytes | str | None) -> list[WordMark]:
         if not isinstance(obj, dict) or obj.get("type") != "word":
             continue
         try:
-            marks.append(WordMark(time_ms=int(obj["time"]), value=str(obj["value"])))
+            marks.append(
+                WordMark(
+                    time_ms=int(obj["time"]),
+                    value=str(obj["value"]),
+                    start=int(obj.get("start", -1)),
+                    end=int(obj.get("end", -1)),
+                )
+            )
         except KeyError, TypeError, ValueError:
             continue
     return marks
 
 
+def placed_marks(marks: Iterable[WordMark], offsets: Iterable[OffsetMap]) -> WordMarks:
+    """Marks with their offsets passed back through ``offsets`` in order; unknown offsets stay unknown."""
+    offsets = list(offsets)
+    placed = []
+    for mark in marks:
+        start, end = mark.start, mark.end
+        if start >= 0 and end >= start:
+            for offset_map in offsets:
+                start, end = offset_map.source(start), offset_map.source(end)
+        placed.append(replace(mark, start=start, end=end))
+    return WordMarks(placed)
+
+
+def _located_spans(marks: Sequence[WordMark], first_index: int, offsets: OffsetMap) -> dict[int, tuple[int, int]]:
+    """Editor spans of marks that carry offsets into the read text, found through ``offsets``."""
+    columns = word_marks(marks)
+    spans: dict[int, tuple[int, int]] = {}
+    for index, mark_start, mark_end in zip(count(first_index), columns.starts, columns.ends):
+        if mark_start < 0:
+            continue
+        start, end = offsets.source(mark_start), offsets.source(mark_end)
+        if end > start:
+            spans[index] = (start, end - start)
+    return spans
+
+
 def align_spoken_to_editor(spoken_words: list[str], editor_text: str) -> dict[int, tuple[int, int]]:
     """Maps spoken-word index -> (char start, length) in ``editor_text``.
 
     Uses a sequence alignment so removed/added tokens (parser rules stripping
     citations, ``&`` -> "and", etc.) and repeated words line up positionally
-    instead of by naive value matching.
+    instead of by naive value matching. This is the fallback for marks
+    without offsets; it's quadratic at worst, so long texts align slowly.
     """
     editor_tokens = [(m.start(), len(m.group()), normalize_word(m.group())) for m in _WORD.finditer(editor_text)]
     spoken_norm = [normalize_word(word) for word in spoken_words]
@@ -119,32 +288,50 @@ class ProgressSource(Protocol):
 
 
 class MarksProgressSource:
-    """Accurate progress from Polly per-segment word marks (real audio time)."""
+    """Accurate progress from Polly per-segment word marks (real audio time).
 
-    def __init__(self, segment_marks: list[list[WordMark]]):
-        self._segments = segment_marks
-        self._offsets: list[int] = []
-        running = 0
+    Each segment keeps only its word start times, in a compact ``array`` and in
+    time order as speech marks come, so a playback position is found by
+    bisection rather than by scanning the segment's words.
+    """
+
+    def __init__(self, segment_marks: Iterable[Sequence[WordMark]]):
+        self._times: list[array[int]] = []
+        # Global index of each segment's first word.
+        self._offsets: array[int] = array("i")
+        self.total = 0
         for segment in segment_marks:
-            self._offsets.append(running)
-            running += len(segment)
-        self.total = running
+            self.add_segment(segment)
+
+    def add_segment(self, marks: Sequence[WordMark]) -> None:
+        """Appends a segment that was queued after the read started."""
+        # Shared with the marks, which are never changed.
+        self._times.append(word_marks(marks).times)
+        self._offsets.append(self.total)
+        self.total += len(marks)
 
     def progress(self, *, segment_index: int, position_ms: int, elapsed_sec: float = 0.0) -> Progress | None:
-        if segment_index < 0 or segment_index >= len(self._segments):
+        if segment_index < 0 or segment_index >= len(self._times):
             return None
-        local = -1
-        for offset, mark in enumerate(self._segments[segment_index]):
-            if mark.time_ms <= position_ms:
-                local = offset
-            else:
-                break
+        local = bisect_right(self._times[segment_index], position_ms) - 1
         if local < 0:
             return None
         index = self._offsets[segment_index] + local
         fraction = (index + 1) / self.total if self.total else 1.0
         return Progress(word_index=index, words_done=index + 1, fraction=fraction)
 
+    def first_word(self, segment_index: int) -> int:
+        """Global index of the first word of segment ``segment_index``."""
+        return self._offsets[segment_index]
+
+    def time_of(self, word_index: int) -> tuple[int, int] | None:
+        """Segment index and start time (ms) of the word at ``word_index``, e.g. to seek to it."""
+        if word_index < 0 or word_index >= self.total:
+            return None
+        # The last segment starting at or before the word; empty segments before it share its offset.
+        segment_index = bisect_right(self._offsets, word_index) - 1
+        return segment_index, self._times[segment_index][word_index - self._offsets[segment_index]]
+
 
 class EstimateProgressSource:
     """Fallback progress paced by a speed-derived words-per-minute estimate."""
@@ -161,44 +348,93 @@ class EstimateProgressSource:
 
 @dataclass
 class ReadAlongSession:
-    """Everything the runtime needs for one read: context, spans, progress source."""
+    """Everything the runtime needs for one read: context, spans, progress source.
+
+    ``word_spans`` fills in as the read goes: marks with offsets are placed a
+    segment at a time (:meth:`resolve_segment`, called as segments start) and
+    estimated words as the highlight reaches them, so starting a session
+    doesn't cost a pass over the whole document. :meth:`highlight_for`
+    resolves anything it's asked for that isn't placed yet.
+    """
 
     source: str
     doc_len: int
     total: int
-    word_spans: dict[int, tuple[int, int]]
+    word_spans: WordSpans
     progress_source: ProgressSource
     index: int = -1
+    segments: int = 0
+    # Takes offsets in the read text back to the editor's, while every mark so far has had offsets.
+    offsets: OffsetMap | None = None
+    # Marks of the segments whose words aren't placed yet, by segment index.
+    unresolved: dict[int, WordMarks] = field(default_factory=dict)
+    # Editor words of an estimate session that aren't in word_spans yet.
+    tokens: Iterator[re.Match[str]] | None = field(default=None, repr=False)
 
     def highlight_for(self, word_index: int) -> tuple[int, int] | None:
+        if word_index not in self.word_spans:
+            self._resolve_word(word_index)
         return self.word_spans.get(word_index)
 
+    def resolve_segment(self, segment_index: int) -> None:
+        """Places the words of segment ``segment_index`` in the editor, unless that's done already."""
+        marks = self.unresolved.pop(segment_index, None)
+        if marks is None or self.offsets is None:
+            return
+        assert isinstance(self.progress_source, MarksProgressSource)
+        first_index = self.progress_source.first_word(segment_index)
+        self.word_spans.update(_located_spans(marks, first_index, self.offsets))
+
+    def _resolve_word(self, word_index: int) -> None:
+        if isinstance(self.progress_source, MarksProgressSource):
+            located = self.progress_source.time_of(word_index)
+            if located is not None:
+                self.resolve_segment(located[0])
+            return
+        while self.tokens is not None and len(self.word_spans) <= word_index:
+            match = next(self.tokens, None)
+            if match is None:
+                self.tokens = None
+                return
+            self.word_spans[len(self.word_spans)] = (match.start(), match.end() - match.start())
+
 
 def build_session(
     *,
     source: str,
     editor_text: str,
     read_text: str,
-    segment_marks: list[list[WordMark]],
+    segment_marks: Sequence[Sequence[WordMark]],
     wpm: int,
 ) -> ReadAlongSession:
     """Builds a session, picking marks vs estimate and resolving editor spans.
 
     ``source`` is "textarea" (highlight the editor) or "clipboard" (no editor
-    spans, but still pace/count by ``read_text``).
+    spans, but still pace/count by ``read_text``). For "textarea",
+    ``read_text`` is the editor text after the parser rules, which is what
+    the speaker read; marks whose offsets point into it are placed in the
+    editor through a diff of the two texts that is only computed as far as
+    the read has got. Marks without offsets are aligned word by word up front
+    instead.
     """
+    offsets = None
+    unresolved: dict[int, WordMarks] = {}
+    tokens = None
+    word_spans = WordSpans()
     if any(segment_marks):
-        spoken = [mark.value for segment in segment_marks for mark in segment]
-        total = len(spoken)
-        word_spans = align_spoken_to_editor(spoken, editor_text) if source == "textarea" else {}
-        progress_source: ProgressSource = MarksProgressSource(segment_marks)
+        columns = [word_marks(marks) for marks in segment_marks]
+        total = sum(map(len, columns))
+        if source == "textarea" and all(marks.located() for marks in columns):
+            offsets = _reduction_offsets(editor_text, read_text)
+            unresolved = dict(enumerate(columns))
+        elif source == "textarea":
+            word_spans = WordSpans(align_spoken_to_editor(_spoken(columns), editor_text))
+        progress_source: ProgressSource = MarksProgressSource(columns)
     elif source == "textarea":
-        tokens = [(match.start(), len(match.group())) for match in _WORD.finditer(editor_text)]
-        word_spans = {index: span for index, span in enumerate(tokens)}
-        total = len(tokens)
+        total = len(_WORD.findall(editor_text))
+        tokens = _WORD.finditer(editor_text)
         progress_source = EstimateProgressSource(total, wpm)
     else:
-        word_spans = {}
         total = len(_WORD.findall(read_text))
         progress_source = EstimateProgressSource(total, wpm)
 
@@ -208,4 +444,46 @@ def build_session(
         total=total,
         word_spans=word_spans,
         progress_source=progress_source,
+        segments=len(segment_marks),
+        offsets=offsets,
+        unresolved=unresolved,
+        tokens=tokens,
     )
+
+
+def _reduction_offsets(editor_text: str, read_text: str) -> OffsetMap:
+    if not read_text:
+        # The reduced text wasn't passed on, so offsets are taken to be the editor's.
+        return OffsetMap()
+    return OffsetMap(iter_edits(editor_text, read_text), old=editor_text)
+
+
+def extend_session(session: ReadAlongSession, *, editor_text: str, segment_marks: Sequence[Sequence[WordMark]]) -> None:
+    """Folds segments streamed in after the read started into a marks session.
+
+    Estimate sessions are paced by the whole text up front, so only marks
+    sessions grow. The new segments wait to be placed through the session's
+    offsets; once a segment comes without them, the editor spans are
+    re-aligned over all spoken words.
+    """
+    progress_source = session.progress_source
+    if not isinstance(progress_source, MarksProgressSource) or len(segment_marks) <= session.segments:
+        return
+    added = {index: word_marks(segment_marks[index]) for index in range(session.segments, len(segment_marks))}
+    for marks in added.values():
+        progress_source.add_segment(marks)
+    session.segments = len(segment_marks)
+    session.total = progress_source.total
+    if session.source != "textarea":
+        return
+    if session.offsets is not None and all(marks.located() for marks in added.values()):
+        session.unresolved.update(added)
+    else:
+        session.offsets = None
+        session.unresolved.clear()
+        spoken = _spoken([word_marks(marks) for marks in segment_marks])
+        session.word_spans = WordSpans(align_spoken_to_editor(spoken, editor_text))
+
+
+def _spoken(segment_marks: Iterable[WordMarks]) -> list[str]:
+    return [word for marks in segment_marks for word in marks.values()]
@@ -12,7 +12,7 @@ from PyQt6.QtCore import QObject, QTimer
 from PyQt6.QtMultimedia import QMediaPlayer
 
 from cracker.audio_player import AudioPlayer
-from cracker.read_along import Progress, ReadAlongSession, build_session
+from cracker.read_along import Progress, ReadAlongSession, build_session, extend_session
 
 
 class ReadAlongView(Protocol):
@@ -40,34 +40,83 @@ class ReadAlongController(QObject):
         self._pending_source = "textarea"
         self._pending_text = ""
         self._session: ReadAlongSession | None = None
+        # The editor's text as the read started; the editor is read-only until it ends.
+        self._editor_text = ""
         self._mode = "idle"
         self._elapsed = 0.0
 
         player.readStarted.connect(self._on_started)
         player.readFinished.connect(self._on_finished)
+        player.segmentStarted.connect(self._on_segment_started)
+        player.segmentQueued.connect(self._on_segment_queued)
         player.positionChanged.connect(self._on_position)
         player.playbackStateChanged.connect(self._on_state)
 
     def set_read_context(self, source: str, text: str = "") -> None:
-        """Set by the controller before each read: 'textarea' or 'clipboard'."""
+        """Set by the controller before each read: 'textarea', 'clipboard' or 'file'."""
         self._pending_source = source
         self._pending_text = text
 
     def _on_started(self) -> None:
+        self._editor_text = self._view.editor_text()
+        self._start_session()
+        self._elapsed = 0.0
+        self._view.set_reading_readonly(True)
+        self._view.set_read_progress(0)
+        self._view.set_read_status(reading=True, words_done=0, total=self._session.total)
+        # The estimate timer starts on PlayingState (see _on_state), not here, so
+        # it doesn't advance during media load / stalls / invalid media.
+
+    def _start_session(self) -> None:
         self._session = build_session(
             source=self._pending_source,
-            editor_text=self._view.editor_text(),
+            editor_text=self._editor_text,
             read_text=self._pending_text,
             segment_marks=self._player.segment_marks(),
             wpm=self._view.current_wpm(),
         )
         self._mode = "marks" if self._player.has_marks else "estimate"
-        self._elapsed = 0.0
-        self._view.set_reading_readonly(True)
-        self._view.set_read_progress(0)
-        self._view.set_read_status(reading=True, words_done=0, total=self._session.total)
-        # The estimate timer starts on PlayingState (see _on_state), not here, so
-        # it doesn't advance during media load / stalls / invalid media.
+
+    def _on_segment_started(self, index: int) -> None:
+        # Words are placed in the editor a segment at a time: the one starting
+        # now, if the highlight hasn't asked for it already, and the next one
+        # once the event loop is idle, so it's ready before it plays.
+        if self._session is None or self._mode != "marks":
+            return
+        self._session.resolve_segment(index)
+        self._prefetch(index + 1)
+
+    def _on_segment_queued(self, index: int) -> None:
+        # Streamed reads start before every segment is synthesized; fold late
+        # segments (and their marks) into the running session as they arrive.
+        # A read whose first segments came without marks is estimated until
+        # the first marked one, which rebuilds the session on all the marks.
+        if self._session is None or index < self._session.segments:
+            return
+        if self._mode == "estimate":
+            if not self._player.has_marks:
+                return
+            self._timer.stop()
+            self._start_session()
+        elif self._mode == "marks":
+            extend_session(
+                self._session,
+                editor_text=self._editor_text,
+                segment_marks=self._player.segment_marks(),
+            )
+        else:
+            return
+        if index == self._player.current_segment() + 1:
+            self._prefetch(index)
+
+    def _prefetch(self, index: int) -> None:
+        session = self._session
+
+        def resolve() -> None:
+            if self._session is session and session is not None:
+                session.resolve_segment(index)
+
+        QTimer.singleShot(0, resolve)
 
     def _on_position(self, position_ms: int) -> None:
         if self._session is None or self._mode != "marks":
@@ -102,6 +151,7 @@ class ReadAlongController(QObject):
     def _on_finished(self) -> None:
         self._timer.stop()
         self._session = None
+        self._editor_text = ""
         self._mode = "idle"
         self._view.clear_highlight()
         self._view.set_reading_readonly(False)
@@ -0,0 +1,110 @@
+"""Runs the Reduce, Wiki and Citation actions off the GUI thread.
+
+Reducing a large document can take seconds, so the main window hands the
+editor's text to a :class:`ReductionWorker` and keeps responding. Progress,
+results and failures come back through signals, which are delivered on the
+GUI thread. A result arrives as the edits that turn the job's text into the
+reduced one (see :mod:`cracker.text_diff`), and the caller applies them only
+if the document hasn't changed since the job took its text.
+"""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.text_diff import diff_edits, utf16_edits
+from cracker.text_rules import Progress
+from cracker.utils import get_logger
+
+# Reduces a text, e.g. ``TextParser.reduce``: ``reduce(text, cancel=..., progress=...)`` returns
+# the reduced text and the names of the rules it skipped.
+Reduction = Callable[..., tuple[str, list[str]]]
+
+
+@dataclass
+class ReductionJob:
+    """One run of an action on the text of a given document revision."""
+
+    name: str
+    revision: int
+    token: CancellationToken = field(default_factory=CancellationToken)
+
+
+class ReductionWorker(QObject):
+    """Reduces one text at a time on a background thread.
+
+    Starting a job cancels the previous one, as does :meth:`cancel`. Signals of
+    a cancelled job may still be queued, so receivers ignore jobs whose token
+    is cancelled.
+    """
+
+    progress = pyqtSignal(object, int)
+    # The job, the TextEdits, in UTF-16 offsets as Qt counts them, and the names of the skipped rules.
+    finished = pyqtSignal(object, object, object)
+    failed = pyqtSignal(object, object)
+    _logger = get_logger(__name__)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reduction-worker")
+        self._job: ReductionJob | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._job is not None
+
+    def start(self, name: str, reduce: Reduction, text: str, revision: int) -> ReductionJob:
+        """Queues ``reduce(text)``; ``revision`` identifies the document state the text came from."""
+        self.cancel()
+        job = ReductionJob(name, revision)
+        self._job = job
+        self._executor.submit(self._run, job, reduce, text)
+        return job
+
+    def done(self, job: ReductionJob) -> None:
+        """Forgets ``job`` once its result or failure has been handled."""
+        if self._job is job:
+            self._job = None
+
+    def cancel(self) -> None:
+        """Cancels the current job, if any."""
+        if self._job is not None:
+            self._job.token.cancel()
+            self._job = None
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: ReductionJob, reduce: Reduction, text: str) -> None:
+        if job.token.cancelled:
+            return
+        try:
+            reduced, skipped = reduce(text, cancel=job.token, progress=self._reporter(job))
+            edits = utf16_edits(text, diff_edits(text, reduced))
+        except Cancelled:
+            self._logger.debug("%s cancelled", job.name)
+            return
+        except Exception as error:
+            if job.token.cancelled:
+                return
+            self._logger.exception("%s failed", job.name)
+            self.failed.emit(job, error)
+            return
+        if not job.token.cancelled:
+            self.finished.emit(job, edits, skipped)
+
+    def _reporter(self, job: ReductionJob) -> Progress:
+        last = -1
+
+        def report(done: int, total: int) -> None:
+            nonlocal last
+            percent = 100 * done // total if total else 100
+            if percent != last and not job.token.cancelled:
+                last = percent
+                self.progress.emit(job, percent)
+
+        return report
@@ -0,0 +1,171 @@
+"""Runs the user's parser rules with a time budget per rule.
+
+A regex with nested quantifiers can backtrack for minutes on an unlucky
+paste, and Python's ``re`` can't be interrupted from another thread. The
+:class:`RuleGuard` applies the rules in a helper process instead: it reports
+after every pass, and a pass that overruns its budget gets the process
+killed. That pass is then skipped and reported, and the run starts again
+without it.
+"""
+
+import multiprocessing
+import threading
+from multiprocessing.connection import Connection
+from typing import Any
+
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.text_rules import Progress, Rule, RulePipeline
+from cracker.utils import get_logger
+
+
+class _PassTimeout(Exception):
+    def __init__(self, index: int):
+        super().__init__(index)
+        self.index = index
+
+
+def _serve(connection: Connection) -> None:
+    """Helper process: applies the requested rules and reports after every pass."""
+    pipeline: RulePipeline | None = None
+    key: tuple[tuple[Rule, ...], bool] | None = None
+    connection.send(None)  # ready; start-up time doesn't count against the first rule
+    while True:
+        try:
+            rules, fuse, text, skip = connection.recv()
+        except EOFError:
+            return
+        if key != (rules, fuse):
+            key = (rules, fuse)
+            pipeline = RulePipeline(rules, fuse=fuse)
+        assert pipeline is not None
+        for index, text, counts, elapsed in pipeline.run(text, skip):
+            connection.send((index, counts, elapsed))
+        connection.send(text)
+
+
+class RuleGuard:
+    """Applies a :class:`RulePipeline` in a helper process, giving each pass ``budget`` seconds."""
+
+    _logger = get_logger(__name__)
+
+    # Seconds the helper process may take to start.
+    START_TIMEOUT = 30.0
+
+    def __init__(self, budget: float = 1.0):
+        self.budget = budget
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._process: Any = None
+        self._connection: Connection | None = None
+
+    def apply(
+        self,
+        pipeline: RulePipeline,
+        text: str,
+        cancel: CancellationToken | None = None,
+        progress: Progress | None = None,
+    ) -> tuple[str, list[str]]:
+        """Returns the reduced text and the names of the rules skipped for overrunning the budget.
+
+        ``progress(done, total)`` is called after each pass. Cancelling
+        ``cancel`` kills the helper mid-pass and raises
+        :class:`~cracker.cancellation.Cancelled`. Falls back to applying the
+        rules in this process if the helper can't be used.
+        """
+        skip: set[int] = set()
+        with self._lock:
+            # Registered under the lock, so a cancel never kills another caller's run.
+            unregister = cancel.add_callback(self._interrupt) if cancel is not None else None
+            try:
+                text_out = self._apply(pipeline, text, skip, cancel, progress)
+            finally:
+                if unregister is not None:
+                    unregister()
+        skipped = [name for index in sorted(skip) for name in pipeline.passes[index]]
+        return text_out, skipped
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def _apply(
+        self,
+        pipeline: RulePipeline,
+        text: str,
+        skip: set[int],
+        cancel: CancellationToken | None,
+        progress: Progress | None,
+    ) -> str:
+        while True:
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            try:
+                return self._run(pipeline, text, skip, progress)
+            except _PassTimeout as timeout:
+                self._raise_if_cancelled(cancel)
+                names = pipeline.passes[timeout.index]
+                self._logger.warning(
+                    "Parser rule(s) %s exceeded %.1f s and were skipped", ", ".join(names), self.budget
+                )
+                pipeline.record_timeout(timeout.index)
+                skip.add(timeout.index)
+                self._stop()
+            except (OSError, EOFError, ValueError) as error:
+                self._raise_if_cancelled(cancel)
+                self._logger.error("Parser rule helper failed, applying rules directly: %s", error)
+                self._stop()
+                text_out = text
+                for index, text_out, counts, elapsed in pipeline.run(text, skip):
+                    pipeline.record(index, counts, elapsed)
+                return text_out
+
+    def _raise_if_cancelled(self, cancel: CancellationToken | None) -> None:
+        """Turns the failure a cancel caused (the helper was killed) into :class:`Cancelled`."""
+        if cancel is not None and cancel.cancelled:
+            self._stop()
+            raise Cancelled()
+
+    def _interrupt(self) -> None:
+        # Runs on the cancelling thread, so it only kills; `apply` cleans up.
+        process = self._process
+        if process is not None:
+            process.kill()
+
+    def _run(self, pipeline: RulePipeline, text: str, skip: set[int], progress: Progress | None = None) -> str:
+        connection = self._ensure_started()
+        connection.send((pipeline.rules, pipeline.fuse, text, skip))
+        for index in range(len(pipeline.passes)):
+            if index in skip:
+                continue
+            if not connection.poll(self.budget):
+                raise _PassTimeout(index)
+            done, counts, elapsed = connection.recv()
+            pipeline.record(done, counts, elapsed)
+            if progress is not None:
+                progress(done + 1, len(pipeline.passes))
+        if not connection.poll(self.budget):
+            raise TimeoutError("Parser rule helper didn't return the text")
+        return connection.recv()
+
+    def _ensure_started(self) -> Connection:
+        if self._process is not None and self._process.is_alive() and self._connection is not None:
+            return self._connection
+        self._stop()
+        parent, child = self._context.Pipe()
+        process = self._context.Process(target=_serve, args=(child,), name="parser-rules", daemon=True)
+        process.start()
+        child.close()
+        self._process, self._connection = process, parent
+        if not parent.poll(self.START_TIMEOUT):
+            raise TimeoutError("Parser rule helper didn't start")
+        parent.recv()
+        return parent
+
+    def _stop(self) -> None:
+        process, connection = self._process, self._connection
+        self._process = self._connection = None
+        if connection is not None:
+            connection.close()
+        if process is not None:
+            process.kill()
+            process.join(1)
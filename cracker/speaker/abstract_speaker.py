@@ -1,5 +1,17 @@
 import abc
 import re
+from collections.abc import Iterable
+
+from cracker.audio_cache import AudioCache
+from cracker.cancellation import CancellationToken
+from cracker.read_along import AudioSegment
+from cracker.text_diff import OffsetMap, substitute
+from cracker.utils import get_logger
+
+from .pipeline import SegmentSink, stream_segments
+
+# What `clean_text` drops before the cleaners run.
+_CONTROL_CHARS = re.compile("[\x00-\x07]")
 
 
 class AbstractSpeaker(abc.ABC):
@@ -7,27 +19,67 @@ class AbstractSpeaker(abc.ABC):
     Abstract class for all `Speaker` classes.
 
     To be inherited only.
+
+    ``read_text`` blocks until the whole text is synthesized and queued, so it
+    is called from :class:`~cracker.synthesis_worker.SynthesisWorker` rather
+    than the GUI thread. It should stop early once ``cancel`` is cancelled.
     """
 
-    TMP_FILEPATH = "tmp.mp3"
+    _logger = get_logger(__name__)
+
     RATES = []
     VOLUMES = []
+    player: SegmentSink
+    # Shared on-disk audio cache consulted before any network synthesis.
+    cache: AudioCache | None = None
     text_cleaners = [
         (re.compile(r"\n"), ". "),
         (re.compile(r"&"), "and"),
     ]
 
     @abc.abstractmethod
-    def read_text(self, text: str, **config) -> None:
+    def read_text(self, text: str, cancel: CancellationToken | None = None, **config) -> None:
         raise NotImplementedError(f"Class {self.__class__.__name__} doesn't implement `read_text()`")
 
+    def read_blocks(self, blocks: Iterable[str], cancel: CancellationToken | None = None, **config) -> None:
+        """Reads out a text that arrives in blocks, such as a file that is still being read.
+
+        Speakers that synthesize in chunks override this to start on the first
+        blocks while later ones are produced; this default waits for them all.
+        """
+        self.read_text("".join(blocks), cancel, **config)
+
     @abc.abstractmethod
     def stop_text(self) -> None:
         raise NotImplementedError(f"Class {self.__class__.__name__} doesn't implement `stop_text()`")
 
+    def close(self) -> None:
+        """Releases connections or threads the speaker holds; it isn't used afterwards."""
+
+    def report_error(self, error: Exception) -> None:
+        """Tells the user a read failed; called on the GUI thread."""
+        self._logger.error("Failed to read text with %s: %s", self.__class__.__name__, error)
+
     @classmethod
     def clean_text(cls, text):
         text = text.translate(dict.fromkeys(range(8)))
         for compiled_regex, sub in cls.text_cleaners:
             text = compiled_regex.sub(sub, text)
         return text
+
+    @classmethod
+    def clean_text_offsets(cls, text: str) -> tuple[str, list[OffsetMap]]:
+        """`clean_text`, also returning maps that take offsets in the cleaned text back to ``text``.
+
+        The maps are applied in order, as :func:`~cracker.read_along.placed_marks` does.
+        """
+        text, edits = substitute(_CONTROL_CHARS, "", text)
+        passes = [edits]
+        for compiled_regex, sub in cls.text_cleaners:
+            text, edits = substitute(compiled_regex, sub, text)
+            passes.append(edits)
+        return text, [OffsetMap(edits) for edits in reversed(passes) if edits]
+
+    def _stream_segments(self, segments: Iterable[AudioSegment], cancel: CancellationToken | None = None) -> None:
+        """Plays segments as they are synthesized, replacing the player's current read."""
+        stream_segments(self.player, segments, cancel)
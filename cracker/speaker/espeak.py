@@ -1,15 +1,31 @@
 import os
 import subprocess
+from collections.abc import Iterable
+from functools import partial
 
+from cracker.cancellation import CancellationToken
+from cracker.mp3_helper import create_filename
+from cracker.read_along import AudioSegment
 from cracker.speaker import ESPEAK_LANGUAGES
+from cracker.text_parser import TextParser
 from cracker.utils import get_logger
 
 from .abstract_speaker import AbstractSpeaker
+from .pipeline import ordered_map
+
+
+class EspeakError(RuntimeError):
+    """Raised when an espeak process fails to render a chunk."""
 
 
 class Espeak(AbstractSpeaker):
     """
     Uses Unix `espeak` command line interfrace.
+
+    In parallel mode the text is split into sentence-aligned chunks that are
+    rendered by several espeak processes at once and played in order as they
+    finish; otherwise the whole text is rendered by one process first. Either
+    way espeak writes to its stdout, never to a shared file.
     """
 
     _logger = get_logger(__name__)
@@ -19,29 +35,71 @@ class Espeak(AbstractSpeaker):
     VOLUMES = range(100)
 
     LANGUAGES = ESPEAK_LANGUAGES
+    TMP_WAV_FILEPATH = "espeak.wav"
+
+    parallel = True
+    # Characters per chunk after the first sentence, which is rendered alone to start playback early.
+    chunk_chars = 500
 
-    def __init__(self, player):
+    def __init__(
+        self,
+        player,
+        parallel: bool | None = None,
+        max_concurrency: int | None = None,
+        chunk_chars: int | None = None,
+    ):
         self.player = player
+        if parallel is not None:
+            self.parallel = parallel
+        # 0 (or unset) runs one espeak process per core.
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        if chunk_chars is not None:
+            self.chunk_chars = max(0, chunk_chars)
 
     def __del__(self):
         self.stop_text()
 
-    def read_text(self, text: str, **config) -> None:
+    def read_text(self, text: str, cancel: CancellationToken | None = None, **config) -> None:
         self._logger.debug("Reading text: %s", text)
-        filepath = os.path.abspath(AbstractSpeaker.TMP_FILEPATH)
-        command = ["espeak"]
-        command += self._process_config(**config)
-        command += ["-w", filepath]
-        command.append("'{}'".format(self.clean_text(text)))
-        subprocess.call(command)
-        self.play_file(filepath)
-        return
-
-    def play_file(self, filepath):
-        """Plays mp3 file using UNIX cmd. Returns pid to the process."""
-        self._logger.debug("Playing file: %s", filepath)
-        self.player.play_file(filepath)
-        return
+        if self.parallel:
+            self._read_parallel((text,), cancel, **config)
+            return
+        # Rendered to memory like a parallel chunk, so concurrent reads don't share a file.
+        segment = self._render_part(0, self.clean_text(text), options=self._process_config(**config), cancel=cancel)
+        self._stream_segments([segment], cancel)
+
+    def read_blocks(self, blocks: Iterable[str], cancel: CancellationToken | None = None, **config) -> None:
+        if not self.parallel:
+            super().read_blocks(blocks, cancel, **config)
+            return
+        self._read_parallel(blocks, cancel, **config)
+
+    def _read_parallel(self, blocks: Iterable[str], cancel: CancellationToken | None = None, **config) -> None:
+        sentences = (
+            sentence for block in blocks for sentence in TextParser.split_text_per_sentence(self.clean_text(block))
+        )
+        chunks = TextParser.pack_sentences(sentences, self.chunk_chars)
+        render = partial(self._render_part, options=self._process_config(**config), cancel=cancel)
+        self._stream_segments(ordered_map(render, chunks, self.max_concurrency, cancel), cancel)
+
+    def _render_part(
+        self, idx: int, text: str, *, options: list[str], cancel: CancellationToken | None = None
+    ) -> AudioSegment:
+        """Renders one chunk to in-memory WAV audio with its own espeak process."""
+        command = ["espeak", *options, "--stdout", "--stdin"]
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        unregister = cancel.add_callback(process.kill) if cancel is not None else None
+        try:
+            audio, errors = process.communicate(text.encode("utf-8"))
+        finally:
+            if unregister is not None:
+                unregister()
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        if process.returncode != 0:
+            message = errors.decode("utf-8", errors="replace").strip()
+            raise EspeakError(f"espeak failed on part {idx}: {message or process.returncode}")
+        return AudioSegment(path=create_filename(self.TMP_WAV_FILEPATH, idx), data=audio)
 
     def stop_text(self):
         self.player.stop()
@@ -0,0 +1,73 @@
+"""A long-lived asyncio event loop on its own thread.
+
+Async speakers keep one loop (and the connection pools bound to it) for their
+whole lifetime instead of paying for a fresh loop and fresh connections on
+every ``asyncio.run``. Synchronous callers, such as the synthesis worker,
+submit coroutines and wait on the returned futures.
+"""
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+R = TypeVar("R")
+
+
+class EventLoopThread:
+    """Runs an event loop on a daemon thread, started on first use."""
+
+    def __init__(self, name: str = "event-loop"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run, args=(self._loop,), name=self.name, daemon=True)
+                self._thread.start()
+            return self._loop
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def submit(self, coroutine: Coroutine[Any, Any, R]) -> Future[R]:
+        """Schedules ``coroutine`` on the loop; cancelling the future cancels the task."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        if thread is not threading.current_thread():
+            try:
+                asyncio.run_coroutine_threadsafe(self._cancel_tasks(), loop).result(timeout)
+            except Exception:
+                pass
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+        if not thread.is_alive() and not loop.is_running():
+            loop.close()
+
+    @staticmethod
+    async def _cancel_tasks() -> None:
+        """Lets tasks still running finish their cancellation before the loop stops."""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.get_running_loop().shutdown_asyncgens()
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
@@ -0,0 +1,62 @@
+"""Builds speakers from the application configuration.
+
+Shared by the GUI and the headless ``cracker synth`` command, so both pick up
+the same per-speaker settings.
+"""
+
+from typing import Any
+
+from cracker.audio_cache import AudioCache
+from cracker.utils import get_logger
+
+from .abstract_speaker import AbstractSpeaker
+from .espeak import Espeak
+from .frogger import Frogger
+from .google import Google
+from .pipeline import SegmentSink
+from .polly import Polly
+
+SPEAKERS: dict[str, type[AbstractSpeaker]] = {
+    speaker.__name__.lower(): speaker for speaker in [Polly, Espeak, Google, Frogger]
+}
+
+_logger = get_logger(__name__)
+
+
+def create_speaker(
+    speaker_name: str, player: SegmentSink, config: dict[str, Any], cache: AudioCache | None = None
+) -> AbstractSpeaker:
+    """Returns the speaker called ``speaker_name`` (any case), set up from ``config``.
+
+    ``config`` is the dict returned by ``Configuration.read_config``.
+    """
+    _name = speaker_name.lower()
+    if _name == Polly.__name__.lower():
+        _logger.info("Using AWS Polly")
+        return Polly(player, cache=cache)
+    elif _name == Google.__name__.lower():
+        _logger.info("Using Google TTS")
+        google_config = config.get("google", {})
+        credentials_file = google_config.get("credentials_file")
+        _logger.debug("Using credentials file: %s", credentials_file)
+        return Google(player, credentials_file, cache=cache, max_concurrency=google_config.get("max_concurrency"))
+    elif _name == Espeak.__name__.lower():
+        _logger.info("Using ESpeak")
+        espeak_config = config.get("espeak", {})
+        return Espeak(
+            player,
+            parallel=espeak_config.get("parallel"),
+            max_concurrency=espeak_config.get("max_concurrency"),
+            chunk_chars=espeak_config.get("chunk_chars"),
+        )
+    elif _name == Frogger.__name__.lower():
+        _logger.info("Using Frogger")
+        frogger_config = config.get("frogger", {})
+        return Frogger(
+            player,
+            cache=cache,
+            max_concurrency=frogger_config.get("max_concurrency"),
+            batch_chars=frogger_config.get("batch_chars"),
+            http2=frogger_config.get("http2"),
+        )
+    raise ValueError(f"No speaker was selected. Provided speaker name '{speaker_name}'")
@@ -1,13 +1,22 @@
 import asyncio
-from typing import List
+import importlib.util
+import os
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import chain
 
 import httpx
 
+from cracker.audio_cache import AudioCache
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.read_along import AudioSegment
 from cracker.speaker import FROGGER_LANGUAGES
 from cracker.text_parser import TextParser
 from cracker.utils import get_logger
 
 from .abstract_speaker import AbstractSpeaker
+from .event_loop import EventLoopThread
 
 
 class FroggerError(RuntimeError):
@@ -16,7 +25,10 @@ class FroggerError(RuntimeError):
 
 class Frogger(AbstractSpeaker):
     """
-    Uses Unix `espeak` command line interfrace.
+    Uses a local Frogger TTS server.
+
+    Requests go through one keep-alive ``httpx.AsyncClient`` that lives on the
+    speaker's own event loop thread, so connections are reused across reads.
     """
 
     _logger = get_logger(__name__)
@@ -29,26 +41,84 @@ class Frogger(AbstractSpeaker):
     URL = "http://localhost:8000/tts"
     TIMEOUT_SECONDS = 30.0
 
-    def __init__(self, player):
-        self.player = player
-
-    def __del__(self):
-        player = getattr(self, "player", None)
-        if player is not None:
-            player.stop()
+    # Requests in flight at once, which also caps the pooled connections.
+    max_concurrency = 4
+    # Short sentences after the first are joined into requests of up to this many characters (0 disables).
+    batch_chars = 300
+    http2 = False
 
-    def read_text(self, text: str, **config) -> None:
+    def __init__(
+        self,
+        player,
+        cache: AudioCache | None = None,
+        max_concurrency: int | None = None,
+        batch_chars: int | None = None,
+        http2: bool | None = None,
+    ):
+        self.player = player
+        self.cache = cache
+        if max_concurrency is not None:
+            self.max_concurrency = max(1, max_concurrency)
+        if batch_chars is not None:
+            self.batch_chars = max(0, batch_chars)
+        if http2 is not None:
+            self.http2 = http2
+        self._loop_thread = EventLoopThread(name="frogger")
+        self._client: httpx.AsyncClient | None = None
+
+    def close(self) -> None:
+        """Closes the pooled client and stops the event loop thread.
+
+        It waits on the loop, so the owner calls it explicitly rather than
+        leaving it to the garbage collector on an arbitrary thread.
+        """
+        if self._client is not None and self._loop_thread.running:
+            try:
+                self._loop_thread.submit(self._client.aclose()).result(timeout=self.TIMEOUT_SECONDS)
+            except Exception as error:
+                self._logger.debug("Failed to close the Frogger client: %s", error)
+        self._client = None
+        self._loop_thread.stop()
+
+    def read_text(self, text: str, cancel: CancellationToken | None = None, **config) -> None:
         self._logger.debug("Reading text: %s", text)
-        text = self.clean_text(text)
-        text = TextParser.escape_tags(text)
-        split_text = TextParser.split_text_per_sentence(text)
-
-        self._logger.debug("Requesting from local server")
-        try:
-            asyncio.run(self._read_text(split_text, **config))
-        except Exception:
-            self._logger.exception("Failed to read text with Frogger")
-        return
+        self.read_blocks((text,), cancel, **config)
+
+    def read_blocks(self, blocks: Iterable[str], cancel: CancellationToken | None = None, **config) -> None:
+        sentences = (
+            sentence
+            for block in blocks
+            for sentence in TextParser.split_text_per_sentence(TextParser.escape_tags(self.clean_text(block)))
+        )
+        split_text = TextParser.pack_sentences(sentences, self.batch_chars)
+        # The blocks are only ever advanced on this thread, which owns them and
+        # closes them after a cancel; the loop takes the parts from a queue.
+        parts: asyncio.Queue[str | None] = asyncio.Queue(maxsize=1)
+        future = self._loop_thread.submit(self._read_text(parts, **config))
+        waiting = [future] if cancel is None else [future, cancel.future]
+        for part in chain(split_text, [None]):
+            put = self._loop_thread.submit(parts.put(part))
+            wait([put, *waiting], return_when=FIRST_COMPLETED)
+            if not put.done():
+                # The read failed or was cancelled while the queue was full.
+                put.cancel()
+                break
+            if future.done() or (cancel is not None and cancel.cancelled):
+                break
+        wait(waiting, return_when=FIRST_COMPLETED)
+        if cancel is not None and cancel.cancelled:
+            # Cancels the task on the loop, which drops its in-flight requests.
+            future.cancel()
+            raise Cancelled()
+        future.result()
+
+    def _create_client(self) -> httpx.AsyncClient:
+        http2 = self.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            self._logger.warning("HTTP/2 for Frogger needs the 'h2' package; falling back to HTTP/1.1")
+            http2 = False
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        return httpx.AsyncClient(timeout=self.TIMEOUT_SECONDS, limits=limits, http2=http2)
 
     async def _fetch_part(self, client: httpx.AsyncClient, index: int, text: str, voice: str) -> str:
         self._logger.debug("Requesting Frogger part %d: %s", index, text)
@@ -66,29 +136,92 @@ class Frogger(AbstractSpeaker):
             raise FroggerError(f"Frogger returned an invalid filename for part {index}")
         return filename
 
+    async def _fetch_cached_part(self, client: httpx.AsyncClient, index: int, text: str, voice: str) -> str:
+        """Returns a path to the part's audio, from the cache when possible.
+
+        The cache works on disk, so it's used off the loop thread to keep the
+        other parts' requests going.
+        """
+        if self.cache is None:
+            return await self._fetch_part(client, index, text, voice)
+
+        key = self.cache.make_key(
+            speaker="frogger", voice=voice, rate=None, volume=None, output_format="wav", text=text
+        )
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            self._logger.debug("Using cached audio for Frogger part %d", index)
+            return cached.path
+
+        filename = await self._fetch_part(client, index, text, voice)
+        return await asyncio.to_thread(self._cache_part, key, index, filename)
+
+    def _cache_part(self, key: str, index: int, filename: str) -> str:
+        """Copies the server's audio file into the cache; returns the path to play."""
+        assert self.cache is not None
+        try:
+            with open(filename, "rb") as audio_file:
+                audio = audio_file.read()
+        except OSError as error:
+            # The server's file isn't readable from here; play it uncached.
+            self._logger.debug("Not caching Frogger part %d: %s", index, error)
+            return filename
+        suffix = os.path.splitext(filename)[1].lstrip(".") or "wav"
+        return self.cache.put(key, audio, suffix=suffix).path
+
     async def _read_text(
         self,
-        parted_text: List[str],
+        parted_text: asyncio.Queue[str | None],
         *,
         voice: str,
         client: httpx.AsyncClient | None = None,
         **config,
     ) -> None:
-        async def fetch_all(active_client: httpx.AsyncClient) -> list[str]:
-            requests_in_order = [
-                self._fetch_part(active_client, index, text, voice) for index, text in enumerate(parted_text)
-            ]
-            return await asyncio.gather(*requests_in_order)
-
+        """Streams parts to the player in order as soon as each one and all before it are ready.
+
+        Later parts keep downloading in the background while the earlier ones
+        play, so the first audio only waits for the first part. Parts are
+        taken from the ``parted_text`` queue, which ends with ``None``, at most
+        ``2 * max_concurrency`` ahead of playback; they may come from a file
+        that is still being read on the caller's thread.
+        """
         if client is None:
-            async with httpx.AsyncClient(timeout=self.TIMEOUT_SECONDS) as active_client:
-                filepaths = await fetch_all(active_client)
-        else:
-            filepaths = await fetch_all(client)
-        self.play_files(filepaths)
-
-    def play_files(self, filepaths):
-        self.player.play_files(filepaths)
+            if self._client is None:
+                self._client = self._create_client()
+            client = self._client
+        limit = asyncio.Semaphore(self.max_concurrency)
+        index = 0
+        tasks: deque[asyncio.Task[str]] = deque()
+        exhausted = False
+
+        async def fetch(index: int, text: str) -> str:
+            async with limit:
+                return await self._fetch_cached_part(client, index, text, voice)
+
+        async def schedule() -> None:
+            nonlocal exhausted, index
+            while not exhausted and len(tasks) < 2 * self.max_concurrency:
+                part = await parted_text.get()
+                if part is None:
+                    exhausted = True
+                    return
+                # The semaphore hands out slots in creation order, so parts start in reading order.
+                tasks.append(asyncio.create_task(fetch(index, part)))
+                index += 1
+
+        stream_id = self.player.open_stream()
+        try:
+            await schedule()
+            while tasks:
+                path = await tasks[0]
+                tasks.popleft()
+                self.player.push_segment(stream_id, AudioSegment(path=path))
+                await schedule()
+        finally:
+            self.player.close_stream(stream_id)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     def stop_text(self):
         self.player.stop()
@@ -1,13 +1,18 @@
 import os
+from collections.abc import Iterable
+from functools import partial
 
 from google.cloud import texttospeech
 
-from cracker.mp3_helper import create_filename, save_mp3
+from cracker.audio_cache import AudioCache
+from cracker.cancellation import CancellationToken
+from cracker.read_along import AudioSegment
 from cracker.speaker import GOOGLE_LANGUAGES
 from cracker.text_parser import TextParser
 from cracker.utils import get_logger
 
 from .abstract_speaker import AbstractSpeaker
+from .pipeline import ordered_map
 
 
 class Google(AbstractSpeaker):
@@ -19,9 +24,24 @@ class Google(AbstractSpeaker):
 
     LANGUAGES = GOOGLE_LANGUAGES
 
-    def __init__(self, player, credentials_file: str | None = None):
+    # Chunks requested at once over the (thread-safe) gRPC client.
+    max_concurrency = 4
+
+    # Limit on the input text of one SynthesizeSpeech request, in UTF-8 bytes.
+    MAX_INPUT_BYTES = 5000
+
+    def __init__(
+        self,
+        player,
+        credentials_file: str | None = None,
+        cache: AudioCache | None = None,
+        max_concurrency: int | None = None,
+    ):
         self._connect_google(credentials_file)
         self.player = player
+        self.cache = cache
+        if max_concurrency is not None:
+            self.max_concurrency = max(1, max_concurrency)
 
     def _connect_google(self, credentials_file=None):
         try:
@@ -40,25 +60,57 @@ class Google(AbstractSpeaker):
             )
             raise e
 
-    def read_text(self, text: str, **config) -> None:
-        """Reads out text."""
-        text = self.clean_text(text)
-        text = TextParser.escape_tags(text)
-        split_text = TextParser.split_text(text)
+    def read_text(self, text: str, cancel: CancellationToken | None = None, **config) -> None:
+        """Reads out text.
+
+        Whole sentences are packed into as few requests as fit Google's input
+        limit. Up to ``max_concurrency`` chunks are requested at once and
+        streamed to the player in order, so the leading chunks play while the
+        rest load.
+        """
+        self.read_blocks((text,), cancel, **config)
+
+    def read_blocks(self, blocks: Iterable[str], cancel: CancellationToken | None = None, **config) -> None:
+        """Reads out blocks like `read_text`, packing each block as it arrives."""
+        chunks = (
+            chunk
+            for block in blocks
+            for chunk in TextParser.pack_text(self.clean_text(block), self.MAX_INPUT_BYTES, TextParser.escaped_bytes)
+        )
+        split_text = map(TextParser.escape_tags, chunks)
 
-        voice = texttospeech.VoiceSelectionParams(
-            language_code=config.get("voice"),
+        voice = config.get("voice")
+        voice_params = texttospeech.VoiceSelectionParams(
+            language_code=voice,
             ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL,
         )
 
-        filepaths = []
-        for idx, parted_text in enumerate(split_text):
-            self._logger.debug("Reading text: %s", parted_text)
-            response = self.ask_google(parted_text, voice)
-            filename = create_filename(AbstractSpeaker.TMP_FILEPATH, idx)
-            saved_filepath = save_mp3(response.audio_content, filename)
-            filepaths.append(saved_filepath)
-        self.play_files(filepaths)
+        synthesize = partial(self._synthesize_part, voice=voice, voice_params=voice_params)
+        self._stream_segments(ordered_map(synthesize, split_text, self.max_concurrency, cancel), cancel)
+
+    def _synthesize_part(self, idx: int, parted_text: str, *, voice: str | None, voice_params) -> AudioSegment:
+        """Returns one chunk's audio, from the cache when possible."""
+        self._logger.debug("Reading text: %s", parted_text)
+        key = None
+        if self.cache is not None:
+            # Rate and volume aren't sent to Google, so they don't split the cache.
+            key = self.cache.make_key(
+                speaker="google",
+                voice=voice,
+                rate=None,
+                volume=None,
+                output_format="mp3",
+                text=parted_text,
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._logger.debug("Using cached audio for part %d", idx)
+                return cached
+
+        response = self.ask_google(parted_text, voice_params)
+        if key is not None:
+            return self.cache.put(key, response.audio_content, suffix="mp3")
+        return AudioSegment(path=f"google-{idx}.mp3", data=response.audio_content)
 
     def ask_google(self, text: str, voice):
         audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
@@ -66,8 +118,5 @@ class Google(AbstractSpeaker):
         response = self.client.synthesize_speech(input=synth_speech, voice=voice, audio_config=audio_config)
         return response
 
-    def play_files(self, filepaths):
-        self.player.play_files(filepaths)
-
     def stop_text(self) -> None:
         self.player.stop()
@@ -0,0 +1,103 @@
+"""Synthesis that streams finished segments into the player.
+
+Speakers turn a read into a lazy iterator of
+:class:`~cracker.read_along.AudioSegment` and hand it to
+:func:`stream_segments`, which pushes every segment into a player stream as
+soon as it exists, so playback starts with the first chunk while later chunks
+are still being synthesized. :func:`ordered_map` builds such an iterator from a
+bounded thread pool, so several chunks are requested at once but still arrive
+in order.
+
+Both block, so they are meant to run on the synthesis worker's thread (see
+:mod:`cracker.synthesis_worker`) and stop early once its
+:class:`~cracker.cancellation.CancellationToken` is cancelled.
+"""
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Protocol, TypeVar
+
+from cracker.cancellation import CancellationToken
+from cracker.read_along import AudioSegment
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class SegmentSink(Protocol):
+    """The streaming half of :class:`~cracker.audio_player.AudioPlayer`."""
+
+    def open_stream(self) -> int: ...
+    def push_segment(self, stream_id: int, segment: AudioSegment) -> None: ...
+    def close_stream(self, stream_id: int) -> None: ...
+
+
+def ordered_map(
+    function: Callable[[int, T], R],
+    items: Iterable[T],
+    max_workers: int,
+    cancel: CancellationToken | None = None,
+) -> Iterator[R]:
+    """Calls ``function(index, item)`` on a bounded pool and yields results in order.
+
+    ``items`` is consumed lazily and at most ``2 * max_workers`` calls are
+    submitted ahead of the consumer, so a slow first chunk never lets the whole
+    document pile up in memory. The first failure is raised in order; calls not
+    yet started are cancelled when the iterator fails or is closed early.
+
+    Once ``cancel`` fires the iterator raises
+    :class:`~cracker.cancellation.Cancelled` straight away: calls still in
+    flight are abandoned and their results dropped.
+    """
+    if max_workers <= 1 and cancel is None:
+        for index, item in enumerate(items):
+            yield function(index, item)
+        return
+
+    max_workers = max(1, max_workers)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="synthesis")
+    pending: deque[Future[R]] = deque()
+    try:
+        for index, item in enumerate(items):
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            pending.append(executor.submit(function, index, item))
+            if len(pending) >= 2 * max_workers:
+                yield _result(pending.popleft(), cancel)
+        while pending:
+            yield _result(pending.popleft(), cancel)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _result(future: Future[R], cancel: CancellationToken | None) -> R:
+    if cancel is not None:
+        wait([future, cancel.future], return_when=FIRST_COMPLETED)
+        cancel.raise_if_cancelled()
+    return future.result()
+
+
+def stream_segments(
+    player: SegmentSink, segments: Iterable[AudioSegment], cancel: CancellationToken | None = None
+) -> None:
+    """Plays segments through a new player stream as they are produced.
+
+    Blocks until ``segments`` is exhausted and always closes the stream.
+    Synthesis errors propagate to the caller, and a cancelled read raises
+    :class:`~cracker.cancellation.Cancelled` without pushing anything more.
+    """
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    stream_id = player.open_stream()
+    try:
+        for segment in segments:
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            player.push_segment(stream_id, segment)
+    finally:
+        close = getattr(segments, "close", None)
+        if close is not None:
+            # Lets an abandoned ordered_map cancel the chunks it hasn't started.
+            close()
+        player.close_stream(stream_id)
@@ -1,19 +1,41 @@
 import logging
-import os
+from collections.abc import Iterable, Iterator
+from dataclasses import replace
+from functools import partial
 from typing import List
 
 import boto3
+from botocore.config import Config as BotoConfig
 from PyQt6.QtWidgets import QMessageBox
 
+from cracker.audio_cache import AudioCache
+from cracker.cancellation import CancellationToken
 from cracker.config import Configuration
-from cracker.mp3_helper import create_filename, save_mp3
-from cracker.read_along import AudioSegment, WordMark, parse_speech_marks
+from cracker.read_along import AudioSegment, WordMark, parse_speech_marks, placed_marks
 from cracker.speaker import POLLY_LANGUAGES
 from cracker.ssml import SSML
+from cracker.text_diff import OffsetMap, utf8_offsets
 from cracker.text_parser import TextParser
 from cracker.utils import get_logger
 
 from .abstract_speaker import AbstractSpeaker
+from .pipeline import ordered_map
+
+CONNECTION_ERROR_MESSAGE = (
+    "Unable to connect to AWS Polly. Please check your AWS configuration.\n\n"
+    "Please verify:\n"
+    "1. Your AWS profile is configured correctly\n"
+    "2. You are logged into AWS\n"
+    "3. Your credentials have access to AWS Polly"
+)
+
+
+class PollyError(RuntimeError):
+    """Raised when Polly cannot synthesize a chunk; carries details for the user."""
+
+    def __init__(self, message: str, details: str = ""):
+        super().__init__(message)
+        self.details = details
 
 
 class Polly(AbstractSpeaker):
@@ -26,10 +48,15 @@ class Polly(AbstractSpeaker):
 
     LANGUAGES = POLLY_LANGUAGES
 
-    def __init__(self, player):
-        self._cached_ssml = SSML()
-        self._cached_segments: list[AudioSegment] = []
-        self._cached_voice = ""
+    # Chunks synthesized at once; also sizes the boto3 connection pool.
+    max_concurrency = 4
+
+    # SynthesizeSpeech limits: billed characters (text without SSML tags) and the whole SSML request.
+    MAX_BILLED_CHARS = 3000
+    MAX_REQUEST_CHARS = 6000
+
+    def __init__(self, player, cache: AudioCache | None = None):
+        self.cache = cache
 
         self.config = Configuration()
         self.client = None
@@ -37,28 +64,22 @@ class Polly(AbstractSpeaker):
         polly_config = self.config.read_config()["polly"]
         aws_profile = polly_config["profile_name"]
         aws_region = polly_config.get("region_name", None)
+        self.max_concurrency = max(1, int(polly_config.get("max_concurrency", self.max_concurrency)))
         self._logger.debug("Using AWS profile: %s, region: %s", aws_profile, aws_region)
         try:
-            self.client = self._connect_aws(aws_profile, aws_region)
+            self.client = self._connect_aws(aws_profile, aws_region, self.max_concurrency)
         except Exception as e:
             self._logger.error("Error connecting to AWS: %s", e)
             self._connection_error = str(e)
 
         self.player = player
 
-    def __del__(self):
-        try:
-            for segment in getattr(self, "_cached_segments", []):
-                os.remove(segment.path)
-        except OSError, TypeError:
-            pass
-
     @staticmethod
-    def _connect_aws(profile_name: str | None = None, region_name: str | None = None):
+    def _connect_aws(profile_name: str | None = None, region_name: str | None = None, max_pool_connections: int = 10):
         """Connect to AWS and create Polly client"""
         try:
             session = boto3.Session(profile_name=profile_name, region_name=region_name)
-            return session.client("polly")
+            return session.client("polly", config=BotoConfig(max_pool_connections=max_pool_connections))
         except Exception as e:
             logging.exception(
                 "Unable to connect to AWS with the profile '%s' and region '%s'. "
@@ -74,11 +95,12 @@ class Polly(AbstractSpeaker):
         polly_config = self.config.read_config()["polly"]
         aws_profile = polly_config["profile_name"]
         aws_region = polly_config.get("region_name", None)
+        self.max_concurrency = max(1, int(polly_config.get("max_concurrency", self.max_concurrency)))
 
         self._logger.debug("Reloading with AWS profile: %s, region: %s", aws_profile, aws_region)
 
         try:
-            self.client = self._connect_aws(aws_profile, aws_region)
+            self.client = self._connect_aws(aws_profile, aws_region, self.max_concurrency)
             self._connection_error = None  # Clear any previous error
             self._logger.info("Successfully reloaded AWS Polly client")
         except Exception as e:
@@ -130,75 +152,108 @@ class Polly(AbstractSpeaker):
             )
             return False, error_message
 
-    def save_cache(self, ssml: SSML, segments: List[AudioSegment], voice):
-        # Remove previously cached temp files that the new cache no longer uses
-        # (a shorter read leaves higher-indexed mp3s orphaned otherwise).
-        new_paths = {segment.path for segment in segments}
-        for old_segment in self._cached_segments:
-            if old_segment.path not in new_paths:
-                try:
-                    os.remove(old_segment.path)
-                except OSError:
-                    pass
-        self._cached_ssml = ssml
-        self._cached_segments = segments
-        self._cached_voice = voice
-
-    def read_text(self, text: str, **config) -> None:
-        """Reads out text, attaching per-word speech marks to each segment."""
-        text = self.clean_text(text)
-        text = TextParser.escape_tags(text)
-        split_text = TextParser.split_text(text)
+    def read_text(self, text: str, cancel: CancellationToken | None = None, **config) -> None:
+        """Reads out text, attaching per-word speech marks to each segment.
+
+        Whole sentences are packed into as few chunks as fit Polly's limits,
+        leaving room for the SSML wrapper. Up to ``max_concurrency`` chunks are
+        synthesized at once and streamed to the player in order, so playback starts as soon as the first one is
+        ready. On cancel, chunks not yet sent are dropped and requests already
+        in flight are abandoned.
+        """
+        self.read_blocks((text,), cancel, **config)
 
+    def read_blocks(self, blocks: Iterable[str], cancel: CancellationToken | None = None, **config) -> None:
+        """Reads out blocks like `read_text`, packing each block as it arrives."""
         rate = config.get("rate")
         volume = config.get("volume")
         voice = config.get("voice")
         assert voice, "Voice needs to be provided"  # TODO: Does it?
 
-        ssml = SSML(text, rate=rate, volume=volume)
+        synthesize = partial(self._synthesize_part, voice=voice, rate=rate, volume=volume)
+
+        def synthesize_chunk(idx: int, chunk: tuple[str, list[OffsetMap]]) -> AudioSegment:
+            parted_text, offsets = chunk
+            segment = synthesize(idx, parted_text)
+            return replace(segment, marks=placed_marks(segment.marks, offsets))
+
+        chunks = self._chunks(blocks, self.chunk_limit(rate, volume))
+        self._stream_segments(ordered_map(synthesize_chunk, chunks, self.max_concurrency, cancel), cancel)
+
+    def _chunks(self, blocks: Iterable[str], limit: int) -> Iterator[tuple[str, list[OffsetMap]]]:
+        """Escaped chunks of the blocks, each with the maps from its offsets back to the blocks read together."""
+        position = 0
+        for block in blocks:
+            cleaned, cleaned_offsets = self.clean_text_offsets(block)
+            block_offsets = [*cleaned_offsets, OffsetMap(offset=position)]
+            start = 0
+            for chunk in TextParser.pack_text(cleaned, limit, TextParser.escaped_length):
+                escaped, edits = TextParser.escape_tags_edits(chunk)
+                yield escaped, [OffsetMap(edits, offset=start), *block_offsets]
+                start += len(chunk)
+            position += len(block)
+
+    @classmethod
+    def chunk_limit(cls, rate=None, volume=None) -> int:
+        """Most escaped characters one chunk may hold so its request stays within Polly's limits.
+
+        Entities such as ``&lt;`` are counted in full, which can only
+        overestimate the billed characters.
+        """
+        overhead = len(str(SSML("", rate=rate, volume=volume)))
+        return min(cls.MAX_BILLED_CHARS, cls.MAX_REQUEST_CHARS - overhead)
 
-        if self._cached_ssml == ssml and self._cached_voice == voice:
-            self._logger.debug("Playing cached file")
-            segments = self._cached_segments
-        else:
-            self._logger.debug("Request from Polly")
-            segments = []
-            # TODO: This should obviously be asynchronous!
-            try:
-                for idx, parted_text in enumerate(split_text):
-                    parted_ssml = str(SSML(parted_text, rate=rate, volume=volume))
-                    response = self.ask_polly(parted_ssml, voice)
-                    filename = create_filename(AbstractSpeaker.TMP_FILEPATH, idx)
-                    saved_filepath = save_mp3(response["AudioStream"].read(), filename)
-                    marks = self._fetch_marks(parted_ssml, voice)
-                    segments.append(AudioSegment(path=saved_filepath, marks=marks))
-                self.save_cache(ssml, segments, voice)
-            except (RuntimeError, Exception) as e:
-                self._logger.error("Failed to read text with Polly: %s", e)
-                # Drop the partial files written this attempt, then invalidate
-                # the cache: a failed segment may have overwritten deterministic
-                # temp files the previous cache still referenced, so a later
-                # cache hit must not replay corrupted/mixed audio.
-                for segment in segments:
-                    try:
-                        os.remove(segment.path)
-                    except OSError:
-                        pass
-                self._cached_ssml = SSML()
-                self._cached_segments = []
-                self._cached_voice = ""
-                return  # Exit gracefully without crashing
-        self.player.play_segments(segments)
-        return
-
-    def _fetch_marks(self, ssml_text: str, voice: str) -> List[WordMark]:
+    def _synthesize_part(self, idx: int, parted_text: str, *, voice: str, rate, volume) -> AudioSegment:
+        """Returns one chunk's audio and marks, from the cache when possible.
+
+        The marks' offsets are character offsets into ``parted_text``.
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(
+                speaker="polly", voice=voice, rate=rate, volume=volume, output_format="mp3", text=parted_text
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._logger.debug("Using cached audio for part %d", idx)
+                return cached
+
+        self._logger.debug("Request part %d from Polly", idx)
+        ssml = SSML(parted_text, rate=rate, volume=volume)
+        parted_ssml = str(ssml)
+        response = self.ask_polly(parted_ssml, voice)
+        audio = response["AudioStream"].read()
+        fetched = self._fetch_marks(parted_ssml, voice)
+        marks = self._text_marks(fetched or [], parted_text, ssml.text_offset)
+        # A part whose marks failed isn't cached, so the next read asks for them again.
+        if key is not None and fetched is not None:
+            return self.cache.put(key, audio, marks, suffix="mp3")
+        return AudioSegment(path=f"polly-{idx}.mp3", marks=marks, data=audio)
+
+    @staticmethod
+    def _text_marks(marks: List[WordMark], text: str, text_offset: int) -> List[WordMark]:
+        """Turns the marks' byte offsets into the SSML request into character offsets into its ``text``.
+
+        The SSML wrapper before the text is ASCII, so ``text_offset`` counts its bytes too.
+        """
+        located = [mark.start >= text_offset and mark.end >= mark.start for mark in marks]
+        byte_offsets = [
+            offset - text_offset for mark, found in zip(marks, located) if found for offset in (mark.start, mark.end)
+        ]
+        offsets = iter(utf8_offsets(text, byte_offsets))
+        return [
+            replace(mark, start=next(offsets), end=next(offsets)) if found else replace(mark, start=-1, end=-1)
+            for mark, found in zip(marks, located)
+        ]
+
+    def _fetch_marks(self, ssml_text: str, voice: str) -> List[WordMark] | None:
         """Requests word-level speech marks for one SSML chunk.
 
-        Returns an empty list on any failure so playback (and the estimated
+        Returns ``None`` on any failure so playback (and the estimated
         read-along fallback) still works without the marks.
         """
         if self.client is None:
-            return []
+            return None
         try:
             response = self.client.synthesize_speech(
                 OutputFormat="json",
@@ -210,7 +265,7 @@ class Polly(AbstractSpeaker):
             return parse_speech_marks(response["AudioStream"].read())
         except Exception as error:
             self._logger.warning("Could not fetch Polly speech marks: %s", error)
-            return []
+            return None
 
     def _show_error_dialog(self, message: str, details: str = ""):
         """Shows an error dialog to the user"""
@@ -223,19 +278,21 @@ class Polly(AbstractSpeaker):
         msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
         msg_box.exec()
 
+    def report_error(self, error: Exception) -> None:
+        """Shows a failed read in a dialog; called on the GUI thread."""
+        self._logger.error("Failed to read text with Polly: %s", error)
+        if isinstance(error, PollyError):
+            self._show_error_dialog(str(error), error.details)
+        else:
+            self._show_error_dialog(
+                "An error occurred while trying to synthesize speech with AWS Polly.", f"Error details: {error}"
+            )
+
     def ask_polly(self, ssml_text: str, voice: str):
         """Connects to Polly and returns path to save mp3"""
         if self.client is None or self._connection_error:
-            error_msg = (
-                "Unable to connect to AWS Polly. Please check your AWS configuration.\n\n"
-                "Please verify:\n"
-                "1. Your AWS profile is configured correctly\n"
-                "2. You are logged into AWS\n"
-                "3. Your credentials have access to AWS Polly"
-            )
             self._logger.error("Attempted to use Polly without valid AWS connection")
-            self._show_error_dialog(error_msg, f"Error details: {self._connection_error}")
-            raise RuntimeError("AWS Polly client not initialized")
+            raise PollyError(CONNECTION_ERROR_MESSAGE, f"Error details: {self._connection_error}")
 
         try:
             speech = self.create_speech(ssml_text, voice)
@@ -244,8 +301,7 @@ class Polly(AbstractSpeaker):
         except Exception as e:
             error_msg = "An error occurred while trying to synthesize speech with AWS Polly."
             self._logger.error("Error calling Polly synthesize_speech: %s", e)
-            self._show_error_dialog(error_msg, f"Error details: {str(e)}")
-            raise
+            raise PollyError(error_msg, f"Error details: {str(e)}") from e
 
     @staticmethod
     def create_speech(ssml_text: str, voice: str):
@@ -3,6 +3,8 @@ class SSML:
 
     def __init__(self, text=None, rate=None, volume=None):
         self.ssml = ""
+        # Characters before the text in str(self).
+        self.text_offset = len("<speak>")
         self._rate = rate
         self._volume = volume
         if text is not None:
@@ -18,6 +20,7 @@ class SSML:
                 _prosody.append('volume="{volume}"'.format(volume=self._volume))
             prosody = "<" + " ".join(_prosody) + ">"
             self.ssml = prosody + self.ssml + "</prosody>"
+            self.text_offset = len("<speak>") + len(prosody)
 
     def __str__(self):
         return "<speak>{ssml}</speak>".format(ssml=self.ssml)
@@ -0,0 +1,277 @@
+"""Headless batch synthesis: ``cracker synth`` and its Python API.
+
+Texts go through the same parser rules, chunking and speakers as the GUI,
+but the audio is written to an output directory instead of being played,
+so reading lists can be rendered on a machine without a display::
+
+    from cracker.synth import synthesize_files
+    synthesize_files(["chapter1.txt", "chapter2.txt"], "out", speaker="polly", jobs=2)
+
+Each source produces numbered audio files (``<name>-000.mp3``, ...), one per
+synthesized chunk, each with a ``.marks.json`` file of word timings when the
+speaker provides them.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from cracker.audio_cache import AudioCache
+from cracker.config import Configuration
+from cracker.file_source import open_text_file
+from cracker.read_along import AudioSegment
+from cracker.speaker.abstract_speaker import AbstractSpeaker
+from cracker.speaker.factory import SPEAKERS, create_speaker
+from cracker.text_parser import TextParser
+from cracker.utils import LoggerConfig, get_logger
+
+_logger = get_logger(__name__)
+
+DEFAULT_SPEED = 3
+DEFAULT_VOLUME = 50
+
+
+@dataclass
+class SynthesisResult:
+    """What one source produced, in playback order."""
+
+    name: str
+    audio_files: list[str] = field(default_factory=list)
+    marks_files: list[str] = field(default_factory=list)
+
+
+class SegmentWriter:
+    """A :class:`~cracker.speaker.pipeline.SegmentSink` that saves segments as numbered files."""
+
+    def __init__(self, output_dir: str, name: str):
+        self.output_dir = output_dir
+        self.result = SynthesisResult(name=name)
+        self._streams = 0
+
+    def open_stream(self) -> int:
+        self._streams += 1
+        return self._streams
+
+    def push_segment(self, stream_id: int, segment: AudioSegment) -> None:
+        index = len(self.result.audio_files)
+        extension = os.path.splitext(segment.path)[1] or ".mp3"
+        base = os.path.join(self.output_dir, f"{self.result.name}-{index:03d}")
+        audio_path = base + extension
+        if segment.data is not None:
+            with open(audio_path, "wb") as audio_file:
+                audio_file.write(segment.data)
+        else:
+            shutil.copyfile(segment.path, audio_path)
+        self.result.audio_files.append(audio_path)
+        if segment.marks:
+            marks_path = base + ".marks.json"
+            with open(marks_path, "w") as marks_file:
+                json.dump([asdict(mark) for mark in segment.marks], marks_file)
+            self.result.marks_files.append(marks_path)
+
+    def close_stream(self, stream_id: int) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+def speaker_rate(speaker_name: str, speed: int) -> Any:
+    """The speaker's rate for a speed step from 1 to 5, as the GUI's speed slider picks it."""
+    rates = SPEAKERS[speaker_name.lower()].RATES
+    return rates[min(max(speed, 1), len(rates)) - 1]
+
+
+def speaker_volume(speaker_name: str, percent: int) -> Any:
+    """The speaker's volume for a percentage, as the GUI's volume slider picks it."""
+    volumes = SPEAKERS[speaker_name.lower()].VOLUMES
+    return volumes[min(max(int(percent * len(volumes) / 100), 0), len(volumes) - 1)]
+
+
+class Synthesizer:
+    """Renders texts with one speaker configuration; safe to use from several threads.
+
+    Every read in flight gets its own speaker instance, so sources can be
+    synthesized concurrently while each one still requests its chunks
+    concurrently. Speakers are kept for the next read once one ends, so a
+    run builds at most one per job and reuses its clients and sessions.
+    """
+
+    def __init__(
+        self,
+        speaker: str | None = None,
+        voice: str | None = None,
+        speed: int | None = None,
+        volume: int = DEFAULT_VOLUME,
+        apply_rules: bool = True,
+        config: dict[str, Any] | None = None,
+    ):
+        configuration = Configuration()
+        self.config = config if config is not None else configuration.read_config()
+        self.speaker_name = (speaker or self.config.get("speaker") or "polly").lower()
+        if self.speaker_name not in SPEAKERS:
+            raise ValueError(f"Unknown speaker '{speaker}'. Choose one of: {', '.join(SPEAKERS)}")
+        self.voice = voice or self.config.get(self.speaker_name, {}).get("voice")
+        self.rate = speaker_rate(self.speaker_name, speed or self.config.get("speed") or DEFAULT_SPEED)
+        self.volume = speaker_volume(self.speaker_name, volume)
+        self.cache = AudioCache.from_config(self.config.get("cache", {}))
+        parser_config = self.config.get("parser", {})
+        self.text_parser: TextParser | None = None
+        if apply_rules:
+            self.text_parser = TextParser(
+                rule_budget_ms=parser_config.get("rule_budget_ms"),
+                parallel_min_chars=parser_config.get("parallel_min_chars"),
+                parallel_workers=parser_config.get("parallel_workers"),
+            )
+        self._parser_lock = threading.Lock()
+        self._speakers_lock = threading.Lock()
+        self._speakers: list[AbstractSpeaker] = []
+        self._idle_speakers: list[AbstractSpeaker] = []
+
+    def synthesize(self, text: str, output_dir: str, name: str = "speech") -> SynthesisResult:
+        """Writes the audio for ``text`` to ``output_dir`` as ``<name>-NNN.<ext>`` files."""
+        return self.synthesize_blocks((text,), output_dir, name)
+
+    def synthesize_blocks(self, blocks: Iterable[str], output_dir: str, name: str = "speech") -> SynthesisResult:
+        """Like `synthesize` for a text that arrives in blocks, such as a file from `open_text_file`.
+
+        Chunks are synthesized while later blocks are still being read.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        writer = SegmentWriter(output_dir, name)
+        speaker = self._take_speaker(writer)
+        try:
+            speaker.read_blocks(self._reduced(blocks, name), rate=self.rate, volume=self.volume, voice=self.voice)
+        finally:
+            with self._speakers_lock:
+                self._idle_speakers.append(speaker)
+        _logger.info("Wrote %d audio files for %s", len(writer.result.audio_files), name)
+        return writer.result
+
+    def synthesize_files(self, paths: Iterable[str], output_dir: str, jobs: int = 2) -> list[SynthesisResult]:
+        """Synthesizes each file (``-`` is stdin) with up to ``jobs`` files at once, in input order.
+
+        Output names are the file names without their extension, made unique
+        when two files share one.
+        """
+        paths = list(paths)
+        sources = list(zip(paths, _unique_names(paths)))
+        with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="synth") as executor:
+            futures = [executor.submit(self._synthesize_file, path, output_dir, name) for path, name in sources]
+            return [future.result() for future in futures]
+
+    def close(self) -> None:
+        with self._speakers_lock:
+            speakers, self._speakers, self._idle_speakers = self._speakers, [], []
+        for speaker in speakers:
+            speaker.close()
+        if self.text_parser is not None:
+            self.text_parser.close()
+
+    def _take_speaker(self, writer: SegmentWriter) -> AbstractSpeaker:
+        """An idle speaker, or a new one when all are reading, set to write to ``writer``."""
+        with self._speakers_lock:
+            speaker = self._idle_speakers.pop() if self._idle_speakers else None
+        if speaker is None:
+            speaker = create_speaker(self.speaker_name, writer, self.config, self.cache)
+            with self._speakers_lock:
+                self._speakers.append(speaker)
+        speaker.player = writer
+        return speaker
+
+    def _reduced(self, blocks: Iterable[str], name: str) -> Iterator[str]:
+        if self.text_parser is None:
+            yield from blocks
+            return
+        for block in blocks:
+            with self._parser_lock:
+                block, skipped = self.text_parser.reduce(block)
+            if skipped:
+                _logger.warning("Skipped slow parser rules for %s: %s", name, skipped)
+            yield block
+
+    def _synthesize_file(self, path: str, output_dir: str, name: str) -> SynthesisResult:
+        if path == "-":
+            return self.synthesize(sys.stdin.read(), output_dir, name)
+        return self.synthesize_blocks(open_text_file(path), output_dir, name)
+
+
+def _unique_names(paths: Iterable[str]) -> list[str]:
+    names: list[str] = []
+    seen: dict[str, int] = {}
+    for path in paths:
+        name = "stdin" if path == "-" else os.path.splitext(os.path.basename(path))[0] or "speech"
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(name if count == 0 else f"{name}-{count}")
+    return names
+
+
+def synthesize_text(text: str, output_dir: str, name: str = "speech", **options) -> SynthesisResult:
+    """Synthesizes one text; ``options`` are :class:`Synthesizer` arguments."""
+    synthesizer = Synthesizer(**options)
+    try:
+        return synthesizer.synthesize(text, output_dir, name)
+    finally:
+        synthesizer.close()
+
+
+def synthesize_files(paths: Sequence[str], output_dir: str, jobs: int = 2, **options) -> list[SynthesisResult]:
+    """Synthesizes several files concurrently; ``options`` are :class:`Synthesizer` arguments."""
+    synthesizer = Synthesizer(**options)
+    try:
+        return synthesizer.synthesize_files(paths, output_dir, jobs)
+    finally:
+        synthesizer.close()
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="cracker synth", description="Synthesize texts or files to audio files without the GUI."
+    )
+    parser.add_argument("files", nargs="*", help="text, Markdown or HTML files to read; '-' reads stdin")
+    parser.add_argument("-t", "--text", action="append", default=[], help="text to read (repeatable)")
+    parser.add_argument("-o", "--output", default=".", help="directory for the audio and marks files")
+    parser.add_argument("-s", "--speaker", choices=sorted(SPEAKERS), help="speaker (default: from settings)")
+    parser.add_argument("-v", "--voice", help="voice (default: the speaker's voice from settings)")
+    parser.add_argument("--speed", type=int, choices=range(1, 6), help="speed step 1-5 (default: from settings)")
+    parser.add_argument("--volume", type=int, default=DEFAULT_VOLUME, help="volume in percent (default: 50)")
+    parser.add_argument("-j", "--jobs", type=int, default=2, help="files synthesized at once (default: 2)")
+    parser.add_argument("--no-rules", action="store_true", help="don't apply the parser rules")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args(argv)
+    if not args.files and not args.text:
+        parser.error("give at least one file or --text")
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.debug:
+        LoggerConfig().level = logging.DEBUG
+
+    synthesizer = Synthesizer(
+        speaker=args.speaker, voice=args.voice, speed=args.speed, volume=args.volume, apply_rules=not args.no_rules
+    )
+    try:
+        results = [
+            synthesizer.synthesize(text, args.output, name=f"text-{index}") for index, text in enumerate(args.text)
+        ]
+        results += synthesizer.synthesize_files(args.files, args.output, args.jobs)
+    except Exception as error:
+        _logger.error("Synthesis failed: %s", error)
+        return 1
+    finally:
+        synthesizer.close()
+    for result in results:
+        for audio_file in result.audio_files:
+            print(audio_file)
+    return 0
@@ -0,0 +1,113 @@
+"""Runs speech synthesis off the GUI thread.
+
+Speakers' ``read_text`` blocks on network requests or subprocesses, so the
+main window hands reads to a :class:`SynthesisWorker` instead of calling them
+directly. Audio reaches the player through its thread-safe streaming API and
+failures come back through the ``failed`` signal, which is delivered on the
+GUI thread where the speaker can show a dialog.
+"""
+
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.reduction_worker import Reduction
+from cracker.speaker.abstract_speaker import AbstractSpeaker
+from cracker.utils import get_logger
+
+
+class SynthesisWorker(QObject):
+    """Synthesizes one read at a time on a background thread.
+
+    Starting a read cancels the previous one, as does :meth:`cancel`: chunks
+    not yet requested are dropped, interruptible work (espeak, Frogger
+    requests) is aborted and nothing more from that read reaches the player.
+    """
+
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object, object)
+    # A read's token, its text after ``reduce`` and the rules skipped on the way.
+    reduced = pyqtSignal(object, object, object)
+    _logger = get_logger(__name__)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="synthesis-worker")
+        self._token: CancellationToken | None = None
+
+    def read(
+        self, speaker: AbstractSpeaker, text: str, config: dict, reduce: Reduction | None = None
+    ) -> CancellationToken:
+        """Queues ``speaker.read_text(text, **config)``; returns the read's token.
+
+        ``reduce(text, cancel=...)`` runs first on the worker thread, where it can
+        be cancelled like the rest of the read. Its text is what's read, and is
+        emitted with ``reduced`` before any audio is queued.
+        """
+        return self._submit(speaker, speaker.read_text, text, config, reduce)
+
+    def read_blocks(self, speaker: AbstractSpeaker, blocks: Iterable[str], config: dict) -> CancellationToken:
+        """Queues ``speaker.read_blocks(blocks, **config)``; ``blocks`` is consumed on the worker thread.
+
+        A generator ``blocks`` is closed when the read ends, cancelled or not,
+        so a file it streams from is closed with it.
+        """
+        return self._submit(speaker, speaker.read_blocks, blocks, config)
+
+    def cancel(self) -> None:
+        """Cancels the current read, if any."""
+        if self._token is not None:
+            self._token.cancel()
+            self._token = None
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(
+        self,
+        speaker: AbstractSpeaker,
+        read: Callable[..., None],
+        source,
+        config: dict,
+        reduce: Reduction | None = None,
+    ) -> CancellationToken:
+        self.cancel()
+        token = CancellationToken()
+        self._token = token
+        self._executor.submit(self._run, speaker, read, source, dict(config), token, reduce)
+        return token
+
+    def _run(
+        self,
+        speaker: AbstractSpeaker,
+        read: Callable[..., None],
+        source,
+        config: dict,
+        token: CancellationToken,
+        reduce: Reduction | None = None,
+    ) -> None:
+        try:
+            if token.cancelled:
+                return
+            if reduce is not None:
+                source, skipped = reduce(source, cancel=token)
+                self.reduced.emit(token, source, skipped)
+            read(source, cancel=token, **config)
+        except Cancelled:
+            self._logger.debug("Read cancelled")
+            return
+        except Exception as error:
+            if token.cancelled:
+                self._logger.debug("Ignoring failure of a cancelled read: %s", error)
+                return
+            self._logger.exception("Failed to synthesize text")
+            self.failed.emit(speaker, error)
+            return
+        finally:
+            if isinstance(source, Generator):
+                source.close()
+        if not token.cancelled:
+            self.finished.emit(speaker)
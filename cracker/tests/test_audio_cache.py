@@ -0,0 +1,63 @@
+import os
+
+from cracker.audio_cache import AudioCache
+from cracker.read_along import WordMark
+
+
+def _key(text: str, **overrides) -> str:
+    fields = dict(speaker="polly", voice="Joanna", rate="medium", volume="medium", output_format="mp3", text=text)
+    fields.update(overrides)
+    return AudioCache.make_key(**fields)
+
+
+def test_make_key_depends_on_every_synthesis_parameter():
+    base = _key("Hello")
+    assert base == _key("Hello")
+    assert base != _key("Hello!")
+    assert base != _key("Hello", speaker="google")
+    assert base != _key("Hello", voice="Matthew")
+    assert base != _key("Hello", rate="fast")
+    assert base != _key("Hello", volume="loud")
+    assert base != _key("Hello", output_format="ogg_vorbis")
+
+
+def test_put_then_get_round_trips_audio_and_marks(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    key = _key("Hello world")
+
+    stored = cache.put(key, b"audio", [WordMark(0, "Hello"), WordMark(300, "world")])
+    loaded = cache.get(key)
+
+    assert loaded is not None
+    assert loaded.path == stored.path
+    with open(loaded.path, "rb") as audio_file:
+        assert audio_file.read() == b"audio"
+    assert [(mark.time_ms, mark.value) for mark in loaded.marks] == [(0, "Hello"), (300, "world")]
+    assert cache.get(_key("missing")) is None
+
+
+def test_evicts_least_recently_used_entries_over_budget(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=10)
+    first, second, third = _key("one"), _key("two"), _key("three")
+
+    cache.put(first, b"1234")
+    cache.put(second, b"1234")
+    assert cache.get(first) is not None  # touch: "two" is now least recently used
+    cache.put(third, b"1234")
+
+    assert first in cache and third in cache
+    assert second not in cache
+    assert cache.size == 8
+    assert not any(name.startswith(second) for name in os.listdir(tmp_path))
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    key = _key("persisted")
+    AudioCache(str(tmp_path)).put(key, b"audio", [WordMark(0, "persisted")], suffix="wav")
+
+    reopened = AudioCache(str(tmp_path))
+
+    segment = reopened.get(key)
+    assert segment is not None and segment.path.endswith(".wav")
+    assert [mark.value for mark in segment.marks] == ["persisted"]
+    assert len(reopened) == 1 and reopened.size > os.path.getsize(segment.path)  # audio plus marks
@@ -1,7 +1,10 @@
 from unittest.mock import MagicMock, patch
 
+import pytest
+
+from cracker.read_along import WordMark
 from cracker.speaker.google import Google
-from cracker.speaker.polly import Polly
+from cracker.speaker.polly import Polly, PollyError
 
 
 def test_polly_connects_with_configured_profile_and_region():
@@ -9,10 +12,12 @@ def test_polly_connects_with_configured_profile_and_region():
 
     with patch("cracker.speaker.polly.boto3.Session") as session:
         session.return_value.client.return_value = client
-        result = Polly._connect_aws("work", "us-west-2")
+        result = Polly._connect_aws("work", "us-west-2", max_pool_connections=6)
 
     session.assert_called_once_with(profile_name="work", region_name="us-west-2")
-    session.return_value.client.assert_called_once_with("polly")
+    (service,), kwargs = session.return_value.client.call_args
+    assert service == "polly"
+    assert kwargs["config"].max_pool_connections == 6
     assert result is client
 
 
@@ -47,76 +52,248 @@ def test_polly_fetch_marks_requests_word_marks_and_parses_them():
     assert kwargs["Text"] == "<speak>Hello world</speak>"
 
 
-def test_polly_fetch_marks_returns_empty_on_error():
+def test_polly_fetch_marks_returns_none_on_error():
     polly = object.__new__(Polly)
     client = MagicMock()
     client.synthesize_speech.side_effect = RuntimeError("boom")
     polly.client = client
 
-    assert polly._fetch_marks("<speak>hi</speak>", "Joanna") == []
+    assert polly._fetch_marks("<speak>hi</speak>", "Joanna") is None
+
 
+def _pushed_segments(player):
+    return [call.args[1] for call in player.push_segment.call_args_list]
 
-def test_polly_read_text_cleans_partial_files_on_failure(tmp_path, monkeypatch):
-    from cracker.ssml import SSML
 
+def test_polly_read_text_streams_parts_before_a_later_failure(monkeypatch):
     polly = object.__new__(Polly)
     polly.player = MagicMock()
-    polly._cached_ssml = SSML()
-    polly._cached_segments = []
-    polly._cached_voice = ""
+    polly.player.open_stream.return_value = 7
 
-    # Force two chunks so the first is written before the second fails.
+    # Force two chunks so the first is played before the second fails.
     monkeypatch.setattr(
-        "cracker.speaker.polly.TextParser.split_text",
-        staticmethod(lambda text, max_char=3000: iter(["one", "two"])),
+        "cracker.speaker.polly.TextParser.pack_text",
+        staticmethod(lambda text, limit, measure=len: iter(["one", "two"])),
     )
-    written = []
 
-    def fake_save(stream, base_filename):
-        path = tmp_path / base_filename
-        path.write_bytes(b"audio")
-        written.append(path)
-        return str(path)
+    def fake_ask(ssml_text, voice):
+        if "two" in ssml_text:
+            raise RuntimeError("boom on the second chunk")
+        return {"AudioStream": MagicMock(read=lambda: b"audio")}
+
+    polly.ask_polly = fake_ask
+    polly._fetch_marks = MagicMock(return_value=[])
+
+    with pytest.raises(RuntimeError, match="second chunk"):
+        polly.read_text("one two", rate="medium", volume="medium", voice="Joanna")
+
+    polly.player.open_stream.assert_called_once_with()
+    # Without a cache the audio never touches the disk.
+    assert [(segment.path, segment.data) for segment in _pushed_segments(polly.player)] == [("polly-0.mp3", b"audio")]
+    polly.player.close_stream.assert_called_once_with(7)
+    polly.player.play_segments.assert_not_called()
+
 
-    monkeypatch.setattr("cracker.speaker.polly.save_mp3", fake_save)
+def test_polly_chunk_limit_leaves_room_for_the_ssml_wrapper(monkeypatch):
+    assert Polly.chunk_limit() == Polly.MAX_BILLED_CHARS
 
-    calls = {"n": 0}
+    monkeypatch.setattr(Polly, "MAX_REQUEST_CHARS", 3050)
+    wrapper = '<speak><prosody rate="x-slow" volume="x-loud"></prosody></speak>'
+    assert Polly.chunk_limit("x-slow", "x-loud") == 3050 - len(wrapper)
+
+
+def test_polly_read_text_packs_escaped_sentences_within_the_limit(monkeypatch):
+    polly = object.__new__(Polly)
+    polly.player = MagicMock()
+    polly.max_concurrency = 1
+    polly.cache = None
+    monkeypatch.setattr(Polly, "MAX_BILLED_CHARS", 40)
+    requests = []
 
     def fake_ask(ssml_text, voice):
-        calls["n"] += 1
-        if calls["n"] >= 2:
-            raise RuntimeError("boom on the second chunk")
+        requests.append(ssml_text)
         return {"AudioStream": MagicMock(read=lambda: b"audio")}
 
     polly.ask_polly = fake_ask
     polly._fetch_marks = MagicMock(return_value=[])
 
-    polly.read_text("one two", rate="medium", volume="medium", voice="Joanna")
+    polly.read_text("Is 1 < 2? Yes. And 3 > 2. " * 3, voice="Joanna")
 
-    assert written and not any(path.exists() for path in written)  # partial file removed
-    assert polly._cached_segments == []
-    polly.player.play_segments.assert_not_called()
+    texts = [ssml[len("<speak>") : -len("</speak>")] for ssml in requests]
+    assert all(len(text) <= 40 for text in texts)
+    assert "".join(texts) == "Is 1 &lt; 2? Yes. And 3 &gt; 2. " * 3
+    assert len(texts) == 3
 
 
-def test_polly_read_text_invalidates_cache_on_synthesis_failure():
+def test_polly_read_text_synthesizes_chunks_concurrently_in_order(monkeypatch):
+    import threading
+
     from cracker.read_along import AudioSegment
-    from cracker.ssml import SSML
 
     polly = object.__new__(Polly)
     polly.player = MagicMock()
-    # A prior successful read left a cache pointing at deterministic temp files.
-    polly._cached_ssml = SSML("previous text")
-    polly._cached_segments = [AudioSegment(path="tmp-0.mp3")]
-    polly._cached_voice = "Joanna"
+    polly.max_concurrency = 3
+    monkeypatch.setattr(
+        "cracker.speaker.polly.TextParser.pack_text",
+        staticmethod(lambda text, limit, measure=len: iter(["a", "b", "c"])),
+    )
+    barrier = threading.Barrier(3, timeout=5)
+
+    def synthesize(idx, parted_text, **config):
+        barrier.wait()  # only passes if all three chunks are in flight together
+        return AudioSegment(path=f"{parted_text}.mp3")
+
+    polly._synthesize_part = synthesize
+
+    polly.read_text("a b c", rate="medium", volume="medium", voice="Joanna")
+
+    assert [segment.path for segment in _pushed_segments(polly.player)] == ["a.mp3", "b.mp3", "c.mp3"]
+
+
+def test_polly_read_text_drops_remaining_chunks_once_cancelled(monkeypatch):
+    from cracker.cancellation import CancellationToken, Cancelled
+    from cracker.read_along import AudioSegment
+
+    polly = object.__new__(Polly)
+    polly.player = MagicMock()
+    polly.max_concurrency = 1
+    monkeypatch.setattr(
+        "cracker.speaker.polly.TextParser.pack_text",
+        staticmethod(lambda text, limit, measure=len: iter(["a", "b", "c"])),
+    )
+    cancel = CancellationToken()
+    requested = []
+
+    def synthesize(idx, parted_text, **config):
+        requested.append(parted_text)
+        if parted_text == "a":
+            cancel.cancel()  # the user pressed Stop while the first chunk was in flight
+        return AudioSegment(path=f"{parted_text}.mp3")
+
+    polly._synthesize_part = synthesize
+
+    with pytest.raises(Cancelled):
+        polly.read_text("a b c", cancel, rate="medium", volume="medium", voice="Joanna")
+
+    polly.player.push_segment.assert_not_called()
+    assert "c" not in requested
+    polly.player.close_stream.assert_called_once()
+
+
+def test_polly_marks_carry_offsets_into_the_text_read(monkeypatch):
+    import html
+    import re
+
+    polly = object.__new__(Polly)
+    polly.player = MagicMock()
+    polly.max_concurrency = 1
+    polly.cache = None
+    monkeypatch.setattr(Polly, "MAX_BILLED_CHARS", 30)
+    polly.ask_polly = MagicMock(return_value={"AudioStream": MagicMock(read=lambda: b"audio")})
+
+    def fetch_marks(ssml_text, voice):
+        # Like Polly: one mark per word, located by UTF-8 byte offsets into the whole request.
+        body_start = ssml_text.index(">", len("<speak>")) + 1
+        body = ssml_text[body_start : ssml_text.rindex("</prosody>")]
+        return [
+            WordMark(
+                0,
+                html.unescape(match.group()),
+                len(ssml_text[: body_start + match.start()].encode()),
+                len(ssml_text[: body_start + match.end()].encode()),
+            )
+            for match in re.finditer(r"\S+", body)
+        ]
+
+    polly._fetch_marks = fetch_marks
+    text = "Tom & Jerry\nsay 1 < 2 about żółw. Twice: żółw & żółw."
+
+    polly.read_blocks(["Intro.\n", text], rate="slow", volume="loud", voice="Joanna")
+
+    whole = "Intro.\n" + text
+    segments = _pushed_segments(polly.player)
+    assert len(segments) > 2
+    spoken = [whole[mark.start : mark.end] for segment in segments for mark in segment.marks]
+    assert spoken == ["Intro."] + "Tom & Jerry say 1 < 2 about żółw. Twice: żółw & żółw.".split()
+
+
+def test_polly_report_error_shows_the_polly_error_details():
+    polly = object.__new__(Polly)
+    polly._show_error_dialog = MagicMock()
+
+    polly.report_error(PollyError("Cannot connect", "Error details: expired"))
+
+    polly._show_error_dialog.assert_called_once_with("Cannot connect", "Error details: expired")
+
+
+def test_polly_ask_polly_without_client_raises_polly_error():
+    polly = object.__new__(Polly)
+    polly.client = None
+    polly._connection_error = "no credentials"
+
+    with pytest.raises(PollyError) as error:
+        polly.ask_polly("<speak>hi</speak>", "Joanna")
+
+    assert "no credentials" in error.value.details
+
+
+def test_polly_read_text_reuses_cached_parts(tmp_path):
+    from cracker.audio_cache import AudioCache
+    from cracker.read_along import WordMark
+
+    polly = object.__new__(Polly)
+    polly.player = MagicMock()
+    polly.cache = AudioCache(str(tmp_path))
+    polly.ask_polly = MagicMock(return_value={"AudioStream": MagicMock(read=lambda: b"audio")})
+    polly._fetch_marks = MagicMock(return_value=[WordMark(0, "Hello")])
+
+    polly.read_text("Hello", rate="medium", volume="medium", voice="Joanna")
+    polly.read_text("Hello", rate="medium", volume="medium", voice="Joanna")
+
+    polly.ask_polly.assert_called_once()  # second read served from the cache
+    first, second = _pushed_segments(polly.player)
+    assert first.path == second.path
+    assert [mark.value for mark in second.marks] == ["Hello"]
+
+    polly.read_text("Hello", rate="fast", volume="medium", voice="Joanna")
+    assert polly.ask_polly.call_count == 2  # a different rate is a different entry
+
+
+def test_polly_read_text_refetches_marks_that_failed(tmp_path):
+    from cracker.audio_cache import AudioCache
+
+    polly = object.__new__(Polly)
+    polly.player = MagicMock()
+    polly.cache = AudioCache(str(tmp_path))
+    polly.ask_polly = MagicMock(return_value={"AudioStream": MagicMock(read=lambda: b"audio")})
+    polly._fetch_marks = MagicMock(side_effect=[None, [WordMark(0, "Hello")]])
+
+    polly.read_text("Hello", rate="medium", volume="medium", voice="Joanna")
+    assert len(polly.cache) == 0  # not cached without its marks
+
+    polly.read_text("Hello", rate="medium", volume="medium", voice="Joanna")
+    polly.read_text("Hello", rate="medium", volume="medium", voice="Joanna")
+
+    assert polly._fetch_marks.call_count == 2
+    assert polly.ask_polly.call_count == 2  # the third read is served from the cache
+    first, second, third = _pushed_segments(polly.player)
+    assert len(first.marks) == 0
+    assert [mark.value for mark in second.marks] == [mark.value for mark in third.marks] == ["Hello"]
+
+
+def test_polly_read_text_does_not_cache_failed_parts(tmp_path):
+    from cracker.audio_cache import AudioCache
+
+    polly = object.__new__(Polly)
+    polly.player = MagicMock()
+    polly.cache = AudioCache(str(tmp_path))
     polly.ask_polly = MagicMock(side_effect=RuntimeError("boom"))
 
-    polly.read_text("brand new text", rate="medium", volume="medium", voice="Joanna")
+    with pytest.raises(RuntimeError, match="boom"):
+        polly.read_text("brand new text", rate="medium", volume="medium", voice="Joanna")
 
-    # Cache invalidated so a later read can't replay possibly-overwritten files.
-    assert polly._cached_segments == []
-    assert polly._cached_voice == ""
-    assert polly._cached_ssml == SSML()
-    polly.player.play_segments.assert_not_called()
+    assert len(polly.cache) == 0
+    polly.player.push_segment.assert_not_called()
 
 
 def test_google_uses_explicit_service_account_file():
@@ -145,3 +322,52 @@ def test_google_builds_text_synthesis_request():
     assert kwargs["voice"] is voice
     assert kwargs["input"].text == "Hello"
     assert kwargs["audio_config"].audio_encoding.name == "MP3"
+
+
+def test_google_read_text_streams_chunks_in_order_and_caches_them(tmp_path, monkeypatch):
+    from cracker.audio_cache import AudioCache
+
+    speaker = object.__new__(Google)
+    speaker.player = MagicMock()
+    speaker.cache = AudioCache(str(tmp_path))
+    speaker.max_concurrency = 2
+    monkeypatch.setattr(
+        "cracker.speaker.google.TextParser.pack_text",
+        staticmethod(lambda text, limit, measure=len: iter(["first", "second", "first"])),
+    )
+    speaker.ask_google = MagicMock(side_effect=lambda text, voice: MagicMock(audio_content=text.encode()))
+
+    speaker.read_text("ignored", voice="en-US", rate=120, volume=50)
+
+    segments = [call.args[1] for call in speaker.player.push_segment.call_args_list]
+    contents = []
+    for segment in segments:
+        with open(segment.path, "rb") as audio_file:
+            contents.append(audio_file.read())
+    assert contents == [b"first", b"second", b"first"]
+    assert len(speaker.cache) == 2
+    speaker.player.close_stream.assert_called_once_with(speaker.player.open_stream.return_value)
+
+
+def test_polly_read_blocks_synthesizes_before_later_blocks_are_read():
+    polly = object.__new__(Polly)
+    polly.player = MagicMock()
+    polly.max_concurrency = 1
+    polly.cache = None
+    events = []
+
+    def blocks():
+        for index in range(2):
+            events.append(f"block {index}")
+            yield f"Block {index}."
+
+    def fake_ask(ssml_text, voice):
+        events.append(f"request {ssml_text}")
+        return {"AudioStream": MagicMock(read=lambda: b"audio")}
+
+    polly.ask_polly = fake_ask
+    polly._fetch_marks = MagicMock(return_value=[])
+
+    polly.read_blocks(blocks(), voice="Joanna")
+
+    assert events == ["block 0", "request <speak>Block 0.</speak>", "block 1", "request <speak>Block 1.</speak>"]
@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock
 
+from cracker.cancellation import CancellationToken
 from cracker.cracker import Cracker
 
 
@@ -17,6 +18,8 @@ def test_change_speaker_reuses_one_backend_in_gui():
     cracker = object.__new__(Cracker)
     cracker.player = MagicMock()
     cracker.gui = MagicMock()
+    cracker.synthesis = MagicMock()
+    cracker.speaker = MagicMock()
     speaker = MagicMock()
     cracker.get_speaker = MagicMock(return_value=speaker)
 
@@ -25,3 +28,89 @@ def test_change_speaker_reuses_one_backend_in_gui():
     cracker.get_speaker.assert_called_once_with("espeak", cracker.player)
     cracker.gui.change_speaker.assert_called_once_with("espeak", speaker)
     assert cracker.speaker is speaker
+
+
+def test_change_speaker_stops_and_closes_the_outgoing_speaker():
+    cracker = object.__new__(Cracker)
+    cracker.player = MagicMock()
+    cracker.gui = MagicMock()
+    cracker.synthesis = MagicMock()
+    old_speaker = cracker.speaker = MagicMock()
+    cracker.get_speaker = MagicMock()
+
+    cracker.change_speaker("polly")
+
+    cracker.synthesis.cancel.assert_called_once_with()
+    old_speaker.stop_text.assert_called_once_with()
+    old_speaker.close.assert_called_once_with()
+    cracker.get_speaker.return_value.close.assert_not_called()
+
+
+def test_read_runs_on_the_synthesis_worker_and_stop_cancels_it():
+    cracker = object.__new__(Cracker)
+    cracker.gui = MagicMock(rate="medium", volume="loud")
+    cracker.speaker = MagicMock()
+    cracker.player = MagicMock()
+    cracker.synthesis = MagicMock()
+    cracker.config = MagicMock()
+    cracker.read_parser = MagicMock()
+    cracker.read_parser.reduce.return_value = ("Hello", ["slow"])
+
+    cracker._read("clipboard", "Hello\t")
+    cracker.stop_text()
+
+    cracker.speaker.read_text.assert_not_called()
+    cracker.read_parser.reduce.assert_not_called()
+    (speaker, text, config, reduce), _ = cracker.synthesis.read.call_args
+    assert (speaker, text, config) == (
+        cracker.speaker,
+        "Hello\t",
+        dict(rate="medium", volume="loud", voice=cracker.gui.config.voice),
+    )
+    cracker.synthesis.cancel.assert_called_once()
+    cracker.player.stop.assert_called_once()
+
+    # The worker runs the rules, then reports the text it reads.
+    token = CancellationToken()
+    assert reduce("Hello\t", cancel=token) == ("Hello", ["slow"])
+    assert cracker.read_parser.parser_rules is cracker.config.regex_config
+    cracker._on_read_reduced(token, "Hello", ["slow"])
+    cracker.gui.set_read_source.assert_called_once_with("clipboard", "Hello")
+    cracker.gui.show_message.assert_called_once_with("Skipped slow parser rules: slow")
+
+    token.cancel()
+    cracker._on_read_reduced(token, "Stale", [])
+    cracker.gui.set_read_source.assert_called_once()
+
+
+def test_reduction_result_is_applied_only_to_an_unchanged_document():
+    from cracker.reduction_worker import ReductionJob
+    from cracker.text_diff import TextEdit
+
+    cracker = object.__new__(Cracker)
+    cracker.gui = MagicMock()
+    cracker.reduction = MagicMock()
+    cracker.config = MagicMock()
+    cracker.reduction_parser = MagicMock()
+    cracker.gui.textEdit.toPlainText.return_value = "a\tb"
+    cracker.gui.text_revision.return_value = 3
+
+    cracker.reduce_text()
+    (name, reduce, text, revision), _ = cracker.reduction.start.call_args
+    assert (name, reduce, text, revision) == ("Reduce", cracker.reduction_parser.reduce, "a\tb", 3)
+    assert cracker.reduction_parser.parser_rules is cracker.config.regex_config
+
+    edits = [TextEdit(1, 2, " ")]
+    cracker._on_reduction_finished(ReductionJob("Reduce", 3), edits, ["slow"])
+    cracker.gui.apply_edits.assert_called_once_with(edits)
+    cracker.gui.show_message.assert_called_once_with("Skipped slow parser rules: slow")
+
+    cracker.gui.text_revision.return_value = 4
+    cracker._on_reduction_finished(ReductionJob("Wiki", 3), [TextEdit(0, 1, "stale")], [])
+    cracker.gui.apply_edits.assert_called_once_with(edits)
+
+    cancelled = ReductionJob("Wiki", 4)
+    cancelled.token.cancel()
+    cracker._on_reduction_finished(cancelled, [TextEdit(0, 1, "cancelled")], [])
+    cracker.gui.apply_edits.assert_called_once_with(edits)
+    cracker.gui.textEdit.setText.assert_not_called()
@@ -1,3 +1,4 @@
+import threading
 import wave
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -34,6 +35,20 @@ def _make_main_window(tmp_path: Path, monkeypatch):
     return window, player
 
 
+def _highlighted(window: MainWindow) -> list[tuple[int, int]]:
+    """Start and length of the read-along formats in the editor."""
+    document = window.textEdit.document()
+    assert document is not None
+    spans = []
+    block = document.begin()
+    while block.isValid():
+        layout = block.layout()
+        assert layout is not None
+        spans += [(block.position() + each.start, each.length) for each in layout.formats()]
+        block = block.next()
+    return spans
+
+
 def test_qt_multimedia_player_is_available():
     assert QMediaPlayer is not None
 
@@ -217,6 +232,170 @@ def test_audio_player_play_files_has_no_marks(qt_app: QApplication, tmp_path: Pa
     qt_app.processEvents()
 
 
+def test_audio_player_plays_in_memory_segments_without_files(qt_app: QApplication):
+    player = AudioPlayer()
+
+    player.play_segments([AudioSegment(path="polly-0.mp3", data=b"ID3 fake", marks=[WordMark(0, "Hi")])])
+
+    device = player.sourceDevice()
+    assert device is not None and bytes(device.data()) == b"ID3 fake"
+    assert player.source().fileName() == "polly-0.mp3"
+    assert player.has_marks
+
+    player.stop()
+    assert player.sourceDevice() is None
+    qt_app.processEvents()
+
+
+def test_audio_player_streams_segments_as_they_are_pushed(qt_app: QApplication, tmp_path: Path):
+    player = AudioPlayer()
+    started = QSignalSpy(player.readStarted)
+    finished = QSignalSpy(player.readFinished)
+    queued = QSignalSpy(player.segmentQueued)
+
+    stream = player.open_stream()
+    assert len(started) == 0  # nothing to play until the first segment arrives
+
+    player.push_segment(stream, AudioSegment(path=str(tmp_path / "a.mp3"), marks=[WordMark(0, "Hello")]))
+    assert player.source().toLocalFile() == str(tmp_path / "a.mp3")
+    assert len(started) == 1
+
+    # The first segment ends before the producer catches up: the read waits.
+    player.mediaStatusChanged.emit(QMediaPlayer.MediaStatus.EndOfMedia)
+    assert len(finished) == 0
+
+    player.push_segment(stream, AudioSegment(path=str(tmp_path / "b.mp3"), marks=[WordMark(0, "world")]))
+    assert player.source().toLocalFile() == str(tmp_path / "b.mp3")
+    assert player.current_segment() == 1
+    assert [mark.value for marks in player.segment_marks() for mark in marks] == ["Hello", "world"]
+
+    player.close_stream(stream)
+    player.mediaStatusChanged.emit(QMediaPlayer.MediaStatus.EndOfMedia)
+    assert len(finished) == 1
+    assert [event[0] for event in queued] == [0, 1]
+
+    player.stop()
+    qt_app.processEvents()
+
+
+def test_audio_player_drops_segments_from_replaced_streams(qt_app: QApplication, tmp_path: Path):
+    player = AudioPlayer()
+
+    stale = player.open_stream()
+    current = player.open_stream()
+    player.push_segment(stale, AudioSegment(path=str(tmp_path / "stale.mp3")))
+    player.close_stream(stale)
+    assert player.segment_marks() == []
+
+    player.push_segment(current, AudioSegment(path=str(tmp_path / "current.mp3")))
+    assert player.source().toLocalFile() == str(tmp_path / "current.mp3")
+
+    player.stop()
+    player.push_segment(current, AudioSegment(path=str(tmp_path / "after-stop.mp3")))
+    assert player.segment_marks() == []
+    qt_app.processEvents()
+
+
+def test_audio_player_stop_discards_streams_opened_from_other_threads(qt_app: QApplication, tmp_path: Path):
+    player = AudioPlayer()
+    opened = []
+
+    # A cancelled read opened its stream just before Stop; the open is still queued.
+    worker = threading.Thread(target=lambda: opened.append(player.open_stream()))
+    worker.start()
+    worker.join(timeout=5)
+    player.stop()
+    qt_app.processEvents()
+
+    player.push_segment(opened[0], AudioSegment(path=str(tmp_path / "late.mp3")))
+    assert player.segment_marks() == []
+    assert player.source().isEmpty()
+    qt_app.processEvents()
+
+
+def test_read_along_follows_streamed_segments(qt_app: QApplication, tmp_path: Path, monkeypatch):
+    window, player = _make_main_window(tmp_path, monkeypatch)
+    controller = window.read_along
+    assert controller is not None
+    window.set_read_source("textarea")
+    window.textEdit.setPlainText("Hello world")
+
+    stream = player.open_stream()
+    player.push_segment(stream, AudioSegment(path=str(tmp_path / "a.mp3"), marks=[WordMark(0, "Hello")]))
+    assert controller._mode == "marks"
+    assert controller._session is not None and controller._session.total == 1
+
+    player.push_segment(stream, AudioSegment(path=str(tmp_path / "b.mp3"), marks=[WordMark(0, "world")]))
+    assert controller._session.total == 2
+
+    player.mediaStatusChanged.emit(QMediaPlayer.MediaStatus.EndOfMedia)
+    player.positionChanged.emit(10)
+    assert controller._session.index == 1
+    assert controller._session.highlight_for(1) == (6, 5)
+
+    player.stop()
+    window.close()
+    window.deleteLater()
+    player.deleteLater()
+    qt_app.processEvents()
+
+
+def test_read_along_switches_to_marks_at_the_first_marked_segment(qt_app: QApplication, tmp_path: Path, monkeypatch):
+    window, player = _make_main_window(tmp_path, monkeypatch)
+    controller = window.read_along
+    assert controller is not None
+    window.set_read_source("textarea")
+    window.textEdit.setPlainText("Hello world")
+
+    stream = player.open_stream()
+    player.push_segment(stream, AudioSegment(path=str(tmp_path / "a.mp3")))
+    assert controller._mode == "estimate"
+
+    player.push_segment(stream, AudioSegment(path=str(tmp_path / "b.mp3"), marks=[WordMark(0, "world")]))
+    assert controller._mode == "marks"
+    assert controller._session is not None and controller._session.total == 1
+    assert not controller._timer.isActive()
+
+    player.mediaStatusChanged.emit(QMediaPlayer.MediaStatus.EndOfMedia)
+    player.positionChanged.emit(10)
+    assert controller._session.index == 0
+    assert controller._session.highlight_for(0) == (6, 5)
+
+    player.stop()
+    window.close()
+    window.deleteLater()
+    player.deleteLater()
+    qt_app.processEvents()
+
+
+def test_read_along_places_words_as_segments_start(qt_app: QApplication, tmp_path: Path, monkeypatch):
+    window, player = _make_main_window(tmp_path, monkeypatch)
+    controller = window.read_along
+    assert controller is not None
+    window.set_read_source("textarea", "Hello world again")
+    window.textEdit.setPlainText("Hello world [1] again")
+
+    segments = [
+        AudioSegment(path=str(tmp_path / "a.mp3"), marks=[WordMark(0, "Hello", 0, 5), WordMark(400, "world", 6, 11)]),
+        AudioSegment(path=str(tmp_path / "b.mp3"), marks=[WordMark(0, "again", 12, 17)]),
+        AudioSegment(path=str(tmp_path / "c.mp3"), marks=[]),
+    ]
+    player.play_segments(segments)
+
+    session = controller._session
+    assert session is not None and session.offsets is not None
+    # The first segment is placed as it starts, the next one once the event loop is idle.
+    assert session.word_spans == {0: (0, 5), 1: (6, 5)}
+    qt_app.processEvents()
+    assert session.word_spans[2] == (16, 5)
+
+    player.stop()
+    window.close()
+    window.deleteLater()
+    player.deleteLater()
+    qt_app.processEvents()
+
+
 def test_read_along_marks_mode_tracks_playback_position(qt_app: QApplication, tmp_path: Path, monkeypatch):
     window, player = _make_main_window(tmp_path, monkeypatch)
     controller = window.read_along
@@ -235,7 +414,7 @@ def test_read_along_marks_mode_tracks_playback_position(qt_app: QApplication, tm
 
     player.positionChanged.emit(450)  # Hello(0) and world(400) started -> "world"
     assert controller._session.index == 1
-    assert window.textEdit.extraSelections()  # highlight rendered
+    assert _highlighted(window) == [(0, 6), (6, 5)]  # "Hello " read, "world" spoken
     assert window.readProgress.value() > 0
 
     player.mediaStatusChanged.emit(QMediaPlayer.MediaStatus.EndOfMedia)  # advance to segment 1
@@ -243,7 +422,7 @@ def test_read_along_marks_mode_tracks_playback_position(qt_app: QApplication, tm
     assert controller._session.index == 2
 
     player.stop()  # emits readFinished -> controller clears read-along
-    assert window.textEdit.extraSelections() == []
+    assert _highlighted(window) == []
 
     window.close()
     player.stop()
@@ -263,7 +442,7 @@ def test_read_along_estimate_paces_clipboard_by_read_text(qt_app: QApplication,
 
     assert controller._mode == "estimate"
     assert controller._session is not None and controller._session.total == 3  # from read text, not editor
-    assert window.textEdit.extraSelections() == []  # clipboard reads don't highlight
+    assert _highlighted(window) == []  # clipboard reads don't highlight
 
     player.stop()
     window.close()
@@ -329,3 +508,43 @@ def test_global_shortcut_emits_after_full_sequence(listener):
     assert emitted == [True]
     assert manager._pressed == set()
     listener.assert_called_once()
+
+
+def test_text_area_is_not_read_while_a_reduction_runs(qt_app: QApplication, tmp_path: Path, monkeypatch):
+    window, player = _make_main_window(tmp_path, monkeypatch)
+
+    window.set_reducing("Reduce", 10)
+    assert not window.read_action.isEnabled() and window.clipboard_read_action.isEnabled()
+
+    window.set_reducing(None)
+    assert window.read_action.isEnabled()
+
+    window.close()
+    window.deleteLater()
+    player.deleteLater()
+    qt_app.processEvents()
+
+
+def test_read_along_takes_the_editor_text_once_per_read(qt_app: QApplication, tmp_path: Path, monkeypatch):
+    window, player = _make_main_window(tmp_path, monkeypatch)
+    controller = window.read_along
+    assert controller is not None
+    window.set_read_source("textarea")
+    window.textEdit.setPlainText("Hello world again")
+    calls = []
+    editor_text = window.editor_text
+    monkeypatch.setattr(window, "editor_text", lambda: calls.append(1) or editor_text())
+
+    stream = player.open_stream()
+    for index, word in enumerate(["Hello", "world", "again"]):
+        player.push_segment(stream, AudioSegment(path=str(tmp_path / f"{index}.mp3"), marks=[WordMark(0, word)]))
+
+    assert controller._session is not None and controller._session.total == 3
+    assert controller._session.highlight_for(2) == (12, 5)
+    assert len(calls) == 1
+
+    player.stop()
+    window.close()
+    window.deleteLater()
+    player.deleteLater()
+    qt_app.processEvents()
@@ -0,0 +1,98 @@
+from PyQt6.QtGui import QColor, QTextCharFormat
+from PyQt6.QtWidgets import QApplication
+
+from cracker.view.document_editor import DocumentEditor
+
+TEXT = "".join(f"Paragraph {number} has a few words.\n" for number in range(5000))
+
+
+def _formats() -> tuple[QTextCharFormat, QTextCharFormat]:
+    word = QTextCharFormat()
+    word.setBackground(QColor("yellow"))
+    read = QTextCharFormat()
+    read.setForeground(QColor("black"))
+    return word, read
+
+
+def _spans(editor: DocumentEditor) -> list[tuple[int, int, str]]:
+    """Formatted ranges in document positions, named after their format."""
+    document = editor.document()
+    assert document is not None
+    spans = []
+    block = document.begin()
+    while block.isValid():
+        layout = block.layout()
+        assert layout is not None
+        for format_range in layout.formats():
+            name = "word" if format_range.format.background().color() == QColor("yellow") else "read"
+            start = block.position() + format_range.start
+            spans.append((start, start + format_range.length, name))
+        block = block.next()
+    return spans
+
+
+def _formatted_blocks(monkeypatch) -> list[int]:
+    """Records the number of every block the editor formats."""
+    formatted: list[int] = []
+    format_block = DocumentEditor._format_block
+
+    def record(block, ranges):
+        formatted.append(block.blockNumber())
+        format_block(block, ranges)
+
+    monkeypatch.setattr(DocumentEditor, "_format_block", staticmethod(record))
+    return formatted
+
+
+def _editor(qt_app: QApplication, text: str) -> DocumentEditor:
+    editor = DocumentEditor()
+    editor.resize(400, 200)
+    editor.setPlainText(text)
+    editor.show()
+    qt_app.processEvents()
+    return editor
+
+
+def test_highlight_formats_the_word_and_the_text_read_before_it(qt_app: QApplication):
+    editor = _editor(qt_app, "One two.\nThree four.\nFive.")
+    word, read = _formats()
+
+    editor.set_highlight(15, 4, word, read)
+
+    assert editor.property("reading") is True
+    assert _spans(editor) == [(0, 9, "read"), (9, 15, "read"), (15, 19, "word")]
+
+    editor.clear_highlight()
+
+    assert editor.property("reading") is False
+    assert _spans(editor) == []
+    editor.close()
+
+
+def test_moving_the_highlight_only_touches_the_blocks_of_both_words(qt_app: QApplication, monkeypatch):
+    editor = _editor(qt_app, TEXT)
+    word, read = _formats()
+    middle = TEXT.index("Paragraph 2500 ")
+    editor.set_highlight(middle, 9, word, read)
+    formatted = _formatted_blocks(monkeypatch)
+
+    editor.set_highlight(middle + 10, 4, word, read)
+    next_block = middle + TEXT[middle:].index("\n") + 1
+    editor.set_highlight(next_block, 9, word, read)
+
+    assert formatted == [2500, 2500, 2501]
+    assert _spans(editor)[-2:] == [(middle, next_block, "read"), (next_block, next_block + 9, "word")]
+    editor.close()
+
+
+def test_moving_the_highlight_back_dims_the_text_after_it_again(qt_app: QApplication):
+    editor = _editor(qt_app, "One two.\nThree four.\nFive.")
+    word, read = _formats()
+    editor.set_highlight(21, 5, word, read)
+
+    editor.set_highlight(4, 4, word, read)
+
+    assert _spans(editor) == [(0, 4, "read"), (4, 8, "word")]
+    editor.clear_highlight()
+    assert _spans(editor) == []
+    editor.close()
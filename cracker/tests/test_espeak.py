@@ -0,0 +1,71 @@
+import stat
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.speaker.espeak import Espeak, EspeakError
+
+
+def _fake_espeak(tmp_path: Path, monkeypatch, body: str) -> None:
+    """Puts an `espeak` script that runs ``body`` first on PATH."""
+    script = tmp_path / "bin" / "espeak"
+    script.parent.mkdir()
+    script.write_text(f"#!/bin/sh\n{body}\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{script.parent}:{Path('/bin')}:{Path('/usr/bin')}")
+
+
+def _pushed(player) -> list[bytes]:
+    return [call.args[1].data for call in player.push_segment.call_args_list]
+
+
+def test_parallel_read_renders_chunks_concurrently_and_plays_them_in_order(tmp_path, monkeypatch):
+    # Echoes the chunk back as its "audio"; the first chunk is the slowest.
+    _fake_espeak(tmp_path, monkeypatch, 'text=$(cat); case "$text" in First*) sleep 0.3;; esac; printf "%s" "$text"')
+    speaker = Espeak(MagicMock(), max_concurrency=3, chunk_chars=10)
+
+    started = time.monotonic()
+    speaker.read_text("First one. Second one. Third one.", voice="en", rate=160)
+
+    assert _pushed(speaker.player) == [b"First one.", b"Second one.", b"Third one."]
+    assert time.monotonic() - started < 0.9  # not three sleeps in a row
+    assert all(path.endswith(".wav") for path in (c.args[1].path for c in speaker.player.push_segment.call_args_list))
+
+
+def test_parallel_read_reports_failed_chunks(tmp_path, monkeypatch):
+    _fake_espeak(tmp_path, monkeypatch, 'echo "unknown voice" >&2; exit 1')
+    speaker = Espeak(MagicMock(), max_concurrency=2)
+
+    with pytest.raises(EspeakError, match="unknown voice"):
+        speaker.read_text("Hello there.", voice="nope")
+
+    speaker.player.close_stream.assert_called_once()
+
+
+def test_cancel_kills_running_espeak_processes(tmp_path, monkeypatch):
+    _fake_espeak(tmp_path, monkeypatch, "exec sleep 30")
+    speaker = Espeak(MagicMock(), max_concurrency=2)
+    cancel = CancellationToken()
+    threading.Timer(0.2, cancel.cancel).start()
+
+    started = time.monotonic()
+    with pytest.raises(Cancelled):
+        speaker.read_text("One. Two.", cancel, voice="en")
+
+    assert time.monotonic() - started < 5
+    speaker.player.push_segment.assert_not_called()
+
+
+def test_serial_read_renders_the_whole_text_to_memory(tmp_path, monkeypatch):
+    _fake_espeak(tmp_path, monkeypatch, 'printf "%s" "$(cat)"')
+    monkeypatch.chdir(tmp_path)
+    speaker = Espeak(MagicMock(), parallel=False)
+
+    speaker.read_text("First sentence. Second one.", voice="English")
+
+    assert _pushed(speaker.player) == [b"First sentence. Second one."]
+    assert list(tmp_path.iterdir()) == [tmp_path / "bin"]
@@ -0,0 +1,106 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from cracker.file_source import HtmlStripper, MarkdownStripper, open_text_file, paragraph_blocks
+from cracker.text_parser import TextParser
+
+
+def _feed_in_pieces(stripper, text, size=5):
+    return "".join(stripper.feed(text[start : start + size]) for start in range(0, len(text), size)) + stripper.close()
+
+
+def test_text_file_is_decoded_in_blocks_that_end_at_paragraph_breaks(tmp_path):
+    paragraphs = [f"Zażółć gęślą jaźń, akapit {index}." for index in range(20)]
+    text = "\n\n".join(paragraphs) + "\n"
+    path = tmp_path / "book.txt"
+    path.write_text(text, encoding="utf-8")
+
+    blocks = list(open_text_file(str(path), block_chars=100, chunk_bytes=7))
+
+    assert "".join(blocks) == text
+    assert all(len(block) <= 100 for block in blocks)
+    assert all(block.endswith("\n\n") for block in blocks[:-1])
+
+
+def test_blocks_fall_back_to_line_breaks_spaces_and_hard_cuts():
+    assert list(paragraph_blocks(["aaaa\nbbbb cccc"], block_chars=8)) == ["aaaa\n", "bbbb ", "cccc"]
+    assert list(paragraph_blocks(["x" * 10, "  \n\n"], block_chars=4)) == ["xxxx", "xxxx", "xx  "]
+
+
+def test_empty_and_missing_files(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert list(open_text_file(str(path))) == []
+
+    with pytest.raises(OSError):
+        open_text_file(str(tmp_path / "missing.txt"))
+
+
+def test_markdown_keeps_the_words_and_drops_the_markup():
+    markdown = (
+        "# Title #\n"
+        "Some *emphasis*, **bold** and `code`, a [link](http://example.com) and snake_case_name.\n"
+        "\n"
+        "- first item\n"
+        "2. second item\n"
+        "> quoted ![alt text](image.png)\n"
+        "```python\n"
+        "print('never read')\n"
+        "```\n"
+        "---\n"
+        "[link]: http://example.com\n"
+        "Last line"
+    )
+
+    assert _feed_in_pieces(MarkdownStripper(), markdown) == (
+        "Title\n"
+        "Some emphasis, bold and code, a link and snake_case_name.\n"
+        "\n"
+        "first item\n"
+        "second item\n"
+        "quoted alt text\n"
+        "\n"
+        "\n"
+        "Last line"
+    )
+
+
+def test_html_keeps_readable_text_with_paragraph_breaks():
+    html = (
+        "<html><head><title>Skipped</title><style>p { color: red }</style></head>"
+        "<body><h1>Heading</h1><p>First   paragraph\n with &amp; entity.</p>"
+        "<script>var x = '<p>never</p>';</script><ul><li>one</li><li>two</li></ul>"
+        "<p>Line<br>break</p></body></html>"
+    )
+
+    assert _feed_in_pieces(HtmlStripper(), html) == (
+        "Heading\n\nFirst paragraph with & entity.\n\none\ntwo\n\nLine\nbreak\n\n"
+    )
+
+
+def test_markup_is_recognised_by_extension(tmp_path):
+    path = tmp_path / "page.HTML"
+    path.write_text("<p>Hello <b>world</b></p>")
+
+    assert list(open_text_file(str(path))) == ["Hello world\n\n"]
+
+
+def test_text_parser_reduces_blocks_lazily(monkeypatch):
+    monkeypatch.setattr("cracker.text_parser.Configuration", MagicMock())
+    parser = TextParser(rule_budget_ms=0)
+    parser.parser_rules = {"tabs": {"name": "tabs", "active": True, "key": "\t", "value": " "}}
+    pulled = []
+
+    def blocks():
+        for block in ("a\tb\n\n", "c\td"):
+            pulled.append(block)
+            yield block
+
+    skipped: list[str] = []
+    reduced = parser.reduce_blocks(blocks(), skipped)
+
+    assert next(reduced) == "a b\n\n"
+    assert pulled == ["a\tb\n\n"]
+    assert list(reduced) == ["c d"]
+    assert skipped == []
@@ -1,16 +1,37 @@
 import asyncio
+import threading
+import time
 from unittest.mock import MagicMock
 
 import httpx
 import pytest
+from PyQt6.QtCore import Qt
 
+from cracker import file_source
+from cracker.audio_cache import AudioCache
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.file_source import open_text_file
 from cracker.speaker.frogger import Frogger, FroggerError
+from cracker.synthesis_worker import SynthesisWorker
+
+
+def _queued(parts):
+    """A part queue as ``read_blocks`` fills it, ended by ``None``."""
+    queue = asyncio.Queue()
+    for part in [*parts, None]:
+        queue.put_nowait(part)
+    return queue
+
+
+def _pushed_paths(player):
+    return [call.args[1].path for call in player.push_segment.call_args_list]
 
 
 def test_read_text_downloads_parts_and_plays_them_in_order():
     frogger = object.__new__(Frogger)
     frogger.player = MagicMock()
-    frogger.play_files = MagicMock()
+    frogger.cache = None
+    frogger.max_concurrency = 4
 
     filenames = {"First.": "first.wav", "Second.": "second.wav"}
 
@@ -20,11 +41,12 @@ def test_read_text_downloads_parts_and_plays_them_in_order():
 
     async def run_test():
         async with httpx.AsyncClient(transport=httpx.MockTransport(respond)) as client:
-            await frogger._read_text(["First.", "Second."], voice="English", client=client)
+            await frogger._read_text(_queued(["First.", "Second."]), voice="English", client=client)
 
     asyncio.run(run_test())
 
-    frogger.play_files.assert_called_once_with(["first.wav", "second.wav"])
+    assert _pushed_paths(frogger.player) == ["first.wav", "second.wav"]
+    frogger.player.close_stream.assert_called_once_with(frogger.player.open_stream.return_value)
 
 
 def test_frogger_reports_http_failures():
@@ -53,3 +75,207 @@ def test_frogger_rejects_invalid_responses():
 
     with pytest.raises(FroggerError, match="invalid response"):
         asyncio.run(run_test())
+
+
+def test_read_text_limits_requests_in_flight():
+    frogger = object.__new__(Frogger)
+    frogger.cache = None
+    frogger.max_concurrency = 2
+    frogger.player = MagicMock()
+    in_flight = 0
+    peak = 0
+
+    async def fetch(client, index, text, voice):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return f"{index}.wav"
+
+    frogger._fetch_part = fetch
+
+    asyncio.run(frogger._read_text(_queued([str(index) for index in range(6)]), voice="English", client=MagicMock()))
+
+    assert peak == 2
+    assert _pushed_paths(frogger.player) == [f"{index}.wav" for index in range(6)]
+
+
+def test_read_text_reuses_one_client_on_a_persistent_loop():
+    frogger = Frogger(MagicMock(), max_concurrency=2, batch_chars=0)
+    seen = []
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"filename": request.url.params["text"] + ".wav"})
+
+    frogger._create_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(respond))
+
+    async def fetch(client, index, text, voice):
+        seen.append((client, threading.current_thread().name))
+        return await Frogger._fetch_part(frogger, client, index, text, voice)
+
+    frogger._fetch_part = fetch
+    try:
+        frogger.read_text("First. Second.", voice="English")
+        frogger.read_text("Third.", voice="English")
+    finally:
+        frogger.close()
+
+    assert len({id(client) for client, _ in seen}) == 1
+    assert {thread for _, thread in seen} == {"frogger"}
+    assert _pushed_paths(frogger.player) == ["First..wav", "Second..wav", "Third..wav"]
+
+
+def test_cancelled_read_cancels_requests_in_flight():
+    frogger = Frogger(MagicMock())
+    frogger._create_client = MagicMock()
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    async def hang(client, index, text, voice):
+        started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    frogger._fetch_cached_part = hang
+    cancel = CancellationToken()
+    threading.Thread(target=lambda: started.wait(5) and cancel.cancel()).start()
+    try:
+        with pytest.raises(Cancelled):
+            frogger.read_text("Hello.", cancel, voice="English")
+        assert cancelled.wait(timeout=5)
+    finally:
+        frogger.close()
+    frogger.player.push_segment.assert_not_called()
+    frogger.player.close_stream.assert_called_once()
+
+
+def test_read_text_plays_earlier_parts_while_later_ones_download():
+    frogger = object.__new__(Frogger)
+    frogger.cache = None
+    frogger.max_concurrency = 2
+    frogger.player = MagicMock()
+    pushed_before_last = []
+
+    async def fetch(client, index, text, voice):
+        if index == 2:
+            await asyncio.sleep(0.05)
+            pushed_before_last.extend(_pushed_paths(frogger.player))
+        return f"{index}.wav"
+
+    frogger._fetch_part = fetch
+
+    asyncio.run(frogger._read_text(_queued(["a", "b", "c"]), voice="English", client=MagicMock()))
+
+    assert pushed_before_last == ["0.wav", "1.wav"]
+    assert _pushed_paths(frogger.player) == ["0.wav", "1.wav", "2.wav"]
+
+
+def test_failed_part_stops_the_stream_after_earlier_parts():
+    frogger = object.__new__(Frogger)
+    frogger.cache = None
+    frogger.max_concurrency = 2
+    frogger.player = MagicMock()
+
+    async def fetch(client, index, text, voice):
+        if index == 1:
+            raise FroggerError("part 1 failed")
+        return f"{index}.wav"
+
+    frogger._fetch_part = fetch
+
+    with pytest.raises(FroggerError):
+        asyncio.run(frogger._read_text(_queued(["a", "b", "c"]), voice="English", client=MagicMock()))
+
+    assert _pushed_paths(frogger.player) == ["0.wav"]
+    frogger.player.close_stream.assert_called_once()
+
+
+def test_cache_is_used_off_the_loop_thread(tmp_path):
+    frogger = object.__new__(Frogger)
+    frogger.cache = AudioCache(str(tmp_path / "cache"))
+    frogger.max_concurrency = 2
+    frogger.player = MagicMock()
+    served = tmp_path / "part.wav"
+    served.write_bytes(b"RIFF")
+    threads = []
+    get, put = frogger.cache.get, frogger.cache.put
+
+    def recording(method):
+        def record(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return method(*args, **kwargs)
+
+        return record
+
+    frogger.cache.get, frogger.cache.put = recording(get), recording(put)
+
+    async def fetch(client, index, text, voice):
+        return str(served)
+
+    frogger._fetch_part = fetch
+
+    async def read_twice():
+        await frogger._read_text(_queued(["Hello."]), voice="English", client=MagicMock())
+        await frogger._read_text(_queued(["Hello."]), voice="English", client=MagicMock())
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(read_twice())
+
+    assert len(threads) == 3
+    assert loop_thread not in threads
+    first, second = _pushed_paths(frogger.player)
+    assert first == second != str(served)
+
+
+def test_cancelled_file_read_closes_the_file(tmp_path, monkeypatch):
+    path = tmp_path / "book.txt"
+    path.write_text("A sentence to read.\n\n" * 2000)
+    opened = []
+
+    def recording_open(*args):
+        opened.append(open(*args))
+        return opened[-1]
+
+    monkeypatch.setattr(file_source, "open", recording_open, raising=False)
+    frogger = Frogger(MagicMock(), batch_chars=0)
+    frogger._create_client = MagicMock()
+
+    async def hang(client, index, text, voice):
+        await asyncio.sleep(30)
+
+    frogger._fetch_cached_part = hang
+    worker = SynthesisWorker()
+    failures = []
+    worker.failed.connect(lambda speaker, error: failures.append(error), Qt.ConnectionType.DirectConnection)
+    pulling = threading.Event()
+    cancelled = threading.Event()
+
+    def blocks():
+        # Still being advanced for the next part when the read is cancelled.
+        source = open_text_file(str(path), block_chars=64)
+        try:
+            yield next(source)
+            pulling.set()
+            cancelled.wait(timeout=5)
+            time.sleep(0.2)
+            yield from source
+        finally:
+            source.close()
+
+    try:
+        token = worker.read_blocks(frogger, blocks(), {"voice": "English"})
+        token.add_callback(cancelled.set)
+        assert pulling.wait(timeout=5)
+        token.cancel()
+        worker._executor.shutdown(wait=True)
+        # Closed by the worker as the read ends, not later by the garbage collector.
+        (file,) = opened
+        assert file.closed
+    finally:
+        frogger.close()
+
+    assert failures == []
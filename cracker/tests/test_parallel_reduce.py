@@ -0,0 +1,86 @@
+import json
+import random
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.parallel_reduce import ParallelReducer, shard_spans
+from cracker.text_parser import TextParser
+from cracker.text_rules import RulePipeline
+
+DEFAULT_RULES = json.loads((Path(__file__).parents[1] / "config" / "parser.json").read_text())["parser_rules"]
+
+
+def _document(paragraphs: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = ["alpha", "Beta", "(Smith, 2020)", "co-\nop", "- ", "\t", "[12]", "gamma.", "[citation needed]"]
+    parts = []
+    for _ in range(paragraphs):
+        first = rng.choice(["Upper", "lower"])
+        parts.append(first + " " + " ".join(rng.choice(words) for _ in range(rng.randint(5, 40))))
+    return "\n\n".join(parts)
+
+
+@pytest.fixture
+def reducer():
+    reducer = ParallelReducer(min_chars=1, workers=2, shard_chars=1000)
+    yield reducer
+    reducer.close()
+
+
+def test_shards_tile_the_text_at_paragraph_breaks():
+    pipeline = RulePipeline([])
+    text = _document(200)
+
+    spans = list(shard_spans(text, pipeline, 1000))
+
+    assert len(spans) > 5
+    assert "".join(text[start:end] for start, end in spans) == text
+    assert all(text[:start].endswith("\n\n") for start, _ in spans[1:])
+
+
+def test_seams_that_the_rules_would_join_are_skipped():
+    pipeline = RulePipeline.from_config(DEFAULT_RULES)
+    # "extensive_new_line" joins a blank line into a paragraph that starts in lowercase.
+    text = "x" * 50 + "\n\nlower case" + "\n\nUpper case"
+
+    assert list(shard_spans(text, pipeline, 40)) == [(0, len(text) - len("Upper case")), (len(text) - 10, len(text))]
+
+
+def test_parallel_reduction_matches_the_sequential_result(reducer):
+    pipeline = RulePipeline.from_config(DEFAULT_RULES)
+    text = _document(300)
+    expected = RulePipeline.from_config(DEFAULT_RULES).apply(text)
+
+    progress = []
+
+    assert reducer.reduce(pipeline, text, progress=lambda done, total: progress.append((done, total))) == expected
+    assert sum(stats.matches for stats in pipeline.stats()) > 0
+    assert progress[-1][0] == progress[-1][1] > 1
+
+
+def test_text_parser_shards_large_texts_only(monkeypatch):
+    monkeypatch.setattr("cracker.text_parser.Configuration", MagicMock())
+    parser = TextParser(rule_budget_ms=0, parallel_min_chars=5000, parallel_workers=2)
+    parser._parallel.shard_chars = 1000
+    monkeypatch.setattr(parser._parallel, "reduce", MagicMock(wraps=parser._parallel.reduce))
+    try:
+        small, large = _document(5), _document(300)
+
+        assert parser.apply_rules(TextParser.WIKI_RULES, small) == (TextParser.wiki_text(small), [])
+        parser._parallel.reduce.assert_not_called()
+        assert parser.apply_rules(TextParser.WIKI_RULES, large) == (TextParser.wiki_text(large), [])
+        parser._parallel.reduce.assert_called_once()
+    finally:
+        parser.close()
+
+
+def test_cancelled_reduction_stops_the_workers(reducer):
+    cancel = CancellationToken()
+    cancel.cancel()
+
+    with pytest.raises(Cancelled):
+        reducer.reduce(RulePipeline.from_config(DEFAULT_RULES), _document(300), cancel=cancel)
+    assert reducer._executor is None
@@ -0,0 +1,133 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.read_along import AudioSegment
+from cracker.speaker.pipeline import ordered_map, stream_segments
+
+
+def test_ordered_map_yields_in_input_order_despite_completion_order():
+    def slow_first(index, item):
+        time.sleep(0.05 if index == 0 else 0)
+        return item * 2
+
+    assert list(ordered_map(slow_first, [1, 2, 3, 4], max_workers=4)) == [2, 4, 6, 8]
+
+
+def test_ordered_map_bounds_work_submitted_ahead_of_the_consumer():
+    consumed = []
+
+    def items():
+        for number in range(100):
+            consumed.append(number)
+            yield number
+
+    results = ordered_map(lambda index, item: item, items(), max_workers=2)
+    assert next(results) == 0
+    assert len(consumed) <= 4  # 2 * max_workers, not the whole input
+    results.close()
+
+
+def test_ordered_map_runs_up_to_max_workers_at_once():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_peers(index, item):
+        barrier.wait()
+        return item
+
+    assert list(ordered_map(wait_for_peers, "abc", max_workers=3)) == ["a", "b", "c"]
+
+
+def test_ordered_map_raises_the_first_failure_in_order():
+    def fail_on_two(index, item):
+        if item == 2:
+            raise ValueError("two")
+        return item
+
+    results = ordered_map(fail_on_two, [1, 2, 3], max_workers=3)
+    assert next(results) == 1
+    with pytest.raises(ValueError, match="two"):
+        next(results)
+
+
+def test_ordered_map_is_serial_with_a_single_worker():
+    threads = set()
+
+    def record(index, item):
+        threads.add(threading.get_ident())
+        return item
+
+    assert list(ordered_map(record, [1, 2], max_workers=1)) == [1, 2]
+    assert threads == {threading.get_ident()}
+
+
+def test_ordered_map_stops_waiting_for_in_flight_calls_once_cancelled():
+    cancel = CancellationToken()
+    release = threading.Event()
+
+    def stuck(index, item):
+        release.wait(timeout=5)
+        return item
+
+    results = ordered_map(stuck, [1, 2], max_workers=2, cancel=cancel)
+    threading.Timer(0.05, cancel.cancel).start()
+    started = time.monotonic()
+    with pytest.raises(Cancelled):
+        next(results)
+    assert time.monotonic() - started < 2
+    release.set()
+
+
+def test_stream_segments_pushes_segments_in_order_then_closes():
+    sink = MagicMock()
+    sink.open_stream.return_value = 3
+    segments = [AudioSegment(path="a.mp3"), AudioSegment(path="b.mp3")]
+
+    stream_segments(sink, iter(segments))
+
+    assert [call.args for call in sink.push_segment.call_args_list] == [(3, segments[0]), (3, segments[1])]
+    sink.close_stream.assert_called_once_with(3)
+
+
+def test_stream_segments_closes_the_stream_and_raises_the_error():
+    sink = MagicMock()
+
+    def failing():
+        yield AudioSegment(path="a.mp3")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        stream_segments(sink, failing())
+
+    assert sink.push_segment.call_count == 1
+    sink.close_stream.assert_called_once_with(sink.open_stream.return_value)
+
+
+def test_cancelled_stream_stops_pushing():
+    sink = MagicMock()
+    cancel = CancellationToken()
+
+    def cancelled_midway():
+        yield AudioSegment(path="a.mp3")
+        cancel.cancel()
+        yield AudioSegment(path="b.mp3")
+
+    with pytest.raises(Cancelled):
+        stream_segments(sink, cancelled_midway(), cancel)
+
+    assert sink.push_segment.call_count == 1
+    sink.close_stream.assert_called_once()
+
+
+def test_cancelled_read_never_opens_a_stream():
+    sink = MagicMock()
+    cancel = CancellationToken()
+    cancel.cancel()
+
+    with pytest.raises(Cancelled):
+        stream_segments(sink, [AudioSegment(path="a.mp3")], cancel)
+
+    sink.open_stream.assert_not_called()
@@ -1,12 +1,23 @@
+import dataclasses
+import re
+
+import pytest
+
 from cracker.read_along import (
+    AudioSegment,
     EstimateProgressSource,
     MarksProgressSource,
     WordMark,
+    WordMarks,
+    WordSpans,
     align_spoken_to_editor,
     build_session,
+    extend_session,
     normalize_word,
     parse_speech_marks,
+    placed_marks,
 )
+from cracker.text_diff import OffsetMap, substitute
 
 
 def test_normalize_word_strips_edge_punctuation_and_lowercases():
@@ -25,6 +36,7 @@ def test_parse_speech_marks_keeps_word_marks_in_order():
     )
     marks = parse_speech_marks(data)
     assert [(mark.time_ms, mark.value) for mark in marks] == [(0, "Hello"), (312, "world")]
+    assert [(mark.start, mark.end) for mark in marks] == [(0, 5), (6, 11)]
 
 
 def test_parse_speech_marks_skips_malformed_lines():
@@ -100,6 +112,24 @@ def test_marks_progress_source_maps_position_to_global_index():
     assert source.progress(segment_index=9, position_ms=0) is None  # out of range
 
 
+def test_marks_progress_source_bisects_long_segments_and_skips_empty_ones():
+    segments = [[WordMark(100 * word, str(word)) for word in range(1000)], [], [WordMark(0, "x"), WordMark(50, "y")]]
+    source = MarksProgressSource(segments)
+
+    assert source.progress(segment_index=0, position_ms=54_321).word_index == 543
+    assert source.progress(segment_index=0, position_ms=10**6).word_index == 999
+    assert source.progress(segment_index=1, position_ms=500) is None
+    assert source.progress(segment_index=2, position_ms=50).word_index == 1001
+
+
+def test_marks_progress_source_finds_the_time_of_a_word():
+    source = MarksProgressSource([[WordMark(0, "a"), WordMark(400, "b")], [], [WordMark(30, "c")]])
+    source.add_segment([WordMark(70, "d")])
+
+    assert [source.time_of(index) for index in range(4)] == [(0, 0), (0, 400), (2, 30), (3, 70)]
+    assert source.time_of(-1) is None and source.time_of(4) is None
+
+
 def test_estimate_progress_source_advances_with_elapsed():
     source = EstimateProgressSource(total=10, wpm=200)  # total_sec = 3.0
     assert source.progress(elapsed_sec=0.0).words_done == 0
@@ -122,6 +152,114 @@ def test_build_session_marks_textarea_maps_editor_spans():
     assert session.word_spans == {0: (0, 5), 1: (6, 5)}
 
 
+def test_build_session_places_marks_with_offsets_through_the_reduction():
+    editor_text = "A claim [12] is here.\tAnd there [3]."
+    read_text = "A claim is here. And there."
+    words = [(match.group(), match.start(), match.end()) for match in re.finditer(r"\S+", read_text)]
+    marks = [WordMark(100 * index, word, start, end) for index, (word, start, end) in enumerate(words)]
+
+    session = build_session(
+        source="textarea", editor_text=editor_text, read_text=read_text, segment_marks=[marks[:3]], wpm=200
+    )
+    extend_session(session, editor_text=editor_text, segment_marks=[marks[:3], marks[3:]])
+
+    assert session.offsets is not None
+    located = [session.highlight_for(index) for index in range(session.total)]
+    spans = [editor_text[span[0] : span[0] + span[1]] for span in located if span is not None]
+    # A word spans whatever the rules removed inside it.
+    assert spans == ["A", "claim", "is", "here.", "And", "there [3]."]
+
+
+def test_marks_are_placed_one_segment_at_a_time():
+    paragraphs = [f"Paragraph {number} [{number}] reads on." for number in range(200)]
+    editor_text = "\n".join(paragraphs)
+    read_text = "\n".join(re.sub(r" \[\d+\]", "", paragraph) for paragraph in paragraphs)
+    segments = []
+    for line in re.finditer(r".+", read_text):
+        words = re.finditer(r"\S+", line.group())
+        segments.append(
+            [
+                WordMark(100 * index, word.group(), line.start() + word.start(), line.start() + word.end())
+                for index, word in enumerate(words)
+            ]
+        )
+
+    session = build_session(
+        source="textarea", editor_text=editor_text, read_text=read_text, segment_marks=segments, wpm=200
+    )
+    assert session.total == 800 and session.word_spans == {}
+
+    session.resolve_segment(1)
+    assert sorted(session.word_spans) == [4, 5, 6, 7]
+    # Only the start of the diff was needed to get there.
+    assert session.offsets is not None and len(session.offsets._edits) < 100
+
+    span = session.highlight_for(797)
+    assert span is not None and editor_text[span[0] : span[0] + span[1]] == "199"
+    assert sorted(session.word_spans) == [4, 5, 6, 7, 796, 797, 798, 799]
+
+
+def test_marks_without_offsets_fall_back_to_word_alignment():
+    with_offsets = [WordMark(0, "Hello", 0, 5)]
+    session = build_session(
+        source="textarea", editor_text="Hello world", read_text="Hello world", segment_marks=[with_offsets], wpm=200
+    )
+    assert session.offsets is not None
+
+    extend_session(session, editor_text="Hello world", segment_marks=[with_offsets, [WordMark(0, "world")]])
+
+    assert session.offsets is None
+    assert session.word_spans == {0: (0, 5), 1: (6, 5)}
+
+
+def test_word_marks_are_stored_by_column_behind_the_sequence():
+    listed = [WordMark(0, "Zażółć", 0, 6), WordMark(450, "gęślą"), WordMark(900, "jaźń", 13, 17)]
+
+    marks = WordMarks(listed)
+
+    assert len(marks) == 3 and marks == listed and listed == marks
+    assert marks[1] == WordMark(450, "gęślą") and marks[-1].value == "jaźń"
+    assert marks[1:] == listed[1:] and isinstance(marks[1:], WordMarks)
+    assert list(marks.times) == [0, 450, 900] and marks.values() == ["Zażółć", "gęślą", "jaźń"]
+    assert not marks.located() and WordMarks(listed[::2]).located() and WordMarks().located()
+    with pytest.raises(IndexError):
+        marks[3]
+
+
+def test_segments_keep_marks_as_columns_and_are_frozen():
+    segment = AudioSegment(path="polly-0.mp3", marks=[WordMark(0, "Hello")])
+
+    assert isinstance(segment.marks, WordMarks) and segment.marks == [WordMark(0, "Hello")]
+    assert AudioSegment(path="polly-1.mp3").marks == []
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        segment.marks[0].time_ms = 10  # type: ignore[misc]
+
+
+def test_word_spans_map_word_indexes_to_spans():
+    spans = WordSpans({0: (0, 5), 3: (20, 4)})
+
+    assert spans == {0: (0, 5), 3: (20, 4)} and len(spans) == 2
+    assert 1 not in spans and spans.get(2) is None and spans.get(-1) is None and spans[3] == (20, 4)
+
+    spans[1] = (6, 5)
+    spans[3] = (21, 3)
+    del spans[0]
+
+    assert sorted(spans.items()) == [(1, (6, 5)), (3, (21, 3))] and len(spans) == 2
+    with pytest.raises(KeyError):
+        del spans[2]
+
+
+def test_placed_marks_pass_offsets_back_through_each_map():
+    text, edits = substitute(re.compile("&"), "and", "Tom & Jerry")
+    marks = [WordMark(0, "and", 4, 7), WordMark(10, "Jerry", 8, 13), WordMark(20, "?")]
+
+    placed = placed_marks(marks, [OffsetMap(edits), OffsetMap(offset=100)])
+
+    assert text == "Tom and Jerry"
+    assert [(mark.start, mark.end) for mark in placed] == [(104, 105), (106, 111), (-1, -1)]
+
+
 def test_build_session_marks_clipboard_has_no_spans():
     segments = [[WordMark(0, "Hello")]]
     session = build_session(
@@ -133,8 +271,9 @@ def test_build_session_marks_clipboard_has_no_spans():
 def test_build_session_estimate_textarea_uses_editor_tokens():
     session = build_session(source="textarea", editor_text="one two three", read_text="", segment_marks=[], wpm=200)
     assert isinstance(session.progress_source, EstimateProgressSource)
-    assert session.total == 3
-    assert session.word_spans == {0: (0, 3), 1: (4, 3), 2: (8, 5)}
+    assert session.total == 3 and session.word_spans == {}
+    assert session.highlight_for(1) == (4, 3)
+    assert [session.highlight_for(index) for index in range(4)] == [(0, 3), (4, 3), (8, 5), None]
 
 
 def test_build_session_estimate_clipboard_counts_read_text():
@@ -142,3 +281,26 @@ def test_build_session_estimate_clipboard_counts_read_text():
         source="clipboard", editor_text="a b c d e", read_text="alpha beta gamma", segment_marks=[], wpm=200
     )
     assert session.total == 3 and session.word_spans == {}
+
+
+def test_extend_session_folds_streamed_segments_into_marks_session():
+    segments = [[WordMark(0, "Hello")]]
+    session = build_session(source="textarea", editor_text="Hello world", read_text="", segment_marks=segments, wpm=200)
+    assert session.total == 1 and session.word_spans == {0: (0, 5)}
+
+    segments.append([WordMark(0, "world")])
+    extend_session(session, editor_text="Hello world", segment_marks=segments)
+
+    assert session.segments == 2 and session.total == 2
+    assert session.word_spans == {0: (0, 5), 1: (6, 5)}
+    progress = session.progress_source.progress(segment_index=1, position_ms=10)
+    assert progress is not None and progress.word_index == 1
+
+
+def test_extend_session_leaves_estimate_sessions_alone():
+    session = build_session(source="textarea", editor_text="one two", read_text="", segment_marks=[[]], wpm=200)
+
+    extend_session(session, editor_text="one two", segment_marks=[[], [WordMark(0, "three")]])
+
+    assert isinstance(session.progress_source, EstimateProgressSource)
+    assert session.total == 2
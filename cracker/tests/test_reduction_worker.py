@@ -0,0 +1,84 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from PyQt6.QtCore import Qt
+
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.reduction_worker import ReductionWorker
+from cracker.text_diff import TextEdit
+from cracker.text_parser import TextParser
+
+
+def _connect(worker):
+    events = []
+    done = threading.Event()
+    direct = Qt.ConnectionType.DirectConnection
+    worker.progress.connect(lambda job, percent: events.append(("progress", job.name, percent)), direct)
+    worker.finished.connect(
+        lambda job, edits, skipped: (events.append(("finished", job.revision, edits, skipped)), done.set()), direct
+    )
+    worker.failed.connect(lambda job, error: (events.append(("failed", job.name, str(error))), done.set()), direct)
+    return events, done
+
+
+def test_worker_reduces_off_the_calling_thread_and_reports_progress():
+    worker = ReductionWorker()
+    events, done = _connect(worker)
+    threads = []
+
+    def reduce(text, cancel, progress):
+        threads.append(threading.get_ident())
+        progress(1, 2)
+        progress(2, 2)
+        return text.upper(), ["slow"]
+
+    job = worker.start("Reduce", reduce, "text", revision=7)
+    assert done.wait(timeout=5)
+    assert worker.running
+    worker.done(job)
+    assert not worker.running
+    worker.shutdown()
+
+    assert events == [
+        ("progress", "Reduce", 50),
+        ("progress", "Reduce", 100),
+        ("finished", 7, [TextEdit(0, 4, "TEXT")], ["slow"]),
+    ]
+    assert threads != [threading.get_ident()]
+
+
+def test_cancelled_and_failed_jobs():
+    worker = ReductionWorker()
+    events, done = _connect(worker)
+    started = threading.Event()
+
+    def wait_for_cancel(text, cancel, progress):
+        started.set()
+        cancel.future.result(timeout=5)
+        raise Cancelled()
+
+    worker.start("Wiki", wait_for_cancel, "text", revision=1)
+    assert started.wait(timeout=5)
+    worker.start("Citation", MagicMock(side_effect=ValueError("bad text")), "text", revision=2)
+    assert done.wait(timeout=5)
+    worker.shutdown()
+
+    assert events == [("failed", "Citation", "bad text")]
+
+
+def test_text_parser_reports_passes_and_stops_between_them(monkeypatch):
+    monkeypatch.setattr("cracker.text_parser.Configuration", MagicMock())
+    parser = TextParser(rule_budget_ms=0)
+    parser.parser_rules = {
+        "tabs": {"name": "tabs", "active": True, "key": "\t", "value": " "},
+        "spaces": {"name": "spaces", "active": True, "key": " +", "value": " "},
+    }
+    progress = []
+
+    assert parser.reduce_text("a\t b", progress=lambda done, total: progress.append((done, total))) == "a b"
+    assert progress == [(1, 2), (2, 2)]
+
+    cancel = CancellationToken()
+    with pytest.raises(Cancelled):
+        parser.reduce_text("a\t b", cancel=cancel, progress=lambda done, total: cancel.cancel())
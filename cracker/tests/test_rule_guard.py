@@ -0,0 +1,77 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.rule_guard import RuleGuard
+from cracker.text_parser import TextParser
+from cracker.text_rules import Rule, RulePipeline
+
+# Exponential backtracking on a run of "a"s that doesn't end the text.
+CATASTROPHIC = Rule("catastrophic", r"(a+)+$", "")
+
+
+@pytest.fixture
+def guard():
+    guard = RuleGuard(budget=0.5)
+    yield guard
+    guard.close()
+
+
+def test_guard_applies_rules_and_records_stats(guard):
+    pipeline = RulePipeline([Rule("tabs", "\t", " "), Rule("dashes", "-", "")])
+
+    text, skipped = guard.apply(pipeline, "a\tb-c\t")
+
+    assert (text, skipped) == ("a bc ", [])
+    assert {stats.name: stats.matches for stats in pipeline.stats()} == {"tabs": 2, "dashes": 1}
+
+
+def test_guard_skips_and_reports_a_rule_that_overruns_its_budget(guard):
+    pipeline = RulePipeline([Rule("tabs", "\t", " "), CATASTROPHIC, Rule("dashes", "-", "")], fuse=False)
+
+    started = time.monotonic()
+    text, skipped = guard.apply(pipeline, "x\t-" + "a" * 40 + "!")
+
+    assert time.monotonic() - started < 10
+    assert skipped == ["catastrophic"]
+    assert text == "x " + "a" * 40 + "!"
+    assert [stats.timeouts for stats in pipeline.stats()] == [0, 1, 0]
+
+    # The helper is restarted for the next text.
+    assert guard.apply(pipeline, "a\t") == ("a ", [])
+
+
+def test_cancel_kills_a_pass_in_progress():
+    guard = RuleGuard(budget=30)
+    pipeline = RulePipeline([Rule("tabs", "\t", " "), CATASTROPHIC], fuse=False)
+    cancel = CancellationToken()
+    progress = []
+    try:
+        timer = threading.Timer(0.5, cancel.cancel)
+        timer.start()
+        started = time.monotonic()
+        with pytest.raises(Cancelled):
+            guard.apply(pipeline, "\t" + "a" * 40 + "!", cancel, lambda done, total: progress.append((done, total)))
+
+        assert time.monotonic() - started < 10
+        assert progress == [(1, 2)]
+        assert guard.apply(pipeline, "a\t!") == ("a !", [])
+    finally:
+        guard.close()
+
+
+def test_text_parser_profiles_each_rule_separately(monkeypatch):
+    monkeypatch.setattr("cracker.text_parser.Configuration", MagicMock())
+    parser = TextParser(rule_budget_ms=0)
+    rules = {
+        "dash": {"name": "dash", "active": True, "key": "- ", "value": ""},
+        "tabs": {"name": "tabs", "active": True, "key": "\t", "value": " "},
+        "off": {"name": "off", "active": False, "key": "x", "value": ""},
+    }
+
+    stats = parser.profile_rules(rules, "a- b\tc\t")
+
+    assert [(rule.name, rule.matches, rule.fused_with) for rule in stats] == [("dash", 1, ()), ("tabs", 2, ())]
@@ -0,0 +1,111 @@
+import json
+import stat
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from cracker import synth
+from cracker.read_along import AudioSegment, WordMark
+from cracker.synth import SegmentWriter, Synthesizer, speaker_rate, speaker_volume
+
+CONFIG = {
+    "speaker": "espeak",
+    "speed": 3,
+    "espeak": {"voice": "English", "parallel": True, "max_concurrency": 2, "chunk_chars": 20},
+    "cache": {"enabled": False},
+    "parser": {"rule_budget_ms": 0},
+}
+
+
+@pytest.fixture
+def fake_espeak(tmp_path, monkeypatch):
+    """An `espeak` that echoes the text it reads as its "audio"."""
+    script = tmp_path / "bin" / "espeak"
+    script.parent.mkdir()
+    script.write_text('#!/bin/sh\nprintf "%s" "$(cat)"\n')
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{script.parent}:{Path('/bin')}:{Path('/usr/bin')}")
+
+
+def test_segment_writer_numbers_audio_and_writes_marks(tmp_path):
+    cached = tmp_path / "cached.mp3"
+    cached.write_bytes(b"from disk")
+    writer = SegmentWriter(str(tmp_path), "doc")
+
+    stream = writer.open_stream()
+    writer.push_segment(stream, AudioSegment(path="polly-0.mp3", data=b"in memory", marks=[WordMark(0, "Hi")]))
+    writer.push_segment(stream, AudioSegment(path=str(cached)))
+    writer.close_stream(stream)
+
+    assert [Path(path).name for path in writer.result.audio_files] == ["doc-000.mp3", "doc-001.mp3"]
+    assert [Path(path).read_bytes() for path in writer.result.audio_files] == [b"in memory", b"from disk"]
+    assert json.loads(Path(writer.result.marks_files[0]).read_text()) == [
+        {"time_ms": 0, "value": "Hi", "start": -1, "end": -1}
+    ]
+
+
+def test_rate_and_volume_follow_the_gui_sliders():
+    assert speaker_rate("polly", 1) == "x-slow"
+    assert speaker_rate("Espeak", 5) == 240
+    assert speaker_volume("polly", 50) == "medium"
+    assert speaker_volume("polly", 100) == "x-loud"
+
+
+def test_synthesize_files_writes_each_file_in_order(tmp_path, fake_espeak):
+    first = tmp_path / "a" / "chapter.txt"
+    second = tmp_path / "b" / "chapter.txt"
+    first.parent.mkdir()
+    second.parent.mkdir()
+    first.write_text("First sentence. And a second one.")
+    second.write_text("Another file.")
+    synthesizer = Synthesizer(config=CONFIG, apply_rules=False)
+
+    results = synthesizer.synthesize_files([str(first), str(second)], str(tmp_path / "out"), jobs=2)
+
+    assert [result.name for result in results] == ["chapter", "chapter-1"]
+    assert [Path(path).read_bytes() for path in results[0].audio_files] == [b"First sentence.", b"And a second one."]
+    assert [Path(path).name for path in results[1].audio_files] == ["chapter-1-000.wav"]
+
+
+def test_synthesizer_reuses_a_speaker_per_job(tmp_path, fake_espeak, monkeypatch):
+    created = []
+    create_speaker = synth.create_speaker
+
+    def counting(*args):
+        created.append(create_speaker(*args))
+        created[-1].close = MagicMock()
+        return created[-1]
+
+    monkeypatch.setattr(synth, "create_speaker", counting)
+    paths = []
+    for index in range(6):
+        paths.append(tmp_path / f"chapter{index}.txt")
+        paths[-1].write_text(f"Chapter {index}.")
+    synthesizer = Synthesizer(config=CONFIG, apply_rules=False)
+
+    results = synthesizer.synthesize_files([str(path) for path in paths], str(tmp_path / "out"), jobs=2)
+    synthesizer.close()
+
+    assert [Path(result.audio_files[0]).read_bytes() for result in results] == [
+        f"Chapter {index}.".encode() for index in range(6)
+    ]
+    assert 1 <= len(created) <= 2
+    for speaker in created:
+        speaker.close.assert_called_once_with()
+
+
+def test_cli_applies_the_parser_rules_and_prints_the_files(tmp_path, fake_espeak, monkeypatch, capsys):
+    monkeypatch.setattr(synth.Configuration, "read_config", lambda self: CONFIG)
+
+    exit_code = synth.main(["--text", "Split\tby a tab.", "-o", str(tmp_path)])
+
+    assert exit_code == 0
+    printed = capsys.readouterr().out.split()
+    assert [Path(path).name for path in printed] == ["text-0-000.wav"]
+    assert Path(printed[0]).read_bytes() == b"Split by a tab."
+
+
+def test_cli_needs_something_to_read():
+    with pytest.raises(SystemExit):
+        synth.parse_args([])
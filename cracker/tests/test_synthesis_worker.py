@@ -0,0 +1,180 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from PyQt6.QtCore import Qt
+
+from cracker import file_source
+from cracker.cancellation import CancellationToken, Cancelled
+from cracker.file_source import open_text_file
+from cracker.synthesis_worker import SynthesisWorker
+from cracker.text_parser import TextParser
+
+
+class FakeSpeaker:
+    def __init__(self, read=None):
+        self.calls = []
+        self.done = threading.Event()
+        self._read = read
+
+    def read_text(self, text, cancel=None, **config):
+        self.calls.append((text, cancel, config, threading.get_ident()))
+        try:
+            if self._read is not None:
+                self._read(cancel)
+        finally:
+            self.done.set()
+
+
+def test_cancellation_token_runs_callbacks_once():
+    token = CancellationToken()
+    calls = []
+    token.add_callback(lambda: calls.append("first"))
+    unregister = token.add_callback(lambda: calls.append("removed"))
+    unregister()
+
+    token.cancel()
+    token.cancel()
+    token.add_callback(lambda: calls.append("late"))  # runs straight away
+
+    assert calls == ["first", "late"]
+    assert token.cancelled
+    with pytest.raises(Cancelled):
+        token.raise_if_cancelled()
+
+
+def test_worker_reads_off_the_calling_thread():
+    worker = SynthesisWorker()
+    speaker = FakeSpeaker()
+    finished = []
+    worker.finished.connect(finished.append, Qt.ConnectionType.DirectConnection)
+
+    token = worker.read(speaker, "Hello", {"voice": "Joanna"})
+    assert speaker.done.wait(timeout=5)
+    worker.shutdown()
+
+    ((text, cancel, config, thread_id),) = speaker.calls
+    assert (text, config) == ("Hello", {"voice": "Joanna"})
+    assert cancel is token
+    assert thread_id != threading.get_ident()
+
+
+def test_worker_reports_failures_but_not_cancellations():
+    worker = SynthesisWorker()
+    failures = []
+    worker.failed.connect(lambda speaker, error: failures.append(error), Qt.ConnectionType.DirectConnection)
+
+    def fail(cancel):
+        raise RuntimeError("boom")
+
+    failing = FakeSpeaker(fail)
+    worker.read(failing, "Hello", {})
+    assert failing.done.wait(timeout=5)
+
+    def cancelled(cancel):
+        cancel.cancel()
+        raise Cancelled()
+
+    cancelling = FakeSpeaker(cancelled)
+    worker.read(cancelling, "Hello", {})
+    assert cancelling.done.wait(timeout=5)
+    worker._executor.shutdown(wait=True)
+
+    assert [str(error) for error in failures] == ["boom"]
+
+
+def test_new_read_cancels_the_running_one():
+    worker = SynthesisWorker()
+    started = threading.Event()
+
+    def wait_for_cancel(cancel):
+        started.set()
+        assert cancel.future.result(timeout=5) is None
+
+    slow = FakeSpeaker(wait_for_cancel)
+    first = worker.read(slow, "first", {})
+    assert started.wait(timeout=5)
+    second_speaker = FakeSpeaker()
+    second = worker.read(second_speaker, "second", {})
+
+    assert first.cancelled and not second.cancelled
+    assert second_speaker.done.wait(timeout=5)
+    worker.shutdown()
+
+
+def test_cancelled_file_read_closes_the_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("cracker.text_parser.Configuration", MagicMock())
+    path = tmp_path / "book.txt"
+    path.write_text("First paragraph.\n\n" * 1000)
+    opened = []
+
+    def recording_open(*args):
+        opened.append(open(*args))
+        return opened[-1]
+
+    monkeypatch.setattr(file_source, "open", recording_open, raising=False)
+    parser = TextParser(rule_budget_ms=0)
+    parser.parser_rules = {}
+    worker = SynthesisWorker()
+
+    class BlockSpeaker(FakeSpeaker):
+        def read_blocks(self, blocks, cancel=None, **config):
+            self.calls.append(next(iter(blocks)))
+            cancel.cancel()
+            self.done.set()
+            raise Cancelled()
+
+    speaker = BlockSpeaker()
+    # Kept alive here, as a traceback could, so only closing it closes the file.
+    blocks = parser.reduce_blocks(open_text_file(str(path), block_chars=64))
+    worker.read_blocks(speaker, blocks, {})
+    assert speaker.done.wait(timeout=5)
+    worker._executor.shutdown(wait=True)
+    parser.close()
+
+    assert speaker.calls == ["First paragraph.\n\n" * 3]
+    (file,) = opened
+    assert file.closed
+
+
+def test_worker_reduces_the_text_before_reading_it():
+    worker = SynthesisWorker()
+    speaker = FakeSpeaker()
+    events = []
+    worker.reduced.connect(
+        lambda token, text, skipped: events.append(("reduced", text, skipped)), Qt.ConnectionType.DirectConnection
+    )
+
+    def reduce(text, cancel=None):
+        events.append(("reduce", threading.get_ident()))
+        return text.upper(), ["slow"]
+
+    worker.read(speaker, "hello", {}, reduce)
+    assert speaker.done.wait(timeout=5)
+    worker.shutdown()
+
+    ((text, _, _, thread_id),) = speaker.calls
+    assert text == "HELLO"
+    assert events == [("reduce", thread_id), ("reduced", "HELLO", ["slow"])]
+    assert thread_id != threading.get_ident()
+
+
+def test_cancelled_reduction_reads_nothing():
+    worker = SynthesisWorker()
+    speaker = FakeSpeaker()
+    started = threading.Event()
+    reduced = []
+    worker.reduced.connect(lambda *args: reduced.append(args), Qt.ConnectionType.DirectConnection)
+
+    def reduce(text, cancel=None):
+        started.set()
+        cancel.future.result(timeout=5)
+        raise Cancelled()
+
+    worker.read(speaker, "hello", {}, reduce)
+    assert started.wait(timeout=5)
+    worker.cancel()
+    worker._executor.shutdown(wait=True)
+
+    assert speaker.calls == []
+    assert reduced == []
@@ -0,0 +1,157 @@
+import random
+import re
+
+from cracker.text_diff import (
+    OffsetMap,
+    TextEdit,
+    diff_edits,
+    iter_edits,
+    substitute,
+    utf8_offsets,
+    utf16_edits,
+)
+from cracker.text_parser import TextParser
+
+
+def _apply(old, edits):
+    for edit in reversed(edits):
+        old = old[: edit.start] + edit.text + old[edit.end :]
+    return old
+
+
+def test_edits_are_trimmed_to_the_changed_characters():
+    old = "Intro line.\nA claim [12] with a cite.\nMiddle.\nAnother [3] one.\nOutro."
+    new = TextParser.wiki_text(old)
+
+    edits = diff_edits(old, new)
+
+    assert edits == [TextEdit(20, 24, ""), TextEdit(54, 57, "")]
+    assert _apply(old, edits) == new
+
+
+def test_identical_texts_need_no_edits():
+    assert diff_edits("same", "same") == []
+
+
+def test_random_edits_round_trip():
+    rng = random.Random(3)
+    words = ["alpha", "beta", "\n", "\n\n", "gamma.", "[1]", "ząb", "\t"]
+    for _ in range(200):
+        old = " ".join(rng.choice(words) for _ in range(rng.randint(0, 60)))
+        new = list(old)
+        for _ in range(rng.randint(0, 6)):
+            position = rng.randint(0, len(new))
+            if rng.random() < 0.5 and position < len(new):
+                del new[position : position + rng.randint(1, 8)]
+            else:
+                new[position:position] = rng.choice(words)
+        new = "".join(new)
+
+        edits = diff_edits(old, new)
+
+        assert _apply(old, edits) == new
+        assert all(a.end <= b.start for a, b in zip(edits, edits[1:]))
+
+
+def test_windowed_edits_round_trip():
+    rng = random.Random(5)
+    lines = ["alpha\n", "beta [1]\n", "\n", "gamma.\n", "delta [2] epsilon\n"]
+    for _ in range(100):
+        old = "".join(rng.choice(lines) for _ in range(rng.randint(0, 80)))
+        new = "".join(
+            line.replace(" [1]", "").replace(" [2]", "") if rng.random() < 0.7 else rng.choice(lines)
+            for line in old.splitlines(keepends=True)
+            if rng.random() < 0.9
+        )
+
+        edits = list(iter_edits(old, new, window_lines=4))
+
+        assert _apply(old, edits) == new
+        assert all(a.end <= b.start for a, b in zip(edits, edits[1:]))
+
+
+def test_windowed_edits_start_without_diffing_everything():
+    old = "".join(f"Line {number} [{number}].\n" for number in range(10_000))
+    new = re.sub(r" \[\d+\]", "", old)
+
+    edits = iter_edits(old, new, window_lines=8)
+    first = next(edits)
+
+    assert first == TextEdit(6, 10, "")
+    assert _apply(old, [first, *edits]) == new
+
+
+def test_offset_map_only_takes_the_edits_it_needs():
+    old = "".join(f"Line {number} [{number}].\n" for number in range(10_000))
+    new = re.sub(r" \[\d+\]", "", old)
+    offsets = OffsetMap(iter_edits(old, new, window_lines=8), old=old)
+
+    assert offsets.source(new.index("Line 3.")) == old.index("Line 3 ")
+    assert len(offsets._edits) < 20
+    assert offsets.source(new.index("Line 9999.")) == old.index("Line 9999 ")
+
+
+def test_large_middles_fall_back_to_one_edit():
+    old = "\n".join(str(index) for index in range(100))
+    new = old.replace("5", "five")
+
+    edits = diff_edits(old, new, max_lines=10)
+
+    assert len(edits) == 1
+    assert _apply(old, edits) == new
+
+
+def test_offsets_count_astral_characters_twice_for_qt():
+    old = "a😀b😀c"
+    edits = [TextEdit(2, 3, "B"), TextEdit(4, 5, "C")]
+
+    assert utf16_edits(old, edits) == [TextEdit(3, 4, "B"), TextEdit(6, 7, "C")]
+    assert utf16_edits("plain", edits) is edits
+
+
+def test_an_edit_on_every_line_stays_an_edit_per_line():
+    old = "\n".join(f"Line {index} [{index}] ends." for index in range(50))
+    new = TextParser.wiki_text(old)
+
+    edits = diff_edits(old, new)
+
+    assert len(edits) == 50
+    assert all(len(old[edit.start : edit.end]) <= 4 and edit.text == "" for edit in edits)
+
+
+def test_substitute_returns_the_text_and_its_edits():
+    text, edits = substitute(re.compile(r"\[(\d+)\]"), r"(\1)", "a [1] b [22]")
+
+    assert text == "a (1) b (22)"
+    assert edits == [TextEdit(2, 5, "(1)"), TextEdit(8, 12, "(22)")]
+    assert substitute(re.compile("x"), "y", "abc") == ("abc", [])
+
+
+def test_offset_map_takes_positions_back_to_the_original():
+    old = "Tom & Jerry [1] ran."
+    new = "Tom and Jerry ran."
+    offsets = OffsetMap([TextEdit(4, 5, "and"), TextEdit(11, 15, "")], offset=10)
+
+    assert [offsets.source(position) for position in (0, 4, 5, 7, 8, 13, 14, 18)] == [10, 14, 14, 15, 16, 25, 26, 30]
+    assert old[offsets.source(14) - 10 :] == "ran." and new[14:] == "ran."
+
+
+def test_offset_map_places_words_inside_coarse_edits():
+    old = "One [1] two three [2] four.\nFive."
+    new = "One two three four.\nFive."
+    edits = diff_edits(old, new)
+    assert len(edits) == 1
+
+    coarse = OffsetMap(edits)
+    fine = OffsetMap(edits, old=old)
+
+    positions = [match.start() for match in re.finditer(r"\S+", new)]
+    assert [old[fine.source(position) :].split()[0] for position in positions] == new.split()
+    assert coarse.source(new.index("three")) == old.index("[1]")
+
+
+def test_utf8_offsets_become_character_offsets():
+    text = "zażółć gęślą"
+
+    assert utf8_offsets(text, [0, 2, 3, 16, len(text.encode())]) == [0, 2, 2, 10, len(text)]
+    assert utf8_offsets("ascii", [1, 3]) == [1, 3]
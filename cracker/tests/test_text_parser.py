@@ -1,7 +1,7 @@
 import types
 import unittest
 
-from cracker.text_parser import TextParser
+from cracker.text_parser import TextParser, sentence_spans, split_into_sentences
 
 
 class TestTextParser(unittest.TestCase):
@@ -58,13 +58,59 @@ class TestTextParser(unittest.TestCase):
         self.assertEqual(len(document), 6300, "Document should have 6300 chars length")
 
         split_text = list(TextParser.split_text(document))
-        self.assertEqual(len(split_text), 3, "Two parts")
+        self.assertEqual(len(split_text), 3, "Three parts")
         self.assertEqual(
             len(split_text[0]),
             len(split_text[1]),
             "Both parts should have the same length",
         )
-        self.assertEqual(len(split_text[2]), 300, "Simple maths: 6300 - 6000 = 300")
+        self.assertEqual(len(split_text[0]), 2998, "Cut after the last whitespace before 3000")
+        self.assertTrue(all(part.endswith(" ") for part in split_text), "No word is cut in half")
+        self.assertEqual(len(split_text[2]), 304, "Simple maths: 6300 - 2 * 2998 = 304")
+
+    def test_split_spans_tile_the_text_at_sentence_boundaries(self):
+        document = 200 * self.sentece_24chars
+
+        spans = list(TextParser.split_spans(document))
+        self.assertEqual(spans, [(0, 3000), (3000, 4800)])
+        self.assertEqual("".join(document[start:end] for start, end in spans), document)
+
+    def test_split_spans_falls_back_to_hard_cuts(self):
+        document = "x" * 7000 + ". Short one."
+
+        spans = list(TextParser.split_spans(document))
+        self.assertEqual(spans, [(0, 3000), (3000, 6000), (6000, 7012)])
+
+    def test_split_spans_rejects_non_positive_limit(self):
+        with self.assertRaises(ValueError):
+            list(TextParser.split_spans("Some text.", max_char=0))
+
+    def test_pack_spans_packs_whole_sentences_into_fewest_parts(self):
+        document = 10 * self.sentece_24chars
+
+        spans = list(TextParser.pack_spans(document, limit=100))
+        self.assertEqual(spans, [(0, 96), (96, 192), (192, 240)], "Four sentences per part, three parts")
+
+    def test_pack_spans_measures_escaped_text(self):
+        document = "Use <b> tags. " * 6  # 14 characters, 20 once escaped
+
+        parts = list(TextParser.pack_text(document, 45, TextParser.escaped_length))
+        self.assertEqual(len(parts), 3)
+        self.assertEqual("".join(parts), document)
+        self.assertTrue(all(len(TextParser.escape_tags(part)) <= 45 for part in parts))
+
+    def test_pack_spans_cuts_overlong_sentences_and_keeps_their_tail(self):
+        document = "word " * 30 + "end. Next one."  # a 154-character sentence, then a short one
+
+        parts = list(TextParser.pack_text(document, 60))
+        self.assertEqual("".join(parts), document)
+        self.assertTrue(all(len(part) <= 60 for part in parts))
+        self.assertTrue(parts[-1].endswith("end. Next one."), "The sentence's tail shares a part with the next one")
+
+    def test_escaped_sizes_match_escape_tags(self):
+        text = "a & b < c > d é"
+        self.assertEqual(TextParser.escaped_length(text), len(TextParser.escape_tags(text)))
+        self.assertEqual(TextParser.escaped_bytes(text), len(TextParser.escape_tags(text).encode("utf-8")))
 
     def test_split_text_per_sentence(self):
         document = 200 * self.sentece_24chars
@@ -73,6 +119,35 @@ class TestTextParser(unittest.TestCase):
         split_text = list(TextParser.split_text_per_sentence(document))
         self.assertEqual(len(split_text), 200, "200 parts")
 
+    def test_sentence_spans_are_offsets_into_the_text(self):
+        text = "  First one.  Second one!\nThird?  "
+        spans = list(sentence_spans(text))
+        self.assertEqual([text[start:end] for start, end in spans], ["First one.", "Second one!", "Third?"])
+
+    def test_split_into_sentences_keeps_abbreviations_and_initials(self):
+        text = "Mr. Smith met J. R. Doe at 3.14 p.m. sharp. The U.S. Army came. They left Acme Inc. He stayed."
+        self.assertEqual(
+            split_into_sentences(text),
+            ["Mr. Smith met J. R. Doe at 3.14 p.m. sharp.", "The U.S. Army came.", "They left Acme Inc.", "He stayed."],
+        )
+
+    def test_split_into_sentences_keeps_terminator_runs_and_quotes(self):
+        text = 'Really?! Wait... She said "go." Then (quietly.) left'
+        self.assertEqual(
+            split_into_sentences(text), ["Really?!", "Wait...", 'She said "go."', "Then (quietly.)", "left"]
+        )
+
+    def test_split_into_sentences_handles_marker_like_text(self):
+        text = "Use <prd> and <stop> tags. Done."
+        self.assertEqual(split_into_sentences(text), ["Use <prd> and <stop> tags.", "Done."])
+
+    def test_pack_sentences_sends_the_first_alone_and_joins_the_rest(self):
+        sentences = ["One.", "Two.", "Three.", "A much longer sentence.", "Five."]
+
+        packed = list(TextParser.pack_sentences(sentences, max_chars=12))
+        self.assertEqual(packed, ["One.", "Two. Three.", "A much longer sentence.", "Five."])
+        self.assertEqual(list(TextParser.pack_sentences(sentences, max_chars=0)), sentences, "0 disables packing")
+
     def test_escape_char_quote(self):
         s = 'He said "she said"'
         out_s = TextParser.escape_tags(s)
@@ -0,0 +1,89 @@
+import json
+import random
+import re
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from cracker.text_parser import TextParser
+from cracker.text_rules import Rule, RulePipeline
+
+DEFAULT_RULES = json.loads((Path(__file__).parents[1] / "config" / "parser.json").read_text())["parser_rules"]
+
+
+def _sequential(rules, text):
+    for rule in rules:
+        text = re.sub(rule.pattern, rule.replacement, text)
+    return text
+
+
+def _all_rules_active():
+    return {name: dict(rule, active=True) for name, rule in DEFAULT_RULES.items()}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_pipeline_matches_sequential_substitution(seed):
+    rng = random.Random(seed)
+    alphabet = ["a", "B", "-", " ", "\n", "\t", ".", "(", ")", "[", "]", "1", "2020", "Smith", "et al.", ";", ","]
+    text = "".join(rng.choice(alphabet) for _ in range(2000))
+    rules = [Rule(name, rule["key"], rule["value"]) for name, rule in _all_rules_active().items()] + [
+        Rule("semicolon", ";", ","),
+        Rule("digits", "[0-9]", "#"),
+    ]
+
+    assert RulePipeline(rules).apply(text) == _sequential(rules, text)
+
+
+def test_independent_rules_share_a_pass():
+    pipeline = RulePipeline.from_config(DEFAULT_RULES)
+
+    assert ("just_dash", "tabs") in pipeline.passes
+    assert len(pipeline.passes) < sum(rule["active"] for rule in DEFAULT_RULES.values())
+
+
+def test_rules_that_can_feed_each_other_stay_separate():
+    # Deleting "-\n" can create a new "- " match, so the order matters.
+    rules = [Rule("hyphen", "-\n", ""), Rule("dash", "- ", "")]
+    pipeline = RulePipeline(rules)
+
+    assert pipeline.passes == [("hyphen",), ("dash",)]
+    assert pipeline.apply("--\n ") == _sequential(rules, "--\n ") == ""
+
+
+def test_stats_count_matches_per_rule_including_fused_ones():
+    pipeline = RulePipeline([Rule("dash", "- ", ""), Rule("tabs", "\t", " ")])
+
+    pipeline.apply("a- b\tc\td")
+    dash, tabs = pipeline.stats()
+
+    assert (dash.name, dash.matches, dash.fused_with) == ("dash", 1, ("tabs",))
+    assert (tabs.name, tabs.matches) == ("tabs", 2)
+    assert dash.seconds == tabs.seconds > 0
+
+    pipeline.reset_stats()
+    assert [stats.matches for stats in pipeline.stats()] == [0, 0]
+
+
+def test_invalid_rules_are_skipped():
+    pipeline = RulePipeline([Rule("broken", "(", ""), Rule("tabs", "\t", " ")])
+
+    assert pipeline.passes == [("tabs",)]
+    assert pipeline.apply("a\tb") == "a b"
+
+
+def test_text_parser_recompiles_only_when_rules_change(monkeypatch):
+    monkeypatch.setattr("cracker.text_parser.Configuration", MagicMock())
+    parser = TextParser()
+    rules = _all_rules_active()
+
+    parser.parser_rules = rules
+    pipeline = parser._pipeline
+    parser.parser_rules = rules
+    assert parser._pipeline is pipeline
+
+    rules["tabs"]["value"] = "  "  # edited in place, as the parser config tab does
+    parser.parser_rules = rules
+    assert parser._pipeline is not pipeline
+    assert parser.reduce_text("a\tb") == "a  b"
+    assert {stats.name for stats in parser.rule_stats()} == set(rules)
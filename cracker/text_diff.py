@@ -0,0 +1,293 @@
+"""Turns a reduced text into the small edits that produce it from the original.
+
+Replacing the editor's whole document after a reduction relayouts all of
+it, scrolls to the top and drops the undo history. :func:`diff_edits`
+instead finds the changed ranges, so only those are replaced: the common
+prefix and suffix are skipped with C-speed slice comparisons, the rest is
+diffed line by line and every changed run of lines is trimmed to the
+characters that actually differ.
+
+Edits also record where text came from. An :class:`OffsetMap` takes
+positions in an edited text back to the text before the edits, which is how
+read-along finds a spoken word in the editor: the speaker's offsets pass
+back through the SSML wrapper, escaping and cleaning (see :func:`substitute`)
+and then through the diff of the reduced text against the editor's.
+"""
+
+import difflib
+import re
+from bisect import bisect_right
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from itertools import accumulate
+
+# Above this many lines between the common prefix and suffix, the middle is replaced as one edit.
+MAX_DIFF_LINES = 200_000
+# Lines of each text :func:`iter_edits` diffs at a time.
+WINDOW_LINES = 512
+# How many times over a window grows looking for a matching line before it's settled as changed lines.
+MAX_WINDOW_GROWTH = 8
+# Longest edit an OffsetMap diffs word by word; positions inside longer ones map to their start.
+MAX_WORD_DIFF_CHARS = 64 * 1024
+
+# Characters outside the Basic Multilingual Plane, which are two UTF-16 code units long.
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+# Words and the whitespace between them, which changed lines are diffed by.
+_TOKENS = re.compile(r"\s+|\S+")
+
+
+@dataclass(frozen=True)
+class TextEdit:
+    """Replaces ``old[start:end]`` with ``text``."""
+
+    start: int
+    end: int
+    text: str
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """Length of the common prefix of ``a`` and ``b``."""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        # Only the part not yet known to match is compared, so the search is linear overall.
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    """Length of the common suffix of ``a`` and ``b``, at most ``limit``."""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle : len(a) - low] == b[len(b) - middle : len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _trimmed(old: str, start: int, end: int, text: str) -> TextEdit:
+    """The edit replacing ``old[start:end]`` with ``text``, minus the characters both keep at either end."""
+    prefix = _common_prefix(old[start:end], text)
+    suffix = _common_suffix(old[start + prefix : end], text[prefix:], min(end - start, len(text)) - prefix)
+    return TextEdit(start + prefix, end - suffix, text[prefix : len(text) - suffix])
+
+
+def _word_edits(old: str, text: str) -> list[TextEdit]:
+    """The edits that turn ``old`` into ``text``, one per run of changed words."""
+    old_tokens = _TOKENS.findall(old)
+    new_tokens = _TOKENS.findall(text)
+    old_offsets = list(accumulate(map(len, old_tokens), initial=0))
+    new_offsets = list(accumulate(map(len, new_tokens), initial=0))
+    return [
+        _trimmed(old, old_offsets[i1], old_offsets[i2], text[new_offsets[j1] : new_offsets[j2]])
+        for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False).get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def _changed_range(old: str, new: str) -> tuple[int, int, int]:
+    """Start, end in ``old`` and end in ``new`` of the part that differs, widened to whole lines."""
+    shortest = min(len(old), len(new))
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, shortest - prefix)
+
+    # Widen the changed middle to whole lines, which the line diff needs to line up.
+    start = old.rfind("\n", 0, prefix) + 1
+    old_end, new_end = len(old) - suffix, len(new) - suffix
+    line_end = old.find("\n", old_end)
+    extend = suffix if line_end < 0 else line_end + 1 - old_end
+    return start, old_end + extend, new_end + extend
+
+
+def _paired_edits(
+    old: str, offsets: list[int], new_lines: list[str], i1: int, i2: int, j1: int, j2: int
+) -> Iterator[TextEdit]:
+    """Edits for lines ``i1:i2`` of ``old``, which start at ``offsets``, becoming ``new_lines[j1:j2]``."""
+    # Changed lines are paired one to one, so an edit on every line stays an edit per line;
+    # surplus lines go with the last pair.
+    pairs = max(1, min(i2 - i1, j2 - j1))
+    for pair in range(pairs):
+        old_stop = offsets[i1 + pair + 1] if pair < pairs - 1 else offsets[i2]
+        new_stop = j1 + pair + 1 if pair < pairs - 1 else j2
+        edit = _trimmed(old, offsets[i1 + pair], old_stop, "".join(new_lines[j1 + pair : new_stop]))
+        if edit.start < edit.end or edit.text:
+            yield edit
+
+
+def diff_edits(old: str, new: str, max_lines: int = MAX_DIFF_LINES) -> list[TextEdit]:
+    """Edits that turn ``old`` into ``new``, in ascending order of ``start`` and not overlapping.
+
+    Offsets are into ``old``. Applying the edits from last to first keeps the
+    earlier offsets valid.
+    """
+    if old == new:
+        return []
+    start, old_end, new_end = _changed_range(old, new)
+    old_lines = old[start:old_end].splitlines(keepends=True)
+    new_lines = new[start:new_end].splitlines(keepends=True)
+    if len(old_lines) + len(new_lines) > max_lines:
+        return [_trimmed(old, start, old_end, new[start:new_end])]
+
+    offsets = list(accumulate((len(line) for line in old_lines), initial=start))
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+    edits = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            edits += _paired_edits(old, offsets, new_lines, i1, i2, j1, j2)
+    return edits
+
+
+def _lines(text: str, position: int, end: int, count: int) -> list[str]:
+    """Up to ``count`` lines of ``text[position:end]``, without copying the rest of it."""
+    lines = []
+    while position < end and len(lines) < count:
+        stop = text.find("\n", position, end) + 1 or end
+        lines.append(text[position:stop])
+        position = stop
+    return lines
+
+
+def iter_edits(old: str, new: str, window_lines: int = WINDOW_LINES) -> Iterator[TextEdit]:
+    """Yields edits like :func:`diff_edits`, diffing ``window_lines`` lines of each text at a time.
+
+    A window is settled up to its last line that matches, and the rest carries
+    over to the next one, so the first edits cost about one window however
+    long the texts are. A window without a matching line grows a few times
+    before it's settled as changed lines. Read-along uses this to place the
+    first words of a long read without diffing all of it.
+    """
+    if old == new:
+        return
+    old_position, old_end, new_end = _changed_range(old, new)
+    new_position = old_position
+    count = window_lines
+    while old_position < old_end or new_position < new_end:
+        old_lines = _lines(old, old_position, old_end, count)
+        new_lines = _lines(new, new_position, new_end, count)
+        offsets = list(accumulate((len(line) for line in old_lines), initial=old_position))
+        last = offsets[-1] >= old_end and new_position + sum(map(len, new_lines)) >= new_end
+        opcodes = difflib.SequenceMatcher(None, old_lines, new_lines).get_opcodes()
+        if not last:
+            settled = [index for index, opcode in enumerate(opcodes) if opcode[0] == "equal"]
+            if not settled and count < window_lines * MAX_WINDOW_GROWTH:
+                # Nothing lines up yet; look further ahead.
+                count *= 2
+                continue
+            if settled:
+                opcodes = opcodes[: settled[-1] + 1]
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag != "equal":
+                yield from _paired_edits(old, offsets, new_lines, i1, i2, j1, j2)
+        _, _, i2, _, j2 = opcodes[-1]
+        old_position = offsets[i2]
+        new_position += sum(map(len, new_lines[:j2]))
+        count = window_lines
+
+
+def substitute(
+    pattern: re.Pattern[str], replacement: str | Callable[[re.Match[str]], str], text: str
+) -> tuple[str, list[TextEdit]]:
+    """``pattern.sub(replacement, text)``, also returning the edits it made."""
+    edits = []
+    for match in pattern.finditer(text):
+        new = replacement(match) if callable(replacement) else match.expand(replacement)
+        edits.append(TextEdit(match.start(), match.end(), new))
+    if not edits:
+        return text, edits
+    pieces = []
+    position = 0
+    for edit in edits:
+        pieces += (text[position : edit.start], edit.text)
+        position = edit.end
+    pieces.append(text[position:])
+    return "".join(pieces), edits
+
+
+class OffsetMap:
+    """Maps positions in an edited text back to the text the edits were made to.
+
+    Positions outside the edits shift with them; positions inside a
+    replacement map to the start of the text it replaced, and its end to the
+    end. ``offset`` is added to every result, for texts that were cut out of
+    a longer one.
+
+    Given ``old``, the text the edits were made to, an edit is diffed word by
+    word the first time a position inside it is looked up, so the coarse
+    edits of :func:`diff_edits` still place every word that survived them.
+    """
+
+    def __init__(self, edits: Iterable[TextEdit] = (), offset: int = 0, old: str | None = None):
+        self.offset = offset
+        self._old = old
+        self._words: dict[int, OffsetMap] = {}
+        # Edits are taken from the iterable as lookups reach them, so a lazy one is only diffed as far as needed.
+        self._pending: Iterator[TextEdit] | None = iter(edits)
+        self._edits: list[TextEdit] = []
+        self._old_starts: list[int] = []
+        self._old_ends: list[int] = []
+        self._new_starts: list[int] = []
+        self._new_ends: list[int] = []
+        self._shift = 0
+
+    def source(self, position: int) -> int:
+        """The position in the original text that ``position`` in the edited text came from."""
+        self._take_through(position)
+        index = bisect_right(self._new_starts, position) - 1
+        if index < 0:
+            return position + self.offset
+        if position < self._new_ends[index]:
+            if self._old is None or self._old_ends[index] - self._old_starts[index] > MAX_WORD_DIFF_CHARS:
+                return self._old_starts[index] + self.offset
+            return self._word_map(index).source(position - self._new_starts[index]) + self.offset
+        return self._old_ends[index] + position - self._new_ends[index] + self.offset
+
+    def _take_through(self, position: int) -> None:
+        """Takes pending edits until one starts after ``position`` in the edited text."""
+        while self._pending is not None and (not self._new_starts or self._new_starts[-1] <= position):
+            edit = next(self._pending, None)
+            if edit is None:
+                self._pending = None
+                return
+            self._edits.append(edit)
+            self._old_starts.append(edit.start)
+            self._old_ends.append(edit.end)
+            self._new_starts.append(edit.start + self._shift)
+            self._shift += len(edit.text) - (edit.end - edit.start)
+            self._new_ends.append(edit.end + self._shift)
+
+    def _word_map(self, index: int) -> "OffsetMap":
+        words = self._words.get(index)
+        if words is None:
+            assert self._old is not None
+            edit = self._edits[index]
+            words = OffsetMap(_word_edits(self._old[edit.start : edit.end], edit.text), offset=edit.start)
+            self._words[index] = words
+        return words
+
+
+def utf8_offsets(text: str, byte_offsets: Iterable[int]) -> list[int]:
+    """Converts offsets into the UTF-8 encoding of ``text`` to character offsets."""
+    if text.isascii():
+        return list(byte_offsets)
+    ends = list(accumulate(len(char.encode("utf-8")) for char in text))
+    return [bisect_right(ends, offset) for offset in byte_offsets]
+
+
+def utf16_edits(old: str, edits: list[TextEdit]) -> list[TextEdit]:
+    """Converts the offsets of ``edits`` into ``old`` to UTF-16 code units, as Qt's text classes count them."""
+    if not _ASTRAL.search(old):
+        return edits
+    converted = []
+    position = extra = 0
+    for edit in edits:
+        extra += len(_ASTRAL.findall(old, position, edit.start))
+        start = edit.start + extra
+        extra += len(_ASTRAL.findall(old, edit.start, edit.end))
+        converted.append(TextEdit(start, edit.end + extra, edit.text))
+        position = edit.end
+    return converted
@@ -1,31 +1,119 @@
 import html
 import logging
 import re
-from collections import OrderedDict
-from collections.abc import Iterator
+from collections.abc import Callable, Generator, Iterable, Iterator
 
+from cracker.cancellation import CancellationToken, Cancelled
 from cracker.config import Configuration
+from cracker.parallel_reduce import ParallelReducer
+from cracker.rule_guard import RuleGuard
+from cracker.text_diff import TextEdit, substitute
+from cracker.text_rules import Progress, Rule, RulePipeline, RuleStats
 
-alphabets = "([A-Za-z])"
-prefixes = "(Mr|St|Mrs|Ms|Dr)[.]"
-suffixes = "(Inc|Ltd|Jr|Sr|Co)"
-starters = (
-    r"(Mr|Mrs|Ms|Dr|Prof|Capt|Cpt|Lt|He\s|She\s|It\s|They\s|Their\s|Our\s|We\s|But\s|However\s|That\s|This\s|Wherever)"
+# Abbreviations whose trailing dot never ends a sentence.
+_PREFIXES = frozenset({"Mr", "St", "Mrs", "Ms", "Dr"})
+# Abbreviations that end a sentence only when a typical sentence starter follows.
+_SUFFIXES = frozenset({"Inc", "Ltd", "Jr", "Sr", "Co"})
+_STARTERS = frozenset(
+    {"Mr", "Mrs", "Ms", "Dr", "Prof", "Capt", "Cpt", "Lt", "He", "She", "It", "They", "Their", "Our", "We", "But"}
+    | {"However", "That", "This", "Wherever"}
 )
-acronyms = "([A-Z][.][A-Z][.](?:[A-Z][.])?)"
-websites = "[.](com|net|org|io|gov|edu|me)"
-digits = "([0-9])"
-multiple_dots = r"\.{2,}"
+# A run of terminators, with any closing quotes or brackets that belong to the sentence, followed by whitespace.
+# Dots inside "3.14", "example.com" or "U.S." are not followed by whitespace and never reach Python.
+_TERMINATOR = re.compile(r"[.!?]+[\"”’')\]]*(?=\s|\Z)")
+_WORD_BEFORE = re.compile(r"([A-Za-z]+)\Z")
+_WORD = re.compile(r"[A-Za-z]+")
+_SPACE = re.compile(r"\s*")
+# Longest word the abbreviation checks care about, plus the character before it.
+_LOOKBEHIND = 16
+# What `escape_tags` replaces, and with what.
+_ESCAPED = re.compile("[&<>]")
+_ENTITIES = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
+
+
+def sentence_spans(text: str) -> Iterator[tuple[int, int]]:
+    """Yields ``(start, end)`` offsets of the sentences in ``text``.
+
+    A sentence ends at ``.``, ``!`` or ``?`` (runs like ``...`` or ``?!``
+    included) followed by whitespace or the end of the text; closing quotes
+    and brackets stay with the sentence they close. A single dot does not end
+    a sentence after a title (``Mr.``), an initial (``J. Smith``) or inside an
+    acronym (``U.S.``, ``Ph.D.``); acronyms and company suffixes (``Inc.``) do
+    end one when a typical sentence starter follows. Spans exclude surrounding
+    whitespace and the text is scanned once, so this is linear in its length.
+    """
+    length = len(text)
+    start = _SPACE.match(text, 0).end()
+    for match in _TERMINATOR.finditer(text, start):
+        end = match.end()
+        if match.group() == "." and not _ends_sentence(text, match.start(), end):
+            continue
+        yield start, end
+        start = _SPACE.match(text, end).end()
+    if start < length:
+        yield start, len(text.rstrip())
+
+
+def _ends_sentence(text: str, position: int, end: int) -> bool:
+    """Decides whether the single dot at ``position`` ends a sentence."""
+    before = max(0, position - _LOOKBEHIND)
+    found = _WORD_BEFORE.search(text, before, position)
+    if found is None:
+        return True
+    word = found.group(1)
+    if word in _PREFIXES:
+        return False
+    if len(word) == 1:
+        word_start = found.start(1)
+        if not word_start or text[word_start - 1] != ".":
+            return False  # an initial
+        return _starter_follows(text, end)  # the end of an acronym
+    if word in _SUFFIXES:
+        return _starter_follows(text, end)
+    return True
+
+
+def _starter_follows(text: str, end: int) -> bool:
+    next_word = _WORD.match(text, _SPACE.match(text, end).end())
+    return next_word is not None and next_word.group() in _STARTERS
+
+
+def _whitespace_cut(text: str, start: int, limit: int) -> int:
+    """Offset just past the last whitespace in the second half of ``text[start:limit]``, else ``limit``."""
+    lowest = start + (limit - start) // 2
+    position = max(text.rfind(char, lowest, limit) for char in " \n\t")
+    return position + 1 if position > start else limit
+
+
+def _sentence_boundaries(text: str) -> Iterator[int]:
+    """Offsets where a part may end: the start of every sentence but the first, then the end of the text."""
+    sentences = sentence_spans(text)
+    next(sentences, None)
+    for start, _ in sentences:
+        yield start
+    yield len(text)
+
+
+def _measured_cuts(
+    text: str, start: int, end: int, limit: int, measure: Callable[[str], int]
+) -> Iterator[tuple[int, int]]:
+    """Cuts ``text[start:end]`` into spans whose ``measure`` is at most ``limit``, preferring whitespace."""
+    while start < end:
+        size = min(limit, end - start)
+        cut = start + size if size == end - start else _whitespace_cut(text, start, start + size)
+        while size > 1 and measure(text[start:cut]) > limit:
+            size //= 2
+            cut = _whitespace_cut(text, start, start + size)
+        yield start, cut
+        start = cut
 
 
-# TODO:
-# This was found on the internet. It kind of works, but it is not perfect.
 def split_into_sentences(text: str) -> list[str]:
     """
     Split the text into sentences.
 
-    If the text contains substrings "<prd>" or "<stop>", they would lead
-    to incorrect splitting because they are used as markers for splitting.
+    Line breaks inside a sentence are read as spaces. Use `sentence_spans`
+    to get offsets into the original text instead of copies.
 
     :param text: text to be split into sentences
     :type text: str
@@ -33,38 +121,7 @@ def split_into_sentences(text: str) -> list[str]:
     :return: list of sentences
     :rtype: list[str]
     """
-    text = " " + text + "  "
-    text = text.replace("\n", " ")
-    text = re.sub(prefixes, "\\1<prd>", text)
-    text = re.sub(websites, "<prd>\\1", text)
-    text = re.sub(digits + "[.]" + digits, "\\1<prd>\\2", text)
-    text = re.sub(multiple_dots, lambda match: "<prd>" * len(match.group(0)) + "<stop>", text)
-    if "Ph.D" in text:
-        text = text.replace("Ph.D.", "Ph<prd>D<prd>")
-    text = re.sub(r"\s" + alphabets + "[.] ", " \\1<prd> ", text)
-    text = re.sub(acronyms + " " + starters, "\\1<stop> \\2", text)
-    text = re.sub(alphabets + "[.]" + alphabets + "[.]" + alphabets + "[.]", "\\1<prd>\\2<prd>\\3<prd>", text)
-    text = re.sub(alphabets + "[.]" + alphabets + "[.]", "\\1<prd>\\2<prd>", text)
-    text = re.sub(" " + suffixes + "[.] " + starters, " \\1<stop> \\2", text)
-    text = re.sub(" " + suffixes + "[.]", " \\1<prd>", text)
-    text = re.sub(" " + alphabets + "[.]", " \\1<prd>", text)
-    if "”" in text:
-        text = text.replace(".”", "”.")
-    if '"' in text:
-        text = text.replace('."', '".')
-    if "!" in text:
-        text = text.replace('!"', '"!')
-    if "?" in text:
-        text = text.replace('?"', '"?')
-    text = text.replace(".", ".<stop>")
-    text = text.replace("?", "?<stop>")
-    text = text.replace("!", "!<stop>")
-    text = text.replace("<prd>", ".")
-    sentences = text.split("<stop>")
-    sentences = [s.strip() for s in sentences]
-    if sentences and not sentences[-1]:
-        sentences = sentences[:-1]
-    return sentences
+    return [text[start:end].replace("\n", " ") for start, end in sentence_spans(text)]
 
 
 class TextParser:
@@ -73,9 +130,47 @@ class TextParser:
     citation_author_year = re.compile(r"[\(\[]\w+, \d{4}(;\s\w+, \d{4})*[\)\]]")
     citation_numbers_comma = re.compile(r"\[\d+(,\s*\d+)*\]")
 
-    def __init__(self):
+    # Built-in reductions, as pipelines so large texts can be sharded like the user's rules.
+    CITE_RULES = RulePipeline(
+        [
+            Rule("citation_numbers_comma", citation_numbers_comma.pattern, ""),
+            Rule("citation_author_year", citation_author_year.pattern, ""),
+        ]
+    )
+    WIKI_RULES = RulePipeline(
+        [
+            Rule("wiki_references", r"\[+[0-9]+\]", ""),
+            Rule("clarification_needed", re.escape("[clarification needed]"), ""),
+            Rule("citation_needed", re.escape("[citation needed]"), ""),
+        ]
+    )
+
+    # Time each parser rule may take on one text before it's skipped; 0 runs the rules unguarded.
+    rule_budget_ms = 1000
+    # Texts of at least this many characters are reduced on several processes; 0 never does.
+    parallel_min_chars = 1024 * 1024
+    # Processes used for large texts; 0 uses one per core.
+    parallel_workers = 0
+    # Extra seconds a parallel run may take, on top of the rules' budget, while the workers start.
+    PARALLEL_START_SECONDS = 5.0
+
+    def __init__(
+        self,
+        rule_budget_ms: int | None = None,
+        parallel_min_chars: int | None = None,
+        parallel_workers: int | None = None,
+    ):
         self._parser_rules = None
-        self._regex_rules = OrderedDict()
+        self._rules_signature: tuple | None = None
+        self._pipeline = RulePipeline([])
+        if rule_budget_ms is not None:
+            self.rule_budget_ms = rule_budget_ms
+        if parallel_min_chars is not None:
+            self.parallel_min_chars = parallel_min_chars
+        if parallel_workers is not None:
+            self.parallel_workers = parallel_workers
+        self._guard = RuleGuard(self.rule_budget_ms / 1000) if self.rule_budget_ms > 0 else None
+        self._parallel = ParallelReducer(min_chars=self.parallel_min_chars, workers=self.parallel_workers)
 
         global_config = Configuration()
         self.parser_rules = global_config.load_regex_config()
@@ -90,53 +185,237 @@ class TextParser:
         self.update_config()
 
     def update_config(self):
-        """Goes through the config and extracts regex rules."""
+        """Compiles the active regex rules, unless they haven't changed since the last compile."""
         if self.parser_rules is None:
             return
 
-        # Clears all regex rules
-        self._regex_rules.clear()
+        # The config dicts are edited in place, so compare contents rather than identity.
+        signature = RulePipeline.signature(self.parser_rules)
+        if signature == self._rules_signature:
+            return
+        self._logger.debug("Compiling %d parser rules", len(signature))
+        self._rules_signature = signature
+        self._pipeline = RulePipeline.from_config(self.parser_rules)
 
-        for rule in self.parser_rules.values():
-            if not rule["active"]:
-                continue
-            self._regex_rules[rule["key"]] = rule["value"]
+    def rule_stats(self) -> list[RuleStats]:
+        """Match counts and time spent per rule by `reduce_text`, in application order."""
+        return self._pipeline.stats()
+
+    def profile_rules(self, parser_rules, text: str) -> list[RuleStats]:
+        """Runs the active ``parser_rules`` on ``text`` one at a time and returns each rule's counters.
+
+        Rules aren't fused, so every rule gets its own time, and the time
+        budget applies as in `reduce_text`.
+        """
+        pipeline = RulePipeline(RulePipeline.from_config(parser_rules).rules, fuse=False)
+        self._apply(pipeline, text)
+        return pipeline.stats()
+
+    def close(self) -> None:
+        if self._guard is not None:
+            self._guard.close()
+        self._parallel.close()
 
     @classmethod
     def reduce_cite(cls, text: str) -> str:
         """Removes citations from pasted text."""
-        text = cls.citation_numbers_comma.sub("", text)
-        text = cls.citation_author_year.sub("", text)
-        return text
+        return cls.CITE_RULES.apply(text)
 
-    @staticmethod
-    def wiki_text(text: str) -> str:
+    @classmethod
+    def wiki_text(cls, text: str) -> str:
         """Convert direct copy from Wikipedia into human-readable form."""
-        text = re.sub(r"\[+[0-9]+\]", "", text)
-        text = text.replace("[clarification needed]", "")
-        text = text.replace("[citation needed]", "")
-        return text
+        return cls.WIKI_RULES.apply(text)
+
+    def apply_rules(
+        self,
+        pipeline: RulePipeline,
+        text: str,
+        cancel: CancellationToken | None = None,
+        progress: Progress | None = None,
+    ) -> tuple[str, list[str]]:
+        """Applies a built-in pipeline such as `WIKI_RULES`, on several processes for large texts.
+
+        Returns like `reduce`, though built-in rules have no time budget and
+        are never skipped. ``progress`` and ``cancel`` work as in `reduce`.
+        """
+        if self._parallel.wants(text) and pipeline.passes:
+            try:
+                return self._parallel.reduce(pipeline, text, cancel=cancel, progress=progress), []
+            except Cancelled:
+                raise
+            except Exception as error:
+                self._logger.warning("Parallel reduction failed, reducing in one pass: %s", error)
+        return pipeline.apply(text, cancel, progress), []
 
     @staticmethod
-    def split_text(text: str, max_char: int = 3000) -> Iterator[str]:
-        doc_residue = text
-        while len(doc_residue) > max_char:
-            # TODO: Should the split be by whitespace if no '. ' ?
-            part = doc_residue[:max_char].rsplit(". ", 1)[0]
-            doc_residue = doc_residue[len(part) :]
-            yield part
-        yield doc_residue
+    def split_spans(text: str, max_char: int = 3000) -> Iterator[tuple[int, int]]:
+        """Yields ``(start, end)`` offsets of consecutive parts of up to ``max_char`` characters.
+
+        Parts end at sentence boundaries where possible. A sentence longer than
+        ``max_char`` is cut after the last whitespace in the second half of the
+        window, or hard at ``max_char`` when there is none. The parts tile the
+        text exactly and every character is looked at a bounded number of times.
+        """
+        if max_char < 1:
+            raise ValueError(f"max_char must be positive, got {max_char}")
+        length = len(text)
+        start = 0
+        cut = 0  # Furthest sentence boundary that still fits in the current part.
+        for boundary in _sentence_boundaries(text):
+            while boundary - start > max_char:
+                if cut > start:
+                    yield start, cut
+                    start = cut
+                    continue
+                end = _whitespace_cut(text, start, start + max_char)
+                yield start, end
+                start = end
+            cut = boundary
+        if start < length:
+            yield start, length
+
+    @classmethod
+    def split_text(cls, text: str, max_char: int = 3000) -> Iterator[str]:
+        for start, end in cls.split_spans(text, max_char):
+            yield text[start:end]
+
+    @staticmethod
+    def pack_spans(text: str, limit: int, measure: Callable[[str], int] = len) -> Iterator[tuple[int, int]]:
+        """Yields ``(start, end)`` offsets of the fewest parts whose ``measure`` is at most ``limit``.
+
+        Whole sentences are packed greedily, which keeps their order and gives
+        the minimum number of parts. A sentence that alone exceeds the limit is
+        cut at whitespace (or hard) and its tail starts the next part.
+        ``measure`` must be additive over concatenation and at least 1 per
+        character, like the length of the escaped text or its UTF-8 size.
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be positive, got {limit}")
+        start = previous = 0
+        size = 0  # measure of text[start:previous]
+        for boundary in _sentence_boundaries(text):
+            piece = measure(text[previous:boundary])
+            if size + piece <= limit:
+                size += piece
+            elif piece <= limit:
+                yield start, previous
+                start, size = previous, piece
+            else:
+                if previous > start:
+                    yield start, previous
+                *cuts, (start, _) = _measured_cuts(text, previous, boundary, limit, measure)
+                yield from cuts
+                size = measure(text[start:boundary])
+            previous = boundary
+        if start < len(text):
+            yield start, len(text)
+
+    @classmethod
+    def pack_text(cls, text: str, limit: int, measure: Callable[[str], int] = len) -> Iterator[str]:
+        for start, end in cls.pack_spans(text, limit, measure):
+            yield text[start:end]
 
     @classmethod
     def split_text_per_sentence(cls, text: str) -> list[str]:
         return split_into_sentences(text)
 
+    @staticmethod
+    def pack_sentences(sentences: Iterable[str], max_chars: int) -> Iterator[str]:
+        """Joins consecutive sentences into requests of up to ``max_chars`` characters.
+
+        The first sentence is always sent alone so playback can start after one
+        sentence's synthesis. Longer sentences are sent as they are.
+        """
+        batch: list[str] = []
+        size = 0
+        for index, sentence in enumerate(sentences):
+            if index == 0 or max_chars <= 0:
+                yield sentence
+                continue
+            if batch and size + 1 + len(sentence) > max_chars:
+                yield " ".join(batch)
+                batch, size = [], 0
+            size += len(sentence) + (1 if batch else 0)
+            batch.append(sentence)
+        if batch:
+            yield " ".join(batch)
+
     @staticmethod
     def escape_tags(text: str) -> str:
         return html.escape(text, quote=False)
 
-    def reduce_text(self, text: str) -> str:
-        # For each method process text
-        for key, value in self._regex_rules.items():
-            text = re.sub(key, value, text)
-        return text
+    @staticmethod
+    def escape_tags_edits(text: str) -> tuple[str, list[TextEdit]]:
+        """`escape_tags`, also returning the edits it made."""
+        return substitute(_ESCAPED, lambda match: _ENTITIES[match.group()], text)
+
+    @staticmethod
+    def escaped_length(text: str) -> int:
+        """``len(escape_tags(text))`` without building the escaped string."""
+        return len(text) + 4 * text.count("&") + 3 * (text.count("<") + text.count(">"))
+
+    @staticmethod
+    def escaped_bytes(text: str) -> int:
+        """UTF-8 size of ``escape_tags(text)``; entities are ASCII, so they add the same as to the length."""
+        return len(text.encode("utf-8")) + 4 * text.count("&") + 3 * (text.count("<") + text.count(">"))
+
+    def reduce(
+        self, text: str, cancel: CancellationToken | None = None, progress: Progress | None = None
+    ) -> tuple[str, list[str]]:
+        """Applies the parser rules, returning the text and the names of the rules skipped for overrunning the budget.
+
+        ``progress(done, total)`` reports the passes (or, for large texts, the
+        shards) done so far. Once ``cancel`` is cancelled this raises
+        :class:`~cracker.cancellation.Cancelled`: straight away when the rules
+        run in other processes, otherwise after the current pass.
+
+        A parser runs one text at a time, so threads that reduce at the same
+        time should each have their own.
+        """
+        return self._apply(self._pipeline, text, cancel, progress)
+
+    def reduce_text(self, text: str, cancel: CancellationToken | None = None, progress: Progress | None = None) -> str:
+        """Applies the parser rules; see `reduce`."""
+        return self.reduce(text, cancel, progress)[0]
+
+    def reduce_blocks(self, blocks: Iterable[str], skipped: list[str] | None = None) -> Iterator[str]:
+        """Applies the parser rules to a text that arrives in blocks, one block at a time.
+
+        Rules don't match across blocks, so blocks should end at paragraph
+        breaks (see :func:`cracker.file_source.paragraph_blocks`). Rules
+        skipped on any block are added to ``skipped``. Closing the returned
+        iterator closes ``blocks`` when it's a generator.
+        """
+        try:
+            for block in blocks:
+                block, block_skipped = self.reduce(block)
+                if skipped is not None:
+                    skipped += [name for name in block_skipped if name not in skipped]
+                yield block
+        finally:
+            if isinstance(blocks, Generator):
+                blocks.close()
+
+    def _apply(
+        self,
+        pipeline: RulePipeline,
+        text: str,
+        cancel: CancellationToken | None = None,
+        progress: Progress | None = None,
+    ) -> tuple[str, list[str]]:
+        if not pipeline.passes:
+            return text, []
+        if self._parallel.wants(text):
+            timeout = None
+            if self._guard is not None:
+                timeout = self.PARALLEL_START_SECONDS + self._guard.budget * len(pipeline.passes)
+            try:
+                return self._parallel.reduce(pipeline, text, timeout, cancel, progress), []
+            except Cancelled:
+                raise
+            except Exception as error:
+                # The guarded path below finds and skips a rule that overran.
+                self._logger.warning("Parallel reduction failed, reducing in one pass: %s", error)
+        if self._guard is None:
+            return pipeline.apply(text, cancel, progress), []
+        return self._guard.apply(pipeline, text, cancel, progress)
@@ -0,0 +1,327 @@
+"""Compiled, instrumented pipeline for the user's regex parser rules.
+
+:class:`RulePipeline` compiles the active rules once and applies them in
+order. Neighbouring rules that provably cannot interact are fused into a
+single alternation pass. Every rule keeps match and timing counters, so the
+rule that dominates a large paste can be spotted.
+
+Two rules ``A`` (earlier) and ``B`` (later) are fused only when one combined
+pass gives exactly the same text as ``A`` followed by ``B``:
+
+* both replacements are literal (no group references), and neither pattern
+  uses inline flags or back-references or can match the empty string;
+* ``B`` has no anchors or lookarounds, because ``A`` changes its context;
+* no character can occur in matches of both rules, so their matches never
+  overlap, and ``A``'s replacement contains no character ``B`` can match;
+* if ``A`` deletes its matches, ``B`` matches single characters only, so it
+  can't match across the gap a deletion closes.
+"""
+
+import re
+import threading
+import time
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping
+from dataclasses import dataclass, replace
+from re import _constants as sre_constants  # type: ignore[attr-defined]
+from re import _parser as sre_parser  # type: ignore[attr-defined]
+from typing import Any
+
+from cracker.cancellation import CancellationToken
+from cracker.utils import get_logger
+
+_logger = get_logger(__name__)
+
+# Called with the steps done and the total, e.g. passes or shards.
+Progress = Callable[[int, int], None]
+
+_CATEGORY_PATTERNS = {
+    sre_constants.CATEGORY_DIGIT: re.compile(r"\d"),
+    sre_constants.CATEGORY_NOT_DIGIT: re.compile(r"\D"),
+    sre_constants.CATEGORY_SPACE: re.compile(r"\s"),
+    sre_constants.CATEGORY_NOT_SPACE: re.compile(r"\S"),
+    sre_constants.CATEGORY_WORD: re.compile(r"\w"),
+    sre_constants.CATEGORY_NOT_WORD: re.compile(r"\W"),
+}
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT}
+# Ranges wider than this are treated as "any character".
+_MAX_RANGE = 256
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    pattern: str
+    replacement: str
+
+
+@dataclass(frozen=True)
+class RuleStats:
+    """Counters for one rule since the pipeline was built (or last reset).
+
+    ``seconds`` is the time spent in the rule's pass; fused rules share a pass,
+    so they report the same time and list each other in ``fused_with``.
+    ``timeouts`` counts the runs in which the pass overran its time budget and
+    was skipped (see :class:`~cracker.rule_guard.RuleGuard`).
+    """
+
+    name: str
+    matches: int = 0
+    seconds: float = 0.0
+    fused_with: tuple[str, ...] = ()
+    timeouts: int = 0
+
+
+class _Alphabet:
+    """The characters a pattern can consume, approximated from above."""
+
+    def __init__(self) -> None:
+        self.chars: set[str] = set()
+        self.categories: set[Any] = set()
+        self.universal = False
+        self.has_context = False
+
+    def contains(self, char: str) -> bool:
+        if self.universal or char in self.chars:
+            return True
+        return any(_CATEGORY_PATTERNS[category].match(char) for category in self.categories)
+
+    def overlaps(self, other: "_Alphabet") -> bool:
+        if self.universal or other.universal:
+            return True
+        if self.categories and other.categories:
+            return True  # conservatively assume any two categories intersect
+        return any(other.contains(char) for char in self.chars) or any(self.contains(char) for char in other.chars)
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _alphabet(parsed: Any) -> _Alphabet:
+    alphabet = _Alphabet()
+    _collect(parsed, alphabet)
+    return alphabet
+
+
+def _collect(items: Iterable[tuple[Any, Any]], alphabet: _Alphabet) -> None:
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            alphabet.chars.add(chr(av))
+        elif op in (sre_constants.NOT_LITERAL, sre_constants.ANY):
+            alphabet.universal = True
+        elif op is sre_constants.IN:
+            _collect_set(av, alphabet)
+        elif op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, pattern = av
+            if add_flags or del_flags:
+                raise _Unsupported("scoped flags")
+            _collect(pattern, alphabet)
+        elif op in _REPEATS:
+            _collect(av[2], alphabet)
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                _collect(branch, alphabet)
+        elif op is sre_constants.ATOMIC_GROUP:
+            _collect(av, alphabet)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT, sre_constants.AT):
+            alphabet.has_context = True
+        else:
+            raise _Unsupported(str(op))
+
+
+def _collect_set(items: Iterable[tuple[Any, Any]], alphabet: _Alphabet) -> None:
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            alphabet.chars.add(chr(av))
+        elif op is sre_constants.RANGE and av[1] - av[0] < _MAX_RANGE:
+            alphabet.chars.update(chr(code) for code in range(av[0], av[1] + 1))
+        elif op is sre_constants.CATEGORY and av in _CATEGORY_PATTERNS:
+            alphabet.categories.add(av)
+        else:
+            # Negated sets, wide ranges and exotic categories.
+            alphabet.universal = True
+
+
+class _AnalyzedRule:
+    def __init__(self, rule: Rule, compiled: re.Pattern[str]):
+        self.rule = rule
+        self.compiled = compiled
+        self.alphabet: _Alphabet | None = None
+        self.min_width = self.max_width = 0
+        if "\\" in rule.replacement:
+            return
+        try:
+            parsed = sre_parser.parse(rule.pattern)
+            if parsed.state.flags & ~re.UNICODE:
+                return
+            self.min_width, self.max_width = parsed.getwidth()
+            self.alphabet = _alphabet(parsed)
+        except _Unsupported, re.error:
+            self.alphabet = None
+
+    @property
+    def fusable(self) -> bool:
+        return self.alphabet is not None and self.min_width > 0
+
+
+def _can_follow(earlier: _AnalyzedRule, later: _AnalyzedRule) -> bool:
+    """Whether ``later`` can run in the same pass as ``earlier`` (see module docs)."""
+    if not (earlier.fusable and later.fusable):
+        return False
+    assert earlier.alphabet is not None and later.alphabet is not None
+    if later.alphabet.has_context:
+        return False
+    if earlier.alphabet.overlaps(later.alphabet):
+        return False
+    if any(later.alphabet.contains(char) for char in earlier.rule.replacement):
+        return False
+    return bool(earlier.rule.replacement) or later.max_width <= 1
+
+
+class _Pass:
+    """One scan over the text applying one rule, or several fused rules."""
+
+    def __init__(self, rules: list[_AnalyzedRule]):
+        self.names = tuple(analyzed.rule.name for analyzed in rules)
+        self._fused: dict[str, tuple[str, str]] | None = None
+        if len(rules) == 1:
+            self.pattern = rules[0].compiled
+            self.replacement = rules[0].rule.replacement
+            return
+        # Each rule sits in a group named after its position; `lastgroup` tells which one matched.
+        self._fused = {
+            f"_rule{index}": (analyzed.rule.name, analyzed.rule.replacement) for index, analyzed in enumerate(rules)
+        }
+        self.pattern = re.compile(
+            "|".join(f"(?P<{group}>{analyzed.rule.pattern})" for group, analyzed in zip(self._fused, rules))
+        )
+
+    def apply(self, text: str) -> tuple[str, dict[str, int]]:
+        if self._fused is None:
+            text, count = self.pattern.subn(self.replacement, text)
+            return text, {self.names[0]: count}
+
+        fused = self._fused
+        counts = dict.fromkeys(self.names, 0)
+
+        def substitute(match: re.Match[str]) -> str:
+            name, replacement = fused[match.lastgroup or ""]
+            counts[name] += 1
+            return replacement
+
+        return self.pattern.sub(substitute, text), counts
+
+
+class RulePipeline:
+    """The active parser rules, compiled once and applied in order."""
+
+    def __init__(self, rules: Iterable[Rule], fuse: bool = True):
+        analyzed: list[_AnalyzedRule] = []
+        for rule in rules:
+            try:
+                compiled = re.compile(rule.pattern)
+            except re.error as error:
+                _logger.error("Skipping parser rule '%s' with an invalid pattern: %s", rule.name, error)
+                continue
+            analyzed.append(_AnalyzedRule(rule, compiled))
+        self.rules = tuple(analyzed_rule.rule for analyzed_rule in analyzed)
+        self.fuse = fuse
+
+        groups: list[list[_AnalyzedRule]] = []
+        for candidate in analyzed:
+            group = groups[-1] if groups else None
+            if fuse and group is not None and all(_can_follow(member, candidate) for member in group):
+                group.append(candidate)
+            else:
+                groups.append([candidate])
+
+        self._passes: list[_Pass] = []
+        for group in groups:
+            try:
+                self._passes.append(_Pass(group))
+            except re.error:
+                # The rules can't share a pattern, e.g. they define the same group name.
+                self._passes.extend(_Pass([analyzed_rule]) for analyzed_rule in group)
+        self._lock = threading.Lock()
+        self._stats = {
+            name: RuleStats(name=name, fused_with=tuple(other for other in step.names if other != name))
+            for step in self._passes
+            for name in step.names
+        }
+
+    @classmethod
+    def from_config(cls, parser_rules: Mapping[str, Mapping[str, Any]] | None) -> "RulePipeline":
+        """Builds the pipeline from the ``parser_rules`` config, skipping inactive rules."""
+        rules = [
+            Rule(name=name, pattern=rule["key"], replacement=rule["value"])
+            for name, rule in (parser_rules or {}).items()
+            if rule["active"]
+        ]
+        return cls(rules)
+
+    @staticmethod
+    def signature(parser_rules: Mapping[str, Mapping[str, Any]] | None) -> tuple:
+        """A value that changes whenever the rules would compile differently."""
+        return tuple(
+            (name, rule["key"], rule["value"]) for name, rule in (parser_rules or {}).items() if rule["active"]
+        )
+
+    @property
+    def passes(self) -> list[tuple[str, ...]]:
+        """Rule names per pass, in application order."""
+        return [step.names for step in self._passes]
+
+    def apply(self, text: str, cancel: CancellationToken | None = None, progress: Progress | None = None) -> str:
+        """Applies every pass and records its counters.
+
+        ``progress(done, total)`` is called after each pass, and a cancelled
+        ``cancel`` raises :class:`~cracker.cancellation.Cancelled` between passes.
+        """
+        total = len(self._passes)
+        for index, text, counts, elapsed in self.run(text):
+            self.record(index, counts, elapsed)
+            if progress is not None:
+                progress(index + 1, total)
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+        return text
+
+    def run(self, text: str, skip: Collection[int] = ()) -> Iterator[tuple[int, str, dict[str, int], float]]:
+        """Applies the passes one by one, yielding ``(pass index, text, matches, seconds)`` after each.
+
+        Passes listed in ``skip`` are left out. Nothing is recorded; callers
+        that want the counters pass each step to :meth:`record`.
+        """
+        for index, step in enumerate(self._passes):
+            if index in skip:
+                continue
+            started = time.perf_counter()
+            text, counts = step.apply(text)
+            yield index, text, counts, time.perf_counter() - started
+
+    def record(self, index: int, counts: Mapping[str, int], seconds: float) -> None:
+        """Adds one run of pass ``index`` to its rules' counters."""
+        with self._lock:
+            for name in self._passes[index].names:
+                stats = self._stats[name]
+                self._stats[name] = replace(
+                    stats, matches=stats.matches + counts.get(name, 0), seconds=stats.seconds + seconds
+                )
+
+    def record_timeout(self, index: int) -> None:
+        """Counts pass ``index`` as skipped for overrunning its time budget."""
+        with self._lock:
+            for name in self._passes[index].names:
+                stats = self._stats[name]
+                self._stats[name] = replace(stats, timeouts=stats.timeouts + 1)
+
+    def stats(self) -> list[RuleStats]:
+        """Per-rule counters in application order."""
+        with self._lock:
+            return [self._stats[name] for step in self._passes for name in step.names]
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {
+                name: RuleStats(name=name, fused_with=stats.fused_with) for name, stats in self._stats.items()
+            }
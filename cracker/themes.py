@@ -272,7 +272,7 @@ QProgressBar#readProgress {
 QProgressBar#readProgress::chunk { background: @accent@; }
 
 /* --- Text area -------------------------------------------------------- */
-QTextEdit {
+QPlainTextEdit {
     background: @bg_surface@;
     border: 1px solid @border@;
     border-radius: 11px;
@@ -281,6 +281,7 @@ QTextEdit {
     selection-background-color: @accent@;
     selection-color: @accent_text@;
 }
+QPlainTextEdit[reading="true"] { color: @text_muted@; }
 
 /* --- Status bar ------------------------------------------------------- */
 QStatusBar {
@@ -0,0 +1,115 @@
+"""The main text area, built to stay responsive with book-length texts."""
+
+from PyQt6.QtGui import QTextBlock, QTextCharFormat, QTextLayout
+from PyQt6.QtWidgets import QPlainTextEdit, QWidget
+
+
+class DocumentEditor(QPlainTextEdit):
+    """A plain text editor that only lays out and re-formats what changes.
+
+    ``QPlainTextEdit`` lays the document out block by block (a block being a
+    paragraph) and only for the blocks it shows, so opening, scrolling and
+    editing a text of a million words costs about as much as a page. The
+    read-along highlight follows suit. While it's on, the ``reading`` property
+    lets the stylesheet dim the whole text at once, and the text already read
+    is set back with per-block formats: moving the highlight re-formats the
+    block of the previous word and the block of the new one, and repaints them
+    if they're on screen. Nothing is laid out again.
+    """
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        # Blocks before this one are formatted as read, in full.
+        self._read_blocks = 0
+        # Block number of the highlighted word, which is formatted up to the end of the word.
+        self._word_block: int | None = None
+
+    def set_highlight(
+        self, start: int, length: int, word_format: QTextCharFormat, read_format: QTextCharFormat
+    ) -> None:
+        """Formats ``length`` characters at ``start`` with ``word_format`` and the text before them with ``read_format``.
+
+        The text after the word keeps the editor's text color, which the
+        stylesheet dims while the highlight is on.
+        """
+        document = self.document()
+        assert document is not None
+        if self._word_block is None:
+            self._set_reading(True)
+        block = document.findBlock(start)
+        number = block.blockNumber()
+        changed = [number]
+        if self._word_block is not None and self._word_block != number:
+            # The previous word's block, unless it's about to be formatted as read in full below.
+            if self._word_block > number:
+                self._format_block(document.findBlockByNumber(self._word_block), [])
+            changed.append(self._word_block)
+        if self._read_blocks != number:
+            changed.append(self._read_blocks)
+            self._format_read_blocks(number, read_format)
+        self._word_block = number
+        offset = start - block.position()
+        self._format_block(block, [(0, offset, read_format), (offset, length, word_format)])
+        self._repaint(min(changed), max(changed))
+
+    def clear_highlight(self) -> None:
+        if self._word_block is None:
+            return
+        document = self.document()
+        assert document is not None
+        self._format_block(document.findBlockByNumber(self._word_block), [])
+        last = max(self._word_block, self._read_blocks)
+        self._format_read_blocks(0, QTextCharFormat())
+        self._repaint(0, last)
+        self._word_block = None
+        self._set_reading(False)
+
+    def _format_read_blocks(self, count: int, read_format: QTextCharFormat) -> None:
+        """Makes the first ``count`` blocks the ones formatted as read, changing only the blocks in between."""
+        document = self.document()
+        assert document is not None
+        block = document.findBlockByNumber(min(count, self._read_blocks))
+        for _ in range(abs(count - self._read_blocks)):
+            ranges = [(0, block.length(), read_format)] if count > self._read_blocks else []
+            self._format_block(block, ranges)
+            block = block.next()
+        self._read_blocks = count
+
+    def _set_reading(self, reading: bool) -> None:
+        self.setProperty("reading", reading)
+        style = self.style()
+        assert style is not None
+        style.unpolish(self)
+        style.polish(self)
+
+    def _repaint(self, first: int, last: int) -> None:
+        """Repaints blocks ``first`` to ``last`` where they're on screen.
+
+        The highlight formats only change colors, so the blocks keep their layout.
+        """
+        viewport = self.viewport()
+        document = self.document()
+        assert viewport is not None and document is not None
+        first = max(first, self.firstVisibleBlock().blockNumber())
+        last = min(last, self.cursorForPosition(viewport.rect().bottomRight()).block().blockNumber())
+        if first > last:
+            return
+        offset = self.contentOffset()
+        top = self.blockBoundingGeometry(document.findBlockByNumber(first)).translated(offset)
+        bottom = self.blockBoundingGeometry(document.findBlockByNumber(last)).translated(offset)
+        viewport.update(top.united(bottom).toAlignedRect())
+
+    @staticmethod
+    def _format_block(block: QTextBlock, ranges: list[tuple[int, int, QTextCharFormat]]) -> None:
+        layout = block.layout()
+        if layout is None:
+            return
+        formats = []
+        for start, length, text_format in ranges:
+            if length > 0:
+                format_range = QTextLayout.FormatRange()
+                format_range.start = start
+                format_range.length = length
+                format_range.format = text_format
+                formats.append(format_range)
+        layout.setFormats(formats)
@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Callable
 from typing import Any
 
 from PyQt6.QtCore import Qt
@@ -8,17 +9,22 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
+    QPushButton,
     QVBoxLayout,
     QWidget,
 )
 
 from cracker.config import Configuration
+from cracker.text_parser import TextParser
+from cracker.text_rules import RuleStats
 
 # Column stretch factors (On is fixed width): Name / Key / Value.
 _NAME_STRETCH = 11
 _KEY_STRETCH = 14
 _VALUE_STRETCH = 8
 _ON_WIDTH = 44
+# Profile columns: Rule / Matches / Time.
+_PROFILE_STRETCH = (11, 4, 5)
 
 
 class ParserConfig(QWidget):
@@ -31,6 +37,10 @@ class ParserConfig(QWidget):
 
         self.regex_config: dict[str, dict[str, Any]] = {}
         self.rows: list[dict[str, Any]] = []
+        # Set by the application: the parser whose time budget profiling uses, and the editor text.
+        self.text_parser: TextParser | None = None
+        self.text_source: Callable[[], str] | None = None
+        self._profile_rows: list[QWidget] = []
 
         self._layout = QVBoxLayout(self)
         self._layout.setContentsMargins(12, 12, 12, 12)
@@ -40,6 +50,7 @@ class ParserConfig(QWidget):
         assert regex_config is not None
         self.regex_config = regex_config
         self._build_table(self.regex_config)
+        self._build_profile()
 
     def confirm_action(self) -> dict[str, dict[str, Any]]:
         self.check_update()
@@ -60,19 +71,92 @@ class ParserConfig(QWidget):
 
         self._layout.addWidget(card)
 
-    def _header_row(self) -> QWidget:
+    def _build_profile(self) -> None:
+        """Adds the "Profile" button and the card listing each rule's runtime on the editor text."""
+        action_row = QHBoxLayout()
+        self.profile_btn = QPushButton("Profile on editor text")
+        self.profile_btn.setToolTip("Run the rules above on the editor text and show time and matches per rule")
+        self.profile_btn.released.connect(self.profile_rules)
+        self.profile_summary = QLabel("")
+        self.profile_summary.setObjectName("rowLabel")
+        action_row.addWidget(self.profile_btn)
+        action_row.addWidget(self.profile_summary, 1)
+        self._layout.addLayout(action_row)
+
+        self.profile_card = QFrame()
+        self.profile_card.setObjectName("card")
+        self.profile_card.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+        self._profile_column = QVBoxLayout(self.profile_card)
+        self._profile_column.setContentsMargins(0, 0, 0, 0)
+        self._profile_column.setSpacing(0)
+        self._profile_column.addWidget(
+            self._header_row(
+                (
+                    ("RULE", _PROFILE_STRETCH[0], 0),
+                    ("MATCHES", _PROFILE_STRETCH[1], 0),
+                    ("TIME", _PROFILE_STRETCH[2], 0),
+                )
+            )
+        )
+        self.profile_card.hide()
+        self._layout.addWidget(self.profile_card)
+
+    def profile_rules(self) -> list[RuleStats]:
+        """Runs the rules as currently edited on the editor text and shows each one's time and matches."""
+        text = self.text_source() if self.text_source is not None else ""
+        parser = self.text_parser or TextParser(rule_budget_ms=0)
+        stats = parser.profile_rules(self._edited_rules(), text)
+        self._show_profile(stats, len(text))
+        return stats
+
+    def _show_profile(self, stats: list[RuleStats], text_length: int) -> None:
+        for row_widget in self._profile_rows:
+            self._profile_column.removeWidget(row_widget)
+            row_widget.deleteLater()
+        self._profile_rows = []
+        for index, rule in enumerate(stats):
+            time_text = "skipped, too slow" if rule.timeouts else f"{rule.seconds * 1000:.1f} ms"
+            row_widget = self._profile_row((rule.name, str(rule.matches), time_text), index)
+            self._profile_column.addWidget(row_widget)
+            self._profile_rows.append(row_widget)
+        self.profile_card.setVisible(bool(stats))
+
+        total = sum(rule.seconds for rule in stats)
+        summary = f"{len(stats)} active rules on {text_length:,} characters: {total * 1000:.1f} ms"
+        slowest = max(stats, key=lambda rule: (rule.timeouts, rule.seconds), default=None)
+        if slowest is not None:
+            summary += f", slowest {slowest.name}"
+        self.profile_summary.setText(summary)
+
+    def _profile_row(self, values: tuple[str, str, str], index: int) -> QWidget:
         row_widget = QWidget()
-        row_widget.setObjectName("tableHeader")
+        row_widget.setProperty("zebra", "a" if index % 2 == 0 else "b")
         row_widget.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
         row = QHBoxLayout(row_widget)
-        row.setContentsMargins(12, 7, 12, 7)
+        row.setContentsMargins(12, 4, 12, 4)
         row.setSpacing(10)
-        for text, stretch, width in (
+        for value, stretch in zip(values, _PROFILE_STRETCH):
+            label = QLabel(value)
+            label.setProperty("mono", True)
+            row.addWidget(label, stretch)
+        return row_widget
+
+    def _header_row(
+        self,
+        columns: tuple[tuple[str, int, int], ...] = (
             ("ON", 0, _ON_WIDTH),
             ("NAME", _NAME_STRETCH, 0),
             ("KEY", _KEY_STRETCH, 0),
             ("VALUE", _VALUE_STRETCH, 0),
-        ):
+        ),
+    ) -> QWidget:
+        row_widget = QWidget()
+        row_widget.setObjectName("tableHeader")
+        row_widget.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+        row = QHBoxLayout(row_widget)
+        row.setContentsMargins(12, 7, 12, 7)
+        row.setSpacing(10)
+        for text, stretch, width in columns:
             label = QLabel(text)
             label.setProperty("colhead", True)
             if width:
@@ -116,6 +200,18 @@ class ParserConfig(QWidget):
         )
         return row_widget
 
+    def _edited_rules(self) -> dict[str, dict[str, Any]]:
+        """The rules as shown in the table, without touching the saved config."""
+        return {
+            row["name"].text(): {
+                "name": row["name"].text(),
+                "active": row["active"].isChecked(),
+                "key": row["key"].text(),
+                "value": row["value"].text(),
+            }
+            for row in self.rows
+        }
+
     def check_update(self) -> None:
         """Push each row's widget values back into the regex config by name."""
         assert self.regex_config, "Regex config hasn't been loaded"
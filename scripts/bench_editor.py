@@ -0,0 +1,98 @@
+"""Compares QTextEdit with the main window's DocumentEditor on a long text with read-along highlighting.
+
+Measures loading the text and moving the highlight across words in the middle
+of it, the way the read-along controller does during playback: with extra
+selections over the rest of the document, over its visible part only, and
+with the DocumentEditor's per-block formats.
+
+Usage: python scripts/bench_editor.py [words]
+"""
+
+import re
+import sys
+import time
+
+from PyQt6.QtGui import QColor, QTextCharFormat, QTextCursor
+from PyQt6.QtWidgets import QApplication, QPlainTextEdit, QTextEdit
+
+from cracker.view.document_editor import DocumentEditor
+
+PARAGRAPH = "The quick brown fox jumps over the lazy dog. It was not amused by the dog, or by the fox.\n\n"
+STEPS = 50
+
+
+def select(editor: QTextEdit | QPlainTextEdit, ranges) -> None:
+    selections = []
+    for begin, end, text_format in ranges:
+        selection = QTextEdit.ExtraSelection()
+        cursor = QTextCursor(editor.document())
+        cursor.setPosition(begin)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        selection.cursor = cursor
+        selection.format = text_format
+        selections.append(selection)
+    editor.setExtraSelections(selections)
+
+
+def highlight_text_edit(editor: QTextEdit, start: int, length: int, doc_len: int, word, rest, read) -> None:
+    """The word plus the whole rest of the document."""
+    select(editor, [(start + length, doc_len, rest), (start, start + length, word)])
+
+
+def highlight_visible(editor: QPlainTextEdit, start: int, length: int, doc_len: int, word, rest, read) -> None:
+    """The word plus the rest of the blocks on screen, re-selected on every step."""
+    viewport = editor.viewport()
+    last = editor.cursorForPosition(viewport.rect().bottomRight()).block()
+    rest_end = min(doc_len, last.position() + last.length() - 1)
+    select(editor, [(start + length, rest_end, rest), (start, start + length, word)])
+
+
+def measure(name: str, editor, highlight, text: str, app: QApplication) -> None:
+    editor.resize(720, 400)
+    editor.show()
+    started = time.perf_counter()
+    editor.setPlainText(text)
+    app.processEvents()
+    loaded = time.perf_counter() - started
+
+    word = QTextCharFormat()
+    word.setBackground(QColor("#dbe7ff"))
+    rest = QTextCharFormat()
+    rest.setForeground(QColor("gray"))
+    read = QTextCharFormat()
+    read.setForeground(QColor("black"))
+    spans = [match.span() for match in re.finditer(r"\S+", text[len(text) // 2 : len(text) // 2 + 4000])]
+    offset = len(text) // 2
+    # The first highlight lands mid-text, as when a read starts there.
+    started = time.perf_counter()
+    begin, end = spans[0]
+    highlight(editor, offset + begin, end - begin, len(text), word, rest, read)
+    app.processEvents()
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    for begin, end in spans[1 : STEPS + 1]:
+        highlight(editor, offset + begin, end - begin, len(text), word, rest, read)
+        app.processEvents()
+    step = (time.perf_counter() - started) / STEPS
+    print(f"{name:>15}: load {loaded:.2f} s, first highlight {first * 1000:.1f} ms, step {step * 1000:.2f} ms")
+    editor.close()
+
+
+def main() -> None:
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app = QApplication(sys.argv[:1])
+    text = PARAGRAPH * (words // len(PARAGRAPH.split()) + 1)
+    print(f"{len(text.split())} words, {len(text) / 1024 / 1024:.1f} MB")
+    measure("QTextEdit", QTextEdit(), highlight_text_edit, text, app)
+    measure("visible only", QPlainTextEdit(), highlight_visible, text, app)
+    measure(
+        "DocumentEditor",
+        DocumentEditor(),
+        lambda editor, start, length, doc_len, word, rest, read: editor.set_highlight(start, length, word, read),
+        text,
+        app,
+    )
+
+
+if __name__ == "__main__":
+    main()
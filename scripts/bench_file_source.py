@@ -0,0 +1,46 @@
+"""Measures time and peak Python memory of streaming a large file through the parser rules and the chunker.
+
+Usage: python scripts/bench_file_source.py [size_in_mb]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from cracker.file_source import open_text_file
+from cracker.text_parser import TextParser
+from cracker.text_rules import Rule, RulePipeline
+
+PARAGRAPH = "The quick brown fox jumps over the lazy dog.\tIt was not amused by the dog, or by the fox.\n\n"
+RULES = RulePipeline([Rule("tabs", "\t", " "), Rule("citations", r"\[\d+\]", "")])
+
+
+def main() -> None:
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as text_file:
+        block = PARAGRAPH * (1024 * 1024 // len(PARAGRAPH))
+        for _ in range(size_mb):
+            text_file.write(block)
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        first_chunk = None
+        chunks = 0
+        for block in open_text_file(text_file.name):
+            for _ in TextParser.pack_spans(RULES.apply(block), 3000):
+                chunks += 1
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - started
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.unlink(text_file.name)
+    print(f"{size_mb} MB: {chunks} chunks in {elapsed:.2f} s, first after {first_chunk * 1000:.1f} ms")
+    print(f"peak traced memory: {peak / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Measures the memory a long read keeps for its word marks and editor spans, per word.
+
+Compares the columnar WordMarks and WordSpans with what they replaced: a list
+of plain dataclass marks per segment and a dict of ``(start, length)`` tuples.
+The read has ``words`` words in segments of ``segment_words``.
+
+Usage: python scripts/bench_marks_memory.py [words] [segment_words]
+"""
+
+import gc
+import sys
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from cracker.read_along import AudioSegment, WordMark, WordMarks, WordSpans
+
+
+@dataclass
+class PlainWordMark:
+    """WordMark as it was: a regular dataclass, with an instance dict."""
+
+    time_ms: int
+    value: str
+    start: int = -1
+    end: int = -1
+
+
+def measure(build: Callable[[], object]) -> int:
+    """Bytes still allocated by what ``build`` returns."""
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main() -> None:
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    segment_words = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    bounds = [(start, min(words, start + segment_words)) for start in range(0, words, segment_words)]
+
+    def plain_marks() -> list[list[PlainWordMark]]:
+        return [
+            [PlainWordMark(300 * word, f"word{word}", 6 * word, 6 * word + 5) for word in range(start, end)]
+            for start, end in bounds
+        ]
+
+    def columnar_marks() -> list[AudioSegment]:
+        return [
+            AudioSegment(
+                path=f"polly-{index}.mp3",
+                marks=WordMarks(
+                    WordMark(300 * word, f"word{word}", 6 * word, 6 * word + 5) for word in range(start, end)
+                ),
+            )
+            for index, (start, end) in enumerate(bounds)
+        ]
+
+    def dict_spans() -> dict[int, tuple[int, int]]:
+        return {word: (6 * word, 5) for word in range(words)}
+
+    def columnar_spans() -> WordSpans:
+        spans = WordSpans()
+        for word in range(words):
+            spans[word] = (6 * word, 5)
+        return spans
+
+    print(f"{words} words in {len(bounds)} segments, bytes per word:")
+    for name, before, after in (
+        ("marks", plain_marks, columnar_marks),
+        ("spans", dict_spans, columnar_spans),
+    ):
+        print(f"{name}: {measure(before) / words:6.1f} before, {measure(after) / words:5.1f} after")
+
+
+if __name__ == "__main__":
+    main()
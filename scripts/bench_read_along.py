@@ -0,0 +1,103 @@
+"""Measures read-along progress lookups on a long session, against the linear scan they replaced.
+
+Every ``positionChanged`` tick of the player asks the session for the current
+word. The session here has ``words`` words, either in one segment or split
+into segments of ``segment_words``. Also times starting a session on an
+editor text with citations the read left out, up to the first highlighted
+word, against placing every word up front.
+
+Usage: python scripts/bench_read_along.py [words] [segment_words]
+"""
+
+import random
+import re
+import sys
+import time
+
+from cracker.read_along import MarksProgressSource, WordMark, WordMarks, _located_spans, build_session
+from cracker.text_diff import OffsetMap, diff_edits
+
+TICKS = 20_000
+
+
+def linear_index(segments: list[list[WordMark]], segment_index: int, position_ms: int) -> int:
+    """The previous lookup: the last mark at or before the position, scanning from the segment's start."""
+    local = -1
+    for offset, mark in enumerate(segments[segment_index]):
+        if mark.time_ms <= position_ms:
+            local = offset
+        else:
+            break
+    return local
+
+
+def main() -> None:
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    segment_words = int(sys.argv[2]) if len(sys.argv) > 2 else words
+    segments = [
+        [WordMark(300 * word, f"w{word}") for word in range(start, min(words, start + segment_words))]
+        for start in range(0, words, segment_words)
+    ]
+    ticks = []
+    rng = random.Random(0)
+    for _ in range(TICKS):
+        segment_index = rng.randrange(len(segments))
+        marks = segments[segment_index]
+        ticks.append((segment_index, rng.randint(marks[0].time_ms, marks[-1].time_ms + 300)))
+
+    # Segments carry their marks as columns, as AudioSegments do.
+    columns = [WordMarks(marks) for marks in segments]
+    started = time.perf_counter()
+    source = MarksProgressSource(columns)
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for segment_index, position_ms in ticks:
+        linear_index(segments, segment_index, position_ms)
+    linear = (time.perf_counter() - started) / TICKS
+
+    started = time.perf_counter()
+    for segment_index, position_ms in ticks:
+        source.progress(segment_index=segment_index, position_ms=position_ms)
+    bisected = (time.perf_counter() - started) / TICKS
+
+    started = time.perf_counter()
+    indexes = range(0, words, max(1, words // TICKS))
+    for index in indexes:
+        source.time_of(index)
+    reverse = (time.perf_counter() - started) / len(indexes)
+
+    print(f"{words} words in {len(segments)} segments, source built in {built * 1000:.1f} ms")
+    print(f"linear scan: {linear * 1e6:.1f} µs per tick")
+    print(f"bisect:      {bisected * 1e6:.2f} µs per tick")
+    print(f"time_of:     {reverse * 1e6:.2f} µs per word")
+    measure_start(words, segment_words)
+
+
+def measure_start(words: int, segment_words: int) -> None:
+    editor_text = "".join(f"Word{word} [{word}]" + ("\n" if word % 10 == 9 else " ") for word in range(words))
+    read_text = re.sub(r" \[\d+\]", "", editor_text)
+    marks = [
+        WordMark(300 * index, match.group(), *match.span())
+        for index, match in enumerate(re.finditer(r"\S+", read_text))
+    ]
+    segments = [WordMarks(marks[start : start + segment_words]) for start in range(0, words, segment_words)]
+
+    started = time.perf_counter()
+    eager = _located_spans(marks, 0, OffsetMap(diff_edits(editor_text, read_text), old=editor_text))
+    upfront = time.perf_counter() - started
+
+    started = time.perf_counter()
+    session = build_session(
+        source="textarea", editor_text=editor_text, read_text=read_text, segment_marks=segments, wpm=200
+    )
+    session.resolve_segment(0)
+    lazy = time.perf_counter() - started
+
+    assert session.highlight_for(words - 1) == eager[words - 1]
+    print(f"session start, every word placed: {upfront * 1000:.1f} ms")
+    print(f"session start, first segment:     {lazy * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
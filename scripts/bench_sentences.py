@@ -0,0 +1,100 @@
+"""Benchmarks the single-pass sentence segmenter against the previous implementation.
+
+Usage: python scripts/bench_sentences.py [size_in_mb]
+"""
+
+import re
+import sys
+import time
+
+from cracker.text_parser import sentence_spans, split_into_sentences
+
+SAMPLE = (
+    "Mr. Smith bought cheapsite.com for 1.5 million dollars, i.e. he paid a lot for it. "
+    "Did he mind? Adam Jones Jr. thinks he didn't. In any case, this isn't true... "
+    'Well, with a probability of .9 it isn\'t. The U.S. economy is "fine." However J. R. R. Tolkien disagrees!\n'
+)
+
+# The regex-marker implementation that `sentence_spans` replaced, kept for comparison.
+alphabets = "([A-Za-z])"
+prefixes = "(Mr|St|Mrs|Ms|Dr)[.]"
+suffixes = "(Inc|Ltd|Jr|Sr|Co)"
+starters = (
+    r"(Mr|Mrs|Ms|Dr|Prof|Capt|Cpt|Lt|He\s|She\s|It\s|They\s|Their\s|Our\s|We\s|But\s|However\s|That\s|This\s|Wherever)"
+)
+acronyms = "([A-Z][.][A-Z][.](?:[A-Z][.])?)"
+websites = "[.](com|net|org|io|gov|edu|me)"
+digits = "([0-9])"
+multiple_dots = r"\.{2,}"
+
+
+# TODO:
+# This was found on the internet. It kind of works, but it is not perfect.
+def legacy_split_into_sentences(text: str) -> list[str]:
+    """
+    Split the text into sentences.
+
+    If the text contains substrings "<prd>" or "<stop>", they would lead
+    to incorrect splitting because they are used as markers for splitting.
+
+    :param text: text to be split into sentences
+    :type text: str
+
+    :return: list of sentences
+    :rtype: list[str]
+    """
+    text = " " + text + "  "
+    text = text.replace("\n", " ")
+    text = re.sub(prefixes, "\\1<prd>", text)
+    text = re.sub(websites, "<prd>\\1", text)
+    text = re.sub(digits + "[.]" + digits, "\\1<prd>\\2", text)
+    text = re.sub(multiple_dots, lambda match: "<prd>" * len(match.group(0)) + "<stop>", text)
+    if "Ph.D" in text:
+        text = text.replace("Ph.D.", "Ph<prd>D<prd>")
+    text = re.sub(r"\s" + alphabets + "[.] ", " \\1<prd> ", text)
+    text = re.sub(acronyms + " " + starters, "\\1<stop> \\2", text)
+    text = re.sub(alphabets + "[.]" + alphabets + "[.]" + alphabets + "[.]", "\\1<prd>\\2<prd>\\3<prd>", text)
+    text = re.sub(alphabets + "[.]" + alphabets + "[.]", "\\1<prd>\\2<prd>", text)
+    text = re.sub(" " + suffixes + "[.] " + starters, " \\1<stop> \\2", text)
+    text = re.sub(" " + suffixes + "[.]", " \\1<prd>", text)
+    text = re.sub(" " + alphabets + "[.]", " \\1<prd>", text)
+    if "”" in text:
+        text = text.replace(".”", "”.")
+    if '"' in text:
+        text = text.replace('."', '".')
+    if "!" in text:
+        text = text.replace('!"', '"!')
+    if "?" in text:
+        text = text.replace('?"', '"?')
+    text = text.replace(".", ".<stop>")
+    text = text.replace("?", "?<stop>")
+    text = text.replace("!", "!<stop>")
+    text = text.replace("<prd>", ".")
+    sentences = text.split("<stop>")
+    sentences = [s.strip() for s in sentences]
+    if sentences and not sentences[-1]:
+        sentences = sentences[:-1]
+    return sentences
+
+
+def _timed(function, text: str) -> tuple[float, int]:
+    started = time.perf_counter()
+    result = function(text)
+    return time.perf_counter() - started, len(result)
+
+
+def main() -> None:
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    text = SAMPLE * max(1, int(size_mb * 1024 * 1024 / len(SAMPLE)))
+    print(f"Input: {len(text) / 1024 / 1024:.2f} MB")
+    for name, function in [
+        ("legacy split_into_sentences", legacy_split_into_sentences),
+        ("split_into_sentences", split_into_sentences),
+        ("sentence_spans", lambda text: list(sentence_spans(text))),
+    ]:
+        seconds, count = _timed(function, text)
+        print(f"{name:>28}: {seconds * 1000:8.1f} ms, {count} sentences")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Benchmarks the offset-based TextParser.split_text against the previous implementation.
+
+Usage: python scripts/bench_split_text.py [size_in_mb]
+"""
+
+import sys
+import time
+from collections.abc import Iterator
+
+from cracker.text_parser import TextParser
+
+PROSE = "The quick brown fox jumps over the lazy dog. It was not amused by the dog, or by the fox. "
+# No sentence boundary anywhere, which the old splitter could not cut sensibly.
+RUN_ON = "and then the fox kept running through the field without ever stopping "
+
+
+def legacy_split_text(text: str, max_char: int = 3000) -> Iterator[str]:
+    """The slicing implementation that `split_spans` replaced, kept for comparison."""
+    doc_residue = text
+    while len(doc_residue) > max_char:
+        part = doc_residue[:max_char].rsplit(". ", 1)[0]
+        doc_residue = doc_residue[len(part) :]
+        yield part
+    yield doc_residue
+
+
+def _timed(function, text: str) -> tuple[float, int]:
+    started = time.perf_counter()
+    count = sum(1 for _ in function(text))
+    return time.perf_counter() - started, count
+
+
+def main() -> None:
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 4.0
+    for label, sample in [("prose", PROSE), ("run-on", RUN_ON)]:
+        text = sample * max(1, int(size_mb * 1024 * 1024 / len(sample)))
+        print(f"Input: {len(text) / 1024 / 1024:.2f} MB of {label}")
+        for name, function in [
+            ("legacy split_text", legacy_split_text),
+            ("split_text", TextParser.split_text),
+            ("split_spans", TextParser.split_spans),
+        ]:
+            seconds, count = _timed(function, text)
+            print(f"{name:>18}: {seconds * 1000:8.1f} ms, {count} parts")
+
+
+if __name__ == "__main__":
+    main()